@@ -1,61 +1,41 @@
 #!/usr/bin/env python3
 
 import os
+from pathlib import Path
 
 import aws_cdk as cdk
 
-from lib.lambda_ephemeral_storage_stack import LambdaEphemeralStorage
-from lib.lambda_layer_merging_stack import LambdaLayerMergingStack
-from lib.lambda_responses_and_logs_stack import LambdaResponsesAndLogsStack
-from lib.lambda_retries_stack import LambdaRetriesStack
-from lib.lambda_scale_from_zero_stack import LambdaScaleFromZeroStack
-from lib.lambda_who_what_where_stack import LambdaWhoWhatWhereStack
-from lib.sns_publish_permissions_stack import SnsPublishPermissionsStack
+from lib.registry import ASSET_DIRS, STACKS, get_stack_class, select_stacks
+from lib.synth_cache import SynthCache
 
 app = cdk.App()
 env = cdk.Environment(account=os.environ["ACCOUNT_ID"], region=os.environ["REGION"])
 
-LambdaRetriesStack(
-    app,
-    "LambdaRetriesStack",
-    env=env,
-)
-
-SnsPublishPermissionsStack(
-    app,
-    "SnsPublishPermissionsStack",
-    env=env,
-)
-
-LambdaResponsesAndLogsStack(
-    app,
-    "LambdaResponsesAndLogsStack",
-    env=env,
-)
-
-LambdaEphemeralStorage(
-    app,
-    "LambdaEphemeralStorageStack",
-    env=env,
-)
-
-
-LambdaWhoWhatWhereStack(
-    app,
-    "LambdaWhoWhatWhereStack",
-    env=env,
-)
-
-LambdaLayerMergingStack(
-    app,
-    "LambdaLayerMergingStack",
-    env=env,
-)
-
-LambdaScaleFromZeroStack(
-    app,
-    "LambdaScaleFromZeroStack",
-    env=env,
-)
-
-app.synth()
+# `-c synth_cache=false` to build every selected stack from scratch
+use_cache = str(app.node.try_get_context("synth_cache")).lower() != "false"
+cache = SynthCache()
+
+built = {}
+cached = {}
+
+# e.g. `cdk deploy -c stacks=LambdaRetriesStack LambdaRetriesStack` imports and builds just that stack
+for stack_id in select_stacks(app.node.try_get_context("stacks")):
+    module_name, _ = STACKS[stack_id]
+    key = cache.key(module_name, ASSET_DIRS.get(stack_id, []))
+    if use_cache and cache.has(stack_id, key):
+        cached[stack_id] = key
+        continue
+
+    get_stack_class(stack_id)(
+        app,
+        stack_id,
+        env=env,
+    )
+    built[stack_id] = key
+
+assembly_dir = Path(app.synth().directory)
+
+for stack_id, key in built.items():
+    cache.store(assembly_dir, stack_id, key)
+for stack_id, key in cached.items():
+    cache.restore(assembly_dir, stack_id, key)
@@ -0,0 +1,71 @@
+"""
+Fingerprint manifests for layer assets.
+
+By default cdk hashes every file in an asset directory on every synth.
+The vendored layers have thousands of files, so that's slow.
+
+Instead, we keep a manifest next to each layer directory recording each file's size, mtime and sha256,
+plus an overall hash, and pass that hash to cdk as a custom asset hash.
+A file is only re-hashed if its size or mtime changed.
+cdk skips re-staging an asset whose hash is already staged in cdk.out,
+and the cli skips re-zipping and re-uploading an asset whose hash is already published.
+
+cdk itself is only needed for lib.layer_assets.layer_code, so scripts.build_layers can hash layers without loading jsii.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+def get_manifest_path(layer_dir: Path) -> Path:
+    return layer_dir.with_name(layer_dir.name + ".fingerprint.json")
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def update_fingerprint(layer_dir: Path) -> str:
+    "Bring the layer's fingerprint manifest up to date and return the layer's hash."
+    return get_fingerprint(layer_dir)["hash"]
+
+
+def get_fingerprint(layer_dir: Path) -> dict:
+    """
+    Bring the layer's fingerprint manifest up to date and return it.
+
+    Only new files and files whose size or mtime changed are hashed.
+    """
+    manifest_path = get_manifest_path(layer_dir)
+    old_files = json.loads(manifest_path.read_text())["files"] if manifest_path.exists() else {}
+
+    files = {}
+    for root, dirs, names in os.walk(layer_dir):
+        dirs.sort()
+        for name in sorted(names):
+            path = Path(root) / name
+            relative_path = path.relative_to(layer_dir).as_posix()
+            stat = path.stat()
+            old = old_files.get(relative_path)
+            if old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                files[relative_path] = old
+            else:
+                files[relative_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": hash_file(path)}
+
+    # content only, so the hash is the same on any checkout, whatever the mtimes
+    digest = hashlib.sha256()
+    for relative_path, entry in files.items():
+        digest.update(f"{relative_path}\0{entry['sha256']}\n".encode())
+    fingerprint = {"hash": digest.hexdigest(), "files": files}
+
+    if files != old_files:
+        manifest_path.write_text(json.dumps(fingerprint, indent=1))
+
+    return fingerprint
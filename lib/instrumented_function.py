@@ -0,0 +1,144 @@
+import hashlib
+import re
+from textwrap import dedent
+
+import jsii
+from aws_cdk import Aspects, CfnElement, IAspect, RemovalPolicy, Stack
+from aws_cdk import aws_lambda as lambda_
+from aws_cdk import aws_logs as logs
+from constructs import Construct, IConstruct
+
+# the handler source runs as a module inside the wrapper, so we can time its import
+# everything else in the wrapper is underscored so it can't clash with the handler's globals
+WRAPPER = dedent(
+    """\
+    import json as _json
+    import sys as _sys
+    import time as _time
+    import types as _types
+
+    _start = _time.perf_counter()
+    _module = _types.ModuleType("handler")
+    _module.__file__ = "/var/task/handler.py"
+    # registered, like an imported module, for whatever looks a class or function up by its __module__: dataclasses, pickle, ...
+    _sys.modules["handler"] = _module
+    exec(compile({source!r}, "/var/task/handler.py", "exec"), _module.__dict__)
+    _import_ms = (_time.perf_counter() - _start) * 1000
+    _cold = True
+
+
+    def handler(event, context):
+        global _cold
+        cold, _cold = _cold, False
+        start = _time.perf_counter()
+        try:
+            return _module.handler(event, context)
+        finally:
+            handler_ms = (_time.perf_counter() - start) * 1000
+            print(_json.dumps({{
+                "event": "timing",
+                "request_id": context.aws_request_id,
+                "cold": cold,
+                "import_ms": round(_import_ms, 3) if cold else None,
+                "handler_ms": round(handler_ms, 3),
+            }}))
+    """
+)
+
+
+def instrument(source: str) -> str:
+    """
+    Wrap inline handler source so each invocation prints one json line like
+
+        {"event": "timing", "request_id": "...", "cold": true, "import_ms": 4001.2, "handler_ms": 0.01}
+
+    `import_ms` is the time to run the handler module, so is only set on cold starts.
+    The line is printed even if the handler raises. It isn't printed if the invocation times out.
+    """
+    return WRAPPER.format(source=source)
+
+
+def make_logical_id(components: list[str]) -> str:
+    "Get the logical id cdk allocates for a construct path relative to its stack, like aws-cdk-lib's makeUniqueId."
+    components = [component for component in components if component != "Default"]
+    if len(components) == 1:
+        return re.sub(r"[^A-Za-z0-9]", "", components[0])
+    path_hash = hashlib.md5("/".join(components).encode()).hexdigest()[:8].upper()
+    human: list[str] = []
+    for component in components:
+        if not human or not human[-1].endswith(component):
+            human.append(component)
+    return "".join(re.sub(r"[^A-Za-z0-9]", "", component) for component in human if component != "Resource")[:240] + path_hash
+
+
+def get_stack_path(construct: IConstruct) -> list[str]:
+    return construct.node.path.removeprefix(Stack.of(construct).node.path + "/").split("/")
+
+
+@jsii.implements(IAspect)
+class KeepLogicalIds:
+    "Give the resources under some constructs the logical ids they'd have under other construct ids, e.g. their ids before a refactor."
+
+    def __init__(self, renames: dict[tuple[str, ...], str]) -> None:
+        # stack-relative construct path -> the construct id to allocate its resources' logical ids as if it had
+        self.renames = renames
+
+    def visit(self, node: IConstruct) -> None:
+        if not isinstance(node, CfnElement):
+            return
+        path = get_stack_path(node)
+        for prefix, construct_id in self.renames.items():
+            if tuple(path[: len(prefix)]) == prefix:
+                # keep anything cdk appended to the id it allocated, e.g. a lambda version's code hash
+                allocated = make_logical_id(path)
+                current = Stack.of(node).resolve(node.logical_id)
+                suffix = current.removeprefix(allocated) if current.startswith(allocated) else ""
+                node.override_logical_id(make_logical_id([construct_id, *path[len(prefix) :]]) + suffix)
+
+
+class InstrumentedFunction(Construct):
+    """
+    A python function with inline code, and a log group we control, named after the function.
+
+    Set `instrument_handler=False` to deploy the handler source as is.
+
+    Set `legacy_ids` to the construct ids a stack gave the log group and the function before it used this construct,
+    to keep their resources' logical ids, so deployed stacks update them in place instead of replacing them.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        *,
+        function_name: str,
+        code: str,
+        instrument_handler: bool = True,
+        legacy_ids: tuple[str, str] | None = None,
+        **function_kwargs,
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        self.log_group = logs.LogGroup(
+            self,
+            "log_group",
+            log_group_name=f"/aws/lambda/{function_name}",
+            removal_policy=RemovalPolicy.DESTROY,
+            retention=logs.RetentionDays.ONE_DAY,
+        )
+
+        self.function = lambda_.Function(
+            self,
+            "lambda",
+            function_name=function_name,
+            runtime=lambda_.Runtime.PYTHON_3_13,
+            handler="index.handler",
+            log_group=self.log_group,
+            code=lambda_.Code.from_inline(instrument(code) if instrument_handler else code),
+            **function_kwargs,
+        )
+
+        if legacy_ids is not None:
+            log_group_id, function_id = legacy_ids
+            renames = {tuple(get_stack_path(self.log_group)): log_group_id, tuple(get_stack_path(self.function)): function_id}
+            Aspects.of(self).add(KeepLogicalIds(renames))
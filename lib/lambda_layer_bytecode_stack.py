@@ -0,0 +1,57 @@
+from textwrap import dedent
+
+from aws_cdk import Stack
+from aws_cdk import aws_lambda as lambda_
+from constructs import Construct
+
+from lib.instrumented_function import InstrumentedFunction
+from lib.layer_assets import layer_code
+from lib.paths import BUILT_LAYERS_DIR, LAYERS_DIR
+
+# the same handler for both functions, so the only difference is the layer
+# the instrumentation's import_ms is the time to import requests
+HANDLER = dedent(
+    """\
+    import requests
+
+    def handler(event, context):
+        return requests.__version__
+    """
+)
+
+
+class LambdaLayerBytecodeStack(Stack):
+    "Needs `uv run python -m scripts.build_layers bytecode requests-2-31` first."
+
+    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        layer_source_only_layer = lambda_.LayerVersion(
+            self,
+            "layer_source_only_layer",
+            code=layer_code(LAYERS_DIR / "requests-2-31"),
+            description="requests 2.31, .py files only.",
+        )
+
+        InstrumentedFunction(
+            self,
+            "layer_source_only",
+            function_name="layer_source_only",
+            code=HANDLER,
+            layers=[layer_source_only_layer],
+        )
+
+        layer_with_bytecode_layer = lambda_.LayerVersion(
+            self,
+            "layer_with_bytecode_layer",
+            code=layer_code(BUILT_LAYERS_DIR / "bytecode" / "requests-2-31"),
+            description="requests 2.31, precompiled for python 3.13.",
+        )
+
+        InstrumentedFunction(
+            self,
+            "layer_with_bytecode",
+            function_name="layer_with_bytecode",
+            code=HANDLER,
+            layers=[layer_with_bytecode_layer],
+        )
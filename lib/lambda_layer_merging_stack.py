@@ -1,66 +1,81 @@
-from pathlib import Path
+import json
 from textwrap import dedent
 
-from aws_cdk import RemovalPolicy, Stack
+from aws_cdk import Stack
 from aws_cdk import aws_lambda as lambda_
-from aws_cdk import aws_logs as logs
 from constructs import Construct
 
+from lib.instrumented_function import InstrumentedFunction
+from lib.layer_assets import layer_code
+from lib.paths import BUILT_LAYERS_DIR, LAYERS_DIR
+
 
 class LambdaLayerMergingStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
-        layer_merging_log_group = logs.LogGroup(
-            self,
-            "layer_merging_log_group",
-            log_group_name="/aws/lambda/layer_merging",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
+        # `-c layer_fingerprints=false` to have cdk hash the layer directories itself
+        use_fingerprint = str(self.node.try_get_context("layer_fingerprints")).lower() != "false"
+
+        # `-c layer_build=dedup` to deploy the output of scripts/build_layers.py instead:
+        # a shared base layer plus per-version deltas, which merge to the same /opt/python
+        if self.node.try_get_context("layer_build") == "dedup":
+            dedup_dir = BUILT_LAYERS_DIR / "dedup"
+            dedup = json.loads((dedup_dir / "dedup.json").read_text())
+            requests_2_30_dir = dedup_dir / dedup["deltas"]["requests-2-30"]
+            requests_2_31_dir = dedup_dir / dedup["deltas"]["requests-2-31"]
+            requests_base_layer = lambda_.LayerVersion(
+                self,
+                "requests_base_layer",
+                code=layer_code(dedup_dir / dedup["base"], use_fingerprint),
+                description="The files common to the requests 2.30 and 2.31 layers.",
+            )
+            shared_layers = [requests_base_layer]
+        else:
+            requests_2_30_dir = LAYERS_DIR / "requests-2-30"
+            requests_2_31_dir = LAYERS_DIR / "requests-2-31"
+            shared_layers = []
 
         requests_2_30_layer = lambda_.LayerVersion(
             self,
             "requests_2_30_layer",
-            code=lambda_.Code.from_asset(str(Path(__file__).parent / "resources" / "layers" / "requests-2-30")),
+            code=layer_code(requests_2_30_dir, use_fingerprint),
             description="A layer containing requests 2.30 and a sentinel file.",
         )
         requests_2_31_layer = lambda_.LayerVersion(
             self,
             "requests_2_31_layer",
-            code=lambda_.Code.from_asset(str(Path(__file__).parent / "resources" / "layers" / "requests-2-31")),
+            code=layer_code(requests_2_31_dir, use_fingerprint),
             description="A layer containing requests 2.31 and a sentinel file.",
         )
-        lambda_.Function(
+        # its prints are what the example shows, so it runs as is
+        InstrumentedFunction(
             self,
-            "layer_merging_lambda",
+            "layer_merging",
             function_name="layer_merging",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            layers=[requests_2_31_layer, requests_2_30_layer],  # order is for making a point
-            log_group=layer_merging_log_group,
-            code=lambda_.Code.from_inline(
-                dedent(
-                    """\
-                    import os
-                    import subprocess
-                    import sys
+            instrument_handler=False,
+            legacy_ids=("layer_merging_log_group", "layer_merging_lambda"),
+            layers=[requests_2_31_layer, requests_2_30_layer, *shared_layers],  # order is for making a point
+            code=dedent(
+                """\
+                import os
+                import subprocess
+                import sys
 
-                    import requests
+                import requests
 
 
-                    def handler(event, context):
-                        print(f"{os.environ.get("PYTHONPATH")=}")  # used to add dirs to module search path
-                        print(f"{sys.path=}")  # module search path
+                def handler(event, context):
+                    print(f"{os.environ.get("PYTHONPATH")=}")  # used to add dirs to module search path
+                    print(f"{sys.path=}")  # module search path
 
-                        # layers are extracted into /opt
-                        p1 = subprocess.run(["ls", "/opt"], text=True, capture_output=True, check=True)
-                        print("/opt listing:\\n", p1.stdout.split())
-                        p2 = subprocess.run(["ls", "/opt/python"], text=True, capture_output=True, check=True)
-                        print("/opt/python listing:\\n", p2.stdout.split())
+                    # layers are extracted into /opt
+                    p1 = subprocess.run(["ls", "/opt"], text=True, capture_output=True, check=True)
+                    print("/opt listing:\\n", p1.stdout.split())
+                    p2 = subprocess.run(["ls", "/opt/python"], text=True, capture_output=True, check=True)
+                    print("/opt/python listing:\\n", p2.stdout.split())
 
-                        print("imported requests version:", requests.__version__)
-                    """
-                )
+                    print("imported requests version:", requests.__version__)
+                """
             ),
         )
@@ -0,0 +1,33 @@
+from aws_cdk import Stack
+from aws_cdk import aws_lambda as lambda_
+from constructs import Construct
+
+from lib.lambda_ephemeral_storage_stack import HANDLER as EPHEMERAL_STORAGE_HANDLER
+from lib.lambda_layer_bytecode_stack import HANDLER as LAYER_HANDLER
+from lib.lambda_responses_and_logs_stack import SLOW_INIT_HANDLER
+from lib.layer_assets import layer_code
+from lib.paths import LAYERS_DIR
+from lib.sweep import sweep
+
+
+class LambdaMemorySweepStack(Stack):
+    "Sweeps other examples' handlers, so their numbers can be read alongside those examples."
+
+    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        # the init sleeps, so this is the baseline: memory shouldn't change it
+        sweep(self, "slow_init", code=SLOW_INIT_HANDLER)
+
+        # a cheap handler, so this is lambda's own overhead at each size
+        sweep(self, "ephemeral_storage", code=EPHEMERAL_STORAGE_HANDLER)
+
+        # the init imports requests, which is cpu bound, so this should speed up with memory
+        # the compiled parts of charset_normalizer are x86_64 only: on arm64 it falls back to its pure python modules
+        layer = lambda_.LayerVersion(
+            self,
+            "layer_source_only_layer",
+            code=layer_code(LAYERS_DIR / "requests-2-31"),
+            description="requests 2.31, .py files only.",
+        )
+        sweep(self, "layer_source_only", code=LAYER_HANDLER, layers=[layer])
@@ -1,205 +1,132 @@
 from textwrap import dedent
 
-from aws_cdk import Duration, RemovalPolicy, Stack
-from aws_cdk import aws_lambda as lambda_
-from aws_cdk import aws_logs as logs
+from aws_cdk import Duration, Stack
 from constructs import Construct
 
+from lib.instrumented_function import InstrumentedFunction
+
+SLOW_INIT_HANDLER = dedent(
+    """\
+    from time import sleep
+
+    sleep(4)
+
+    def handler(event, context):
+        return "hi there"
+    """
+)
+
 
 class LambdaResponsesAndLogsStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
-        slow_init_log_group = logs.LogGroup(
-            self,
-            "slow_init_log_group",
-            log_group_name="/aws/lambda/slow_init",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
+        # the example is about the responses and logs themselves, so the handlers run as is
 
-        lambda_.Function(
+        InstrumentedFunction(
             self,
-            "slow_init_lambda",
+            "slow_init",
             function_name="slow_init",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            log_group=slow_init_log_group,
-            code=lambda_.Code.from_inline(
-                dedent(
-                    """\
-                    from time import sleep
-
-                    sleep(4)
-
-                    def handler(event, context):
-                        return "hi there"
-                    """
-                )
-            ),
+            instrument_handler=False,
+            legacy_ids=("slow_init_log_group", "slow_init_lambda"),
+            code=SLOW_INIT_HANDLER,
         )
 
-        init_exception_log_group = logs.LogGroup(
+        InstrumentedFunction(
             self,
-            "init_exception_log_group",
-            log_group_name="/aws/lambda/init_exception",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
-
-        lambda_.Function(
-            self,
-            "init_exception_lambda",
+            "init_exception",
             function_name="init_exception",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            log_group=init_exception_log_group,
-            code=lambda_.Code.from_inline(
-                dedent(
-                    """\
-                    raise Exception("uh oh")
-
-                    def handler(event, context):
-                        pass
-                    """
-                )
+            instrument_handler=False,
+            legacy_ids=("init_exception_log_group", "init_exception_lambda"),
+            code=dedent(
+                """\
+                raise Exception("uh oh")
+
+                def handler(event, context):
+                    pass
+                """
             ),
         )
 
-        handler_exception_log_group = logs.LogGroup(
+        InstrumentedFunction(
             self,
-            "handler_exception_log_group",
-            log_group_name="/aws/lambda/handler_exception",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
-
-        lambda_.Function(
-            self,
-            "handler_exception_lambda",
+            "handler_exception",
             function_name="handler_exception",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            log_group=handler_exception_log_group,
-            code=lambda_.Code.from_inline(
-                dedent(
-                    """\
-                    def handler(event, context):
-                        raise Exception("uh oh")
-                    """
-                )
+            instrument_handler=False,
+            legacy_ids=("handler_exception_log_group", "handler_exception_lambda"),
+            code=dedent(
+                """\
+                def handler(event, context):
+                    raise Exception("uh oh")
+                """
             ),
         )
 
-        init_times_out_log_group = logs.LogGroup(
+        InstrumentedFunction(
             self,
-            "init_times_out_log_group",
-            log_group_name="/aws/lambda/init_times_out",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
-
-        lambda_.Function(
-            self,
-            "init_times_out_lambda",
+            "init_times_out",
             function_name="init_times_out",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            log_group=init_times_out_log_group,
-            code=lambda_.Code.from_inline(
-                dedent(
-                    """\
-                    from time import sleep
-
-                    sleep(11)
-
-                    def handler(event, context):
-                        pass
-                    """
-                )
-            ),
-        )
+            instrument_handler=False,
+            legacy_ids=("init_times_out_log_group", "init_times_out_lambda"),
+            code=dedent(
+                """\
+                from time import sleep
 
-        handler_times_out_log_group = logs.LogGroup(
-            self,
-            "handler_times_out_log_group",
-            log_group_name="/aws/lambda/handler_times_out",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
+                sleep(11)
+
+                def handler(event, context):
+                    pass
+                """
+            ),
         )
 
-        lambda_.Function(
+        InstrumentedFunction(
             self,
-            "handler_times_out_lambda",
+            "handler_times_out",
             function_name="handler_times_out",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
+            instrument_handler=False,
+            legacy_ids=("handler_times_out_log_group", "handler_times_out_lambda"),
             timeout=Duration.seconds(3),
-            log_group=handler_times_out_log_group,
-            code=lambda_.Code.from_inline(
-                dedent(
-                    """\
-                    from time import sleep
-
-                    def handler(event, context):
-                        sleep(4)
-                    """
-                )
-            ),
-        )
+            code=dedent(
+                """\
+                from time import sleep
 
-        handler_returns_unserializable_log_group = logs.LogGroup(
-            self,
-            "handler_returns_unserializable_log_group",
-            log_group_name="/aws/lambda/handler_returns_unserializable",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
+                def handler(event, context):
+                    sleep(4)
+                """
+            ),
         )
 
-        lambda_.Function(
+        InstrumentedFunction(
             self,
-            "handler_returns_unserializable_lambda",
+            "handler_returns_unserializable",
             function_name="handler_returns_unserializable",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
+            instrument_handler=False,
+            legacy_ids=("handler_returns_unserializable_log_group", "handler_returns_unserializable_lambda"),
             timeout=Duration.seconds(3),
-            log_group=handler_returns_unserializable_log_group,
-            code=lambda_.Code.from_inline(
-                dedent(
-                    """\
-                    def handler(event, context):
-                        return set()
-                    """
-                )
+            code=dedent(
+                """\
+                def handler(event, context):
+                    return set()
+                """
             ),
         )
 
-        init_plus_handler_exceeds_timeout_log_group = logs.LogGroup(
+        InstrumentedFunction(
             self,
-            "init_plus_handler_exceeds_timeout_log_group",
-            log_group_name="/aws/lambda/init_plus_handler_exceeds_timeout",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
-
-        lambda_.Function(
-            self,
-            "init_plus_handler_exceeds_timeout_lambda",
+            "init_plus_handler_exceeds_timeout",
             function_name="init_plus_handler_exceeds_timeout",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            log_group=init_plus_handler_exceeds_timeout_log_group,
+            instrument_handler=False,
+            legacy_ids=("init_plus_handler_exceeds_timeout_log_group", "init_plus_handler_exceeds_timeout_lambda"),
             timeout=Duration.seconds(3),
-            code=lambda_.Code.from_inline(
-                dedent(
-                    """\
-                    from time import sleep
+            code=dedent(
+                """\
+                from time import sleep
 
-                    sleep(2)
+                sleep(2)
 
-                    def handler(event, context):
-                        sleep(2)
-                    """
-                )
+                def handler(event, context):
+                    sleep(2)
+                """
             ),
         )
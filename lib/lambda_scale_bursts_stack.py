@@ -0,0 +1,45 @@
+# WARN: remember to destroy this stack! The alias keeps at least one environment provisioned.
+
+from textwrap import dedent
+
+from aws_cdk import Stack
+from aws_cdk import aws_lambda as lambda_
+from constructs import Construct
+
+from lib.instrumented_function import InstrumentedFunction
+
+
+class LambdaScaleBurstsStack(Stack):
+    def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        # quick, like the 20-100 ms functions in the docs' example of bursts that don't trigger scaling
+        scale_bursts = InstrumentedFunction(
+            self,
+            "scale_bursts",
+            function_name="scale_bursts",
+            code=dedent(
+                """\
+                from time import sleep
+
+                def handler(event, context):
+                    sleep(event.get("sleep_ms", 50) / 1000)
+                """
+            ),
+            # caps the cost of a runaway load test, and makes throttles visible
+            reserved_concurrent_executions=20,
+        )
+
+        # auto scaling can't target $LATEST, so we need an alias
+        scale_bursts_alias = lambda_.Alias(
+            self,
+            "scale_bursts_alias",
+            alias_name="live",
+            version=scale_bursts.function.current_version,
+        )
+
+        scale_bursts_target = scale_bursts_alias.add_auto_scaling(
+            min_capacity=1,  # WARN: remember to tear down the stack!
+            max_capacity=10,
+        )
+        scale_bursts_target.scale_on_utilization(utilization_target=0.5)
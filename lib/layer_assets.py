@@ -0,0 +1,22 @@
+"""
+Layer asset code, hashed via the fingerprint manifests in lib.fingerprints.
+"""
+
+from pathlib import Path
+
+from aws_cdk import AssetHashType
+from aws_cdk import aws_lambda as lambda_
+
+from lib.fingerprints import update_fingerprint
+
+
+def layer_code(layer_dir: Path, use_fingerprint: bool = True) -> lambda_.Code:
+    "Code for a layer directory, hashed via its fingerprint manifest."
+    if not use_fingerprint:
+        return lambda_.Code.from_asset(str(layer_dir))
+
+    return lambda_.Code.from_asset(
+        str(layer_dir),
+        asset_hash=update_fingerprint(layer_dir),
+        asset_hash_type=AssetHashType.CUSTOM,
+    )
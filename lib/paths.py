@@ -0,0 +1,10 @@
+"""
+Where the layers live.
+
+No cdk imports here, so scripts that only need the paths don't pay for loading jsii.
+"""
+
+from pathlib import Path
+
+LAYERS_DIR = Path(__file__).parent / "resources" / "layers"
+BUILT_LAYERS_DIR = Path(__file__).parent / "resources" / "built-layers"
@@ -0,0 +1,53 @@
+from importlib import import_module
+
+from aws_cdk import Stack
+
+from lib.paths import BUILT_LAYERS_DIR, LAYERS_DIR
+
+# stack id -> (module, class name)
+# the modules are imported lazily, so only the selected stacks pay for their imports and assets
+STACKS = {
+    "LambdaRetriesStack": ("lib.lambda_retries_stack", "LambdaRetriesStack"),
+    "SnsPublishPermissionsStack": ("lib.sns_publish_permissions_stack", "SnsPublishPermissionsStack"),
+    "LambdaResponsesAndLogsStack": ("lib.lambda_responses_and_logs_stack", "LambdaResponsesAndLogsStack"),
+    "LambdaEphemeralStorageStack": ("lib.lambda_ephemeral_storage_stack", "LambdaEphemeralStorage"),
+    "LambdaWhoWhatWhereStack": ("lib.lambda_who_what_where_stack", "LambdaWhoWhatWhereStack"),
+    "LambdaLayerMergingStack": ("lib.lambda_layer_merging_stack", "LambdaLayerMergingStack"),
+    "LambdaScaleFromZeroStack": ("lib.lambda_scale_from_zero_stack", "LambdaScaleFromZeroStack"),
+    "LambdaLayerBytecodeStack": ("lib.lambda_layer_bytecode_stack", "LambdaLayerBytecodeStack"),
+    "LambdaMemorySweepStack": ("lib.lambda_memory_sweep_stack", "LambdaMemorySweepStack"),
+    "LambdaScaleBurstsStack": ("lib.lambda_scale_bursts_stack", "LambdaScaleBurstsStack"),
+}
+
+# stacks that need a build step first, or cost money while deployed, so they're only built when selected explicitly
+OPT_IN = {"LambdaLayerBytecodeStack", "LambdaScaleBurstsStack"}
+
+# the directories each stack stages as assets, so changes to them invalidate cached synths
+ASSET_DIRS = {
+    # the dedup build is the only built layer it deploys, with `-c layer_build=dedup`
+    "LambdaLayerMergingStack": [LAYERS_DIR / "requests-2-30", LAYERS_DIR / "requests-2-31", BUILT_LAYERS_DIR / "dedup"],
+    "LambdaLayerBytecodeStack": [LAYERS_DIR / "requests-2-31", BUILT_LAYERS_DIR / "bytecode"],
+    "LambdaMemorySweepStack": [LAYERS_DIR / "requests-2-31"],
+}
+
+
+def get_stack_class(stack_id: str) -> type[Stack]:
+    module_name, class_name = STACKS[stack_id]
+    return getattr(import_module(module_name), class_name)
+
+
+def select_stacks(selector: str | None) -> list[str]:
+    """
+    Parse a comma-separated list of stack ids, e.g. from `-c stacks=LambdaRetriesStack,LambdaWhoWhatWhereStack`.
+
+    No selector means all stacks, except the opt-in ones.
+    """
+    if not selector:
+        return [stack_id for stack_id in STACKS if stack_id not in OPT_IN]
+
+    selected = [stack_id.strip() for stack_id in selector.split(",") if stack_id.strip()]
+    unknown = [stack_id for stack_id in selected if stack_id not in STACKS]
+    if unknown:
+        raise ValueError(f"Unknown stacks {unknown}. Choose from {list(STACKS)}.")
+
+    return selected
@@ -0,0 +1,236 @@
+"""
+Evaluate SNS topic policies offline: can this principal, from this source, publish to this topic?
+
+sns_publish_permissions finds out by deploying, publishing and waiting minutes for alarm history and metrics.
+The answer is in the topic policy and the request context the publishing service sends, so we can work it out in microseconds instead,
+e.g. for every alarm, rule and topic in a synthesized stack.
+
+A request context is the principal, the action, the resource and the condition keys.
+Services publishing on behalf of a resource send `aws:SourceArn` and `aws:SourceAccount`.
+Only some send the deprecated `AWS:SourceOwner`, which the default topic policy relies on:
+cloudwatch does, eventbridge doesn't [1].
+
+Evaluation follows IAM's logic, for the subset of the policy language topic policies use:
+- an explicit deny wins, then an allow, else the request is implicitly denied,
+- `Principal`/`NotPrincipal`, `Action`/`NotAction` and `Resource`/`NotResource`, with `*` and `?` wildcards,
+- the string, arn, `Bool` and `Null` condition operators, with `IfExists`,
+- several values for a key match if any does, and several keys or operators must all match.
+
+Policies are compiled once and cached by their json, so checking many combinations stays cheap.
+
+[1] https://docs.aws.amazon.com/sns/latest/dg/sns-access-policy-use-cases.html#sns-allow-specified-service-to-publish-to-topic
+"""
+
+import json
+import re
+from collections.abc import Callable
+from functools import cache, lru_cache
+from typing import Literal, NamedTuple
+
+Decision = Literal["allow", "explicit_deny", "implicit_deny"]
+
+# services known to send `AWS:SourceOwner`, per sns_publish_permissions and [1]
+SOURCE_OWNER_SERVICES = frozenset({"cloudwatch.amazonaws.com"})
+
+
+class Request(NamedTuple):
+    # e.g. `cloudwatch.amazonaws.com` for a service, or an iam arn
+    principal: str
+    action: str
+    resource: str
+    # condition keys, lowercased, to values
+    context: dict[str, list[str]]
+
+
+def publish_request(topic_arn: str, service: str, source_arn: str, source_account: str) -> Request:
+    "The request a service makes to publish to a topic on behalf of a source, e.g. an alarm or a rule."
+    context = {"aws:sourcearn": [source_arn], "aws:sourceaccount": [source_account]}
+    if service in SOURCE_OWNER_SERVICES:
+        context["aws:sourceowner"] = [source_account]
+    return Request(principal=service, action="SNS:Publish", resource=topic_arn, context=context)
+
+
+def get_default_policy(topic_arn: str) -> dict:
+    "The policy sns gives a topic created without one, as sns_publish_permissions fetched for `pre_existing_topic`."
+    account = topic_arn.split(":")[4]
+    return {
+        "Version": "2008-10-17",
+        "Id": "__default_policy_ID",
+        "Statement": [
+            {
+                "Sid": "__default_statement_ID",
+                "Effect": "Allow",
+                "Principal": {"AWS": "*"},
+                "Action": [
+                    "SNS:GetTopicAttributes",
+                    "SNS:SetTopicAttributes",
+                    "SNS:AddPermission",
+                    "SNS:RemovePermission",
+                    "SNS:DeleteTopic",
+                    "SNS:Subscribe",
+                    "SNS:ListSubscriptionsByTopic",
+                    "SNS:Publish",
+                ],
+                "Resource": topic_arn,
+                "Condition": {"StringEquals": {"AWS:SourceOwner": account}},
+            }
+        ],
+    }
+
+
+def as_list(value) -> list:
+    return value if isinstance(value, list) else [value]
+
+
+@cache
+def compile_pattern(pattern: str, ignore_case: bool) -> re.Pattern:
+    "Compile a policy pattern, where `*` matches any run of characters and `?` any one character."
+    regex = "".join(".*" if char == "*" else "." if char == "?" else re.escape(char) for char in pattern)
+    return re.compile(regex, re.IGNORECASE | re.DOTALL if ignore_case else re.DOTALL)
+
+
+def compile_patterns(patterns, ignore_case: bool = False) -> Callable[[str], bool]:
+    compiled = [compile_pattern(pattern, ignore_case) for pattern in as_list(patterns)]
+    return lambda value: any(pattern.fullmatch(value) for pattern in compiled)
+
+
+def compile_principal(principal) -> Callable[[str], bool]:
+    if principal == "*":
+        return lambda _: True
+    patterns: list[str] = []
+    for kind, values in principal.items():
+        for value in as_list(values):
+            if kind == "AWS" and value == "*":
+                # `{"AWS": "*"}` is the same as `"*"`, and matches services too
+                return lambda _: True
+            if kind == "AWS" and value.isdigit():
+                # an account id stands for the account's root, i.e. anyone in the account
+                value = f"arn:aws:iam::{value}:*"
+            elif kind == "AWS" and value.endswith(":root"):
+                value = value.removesuffix("root") + "*"
+            patterns.append(value)
+    return compile_patterns(patterns)
+
+
+def compile_values(values: list[str], kind: str) -> Callable[[str], bool]:
+    "Compile a condition's values for one key, for an operator with `Not` and `IfExists` stripped, e.g. `StringLike`."
+    if kind == "StringEquals":
+        exact = set(values)
+        return lambda actual: actual in exact
+    if kind in ("StringEqualsIgnoreCase", "Bool"):
+        folded = {value.casefold() for value in values}
+        return lambda actual: actual.casefold() in folded
+    if kind in ("StringLike", "ArnLike", "ArnEquals"):
+        # the arn operators both match wildcards
+        return compile_patterns(values)
+    raise ValueError(f"Unsupported condition operator {kind}.")
+
+
+def compile_operator(operator: str, key_values: dict) -> Callable[[dict[str, list[str]]], bool]:
+    "Compile one operator's block of a `Condition`, e.g. `StringEquals`, to a predicate on the request context."
+    if operator.startswith(("ForAnyValue:", "ForAllValues:")):
+        raise ValueError(f"Unsupported condition operator {operator}.")
+    if_exists = operator.endswith("IfExists")
+    base = operator.removesuffix("IfExists")
+    negated = "Not" in base
+    kind = base.replace("Not", "")
+
+    checks: list[tuple[str, Callable[[str], bool] | None, bool | None]] = []
+    for key, values in key_values.items():
+        key = key.lower()
+        values = [str(value).lower() if isinstance(value, bool) else str(value) for value in as_list(values)]
+
+        if kind == "Null":
+            # `Null: true` means the key must be absent
+            checks.append((key, None, values == ["true"]))
+            continue
+        match = compile_values(values, kind)
+        checks.append((key, match, None))
+
+    def check(context: dict[str, list[str]]) -> bool:
+        for key, match, must_be_absent in checks:
+            actual = context.get(key)
+            if match is None:
+                if (actual is None) != must_be_absent:
+                    return False
+                continue
+            if actual is None:
+                # a missing key matches nothing, so negated operators pass
+                if not (if_exists or negated):
+                    return False
+                continue
+            matched = any(match(value) for value in actual)
+            if matched == negated:
+                return False
+        return True
+
+    return check
+
+
+class Statement(NamedTuple):
+    effect: str
+    principal: Callable[[str], bool]
+    action: Callable[[str], bool]
+    resource: Callable[[str], bool]
+    conditions: list[Callable[[dict[str, list[str]]], bool]]
+
+    def applies(self, request: Request) -> bool:
+        return (
+            self.principal(request.principal)
+            and self.action(request.action)
+            and self.resource(request.resource)
+            and all(condition(request.context) for condition in self.conditions)
+        )
+
+
+def compile_statement(statement: dict) -> Statement:
+    def either(name: str, compile_: Callable[[object], Callable[[str], bool]]) -> Callable[[str], bool]:
+        if name in statement:
+            return compile_(statement[name])
+        if f"Not{name}" in statement:
+            match = compile_(statement[f"Not{name}"])
+            return lambda value: not match(value)
+        return lambda _: True
+
+    return Statement(
+        effect=statement["Effect"],
+        principal=either("Principal", compile_principal),
+        # actions are case-insensitive, resources aren't
+        action=either("Action", lambda actions: compile_patterns(actions, ignore_case=True)),
+        resource=either("Resource", compile_patterns),
+        conditions=[compile_operator(operator, key_values) for operator, key_values in statement.get("Condition", {}).items()],
+    )
+
+
+class Policy:
+    def __init__(self, document: dict) -> None:
+        self.statements = [compile_statement(statement) for statement in as_list(document["Statement"])]
+
+    def evaluate(self, request: Request) -> Decision:
+        decision: Decision = "implicit_deny"
+        for statement in self.statements:
+            if statement.applies(request):
+                if statement.effect == "Deny":
+                    return "explicit_deny"
+                decision = "allow"
+        return decision
+
+    def allows(self, request: Request) -> bool:
+        return self.evaluate(request) == "allow"
+
+
+@lru_cache(maxsize=1024)
+def compile_policy_json(document_json: str) -> Policy:
+    return Policy(json.loads(document_json))
+
+
+def get_policy(document: dict | str) -> Policy:
+    "Get a compiled policy, e.g. from a template's `PolicyDocument` or `get_topic_attributes`' `Policy`, cached by its json."
+    if isinstance(document, str):
+        document = json.loads(document)
+    return compile_policy_json(json.dumps(document, sort_keys=True))
+
+
+def can_publish(document: dict | str, topic_arn: str, service: str, source_arn: str, source_account: str) -> bool:
+    "E.g. can `cloudwatch.amazonaws.com` publish to `my_topic` for an alarm in our account?"
+    return get_policy(document).allows(publish_request(topic_arn, service, source_arn, source_account))
@@ -3,12 +3,12 @@ from aws_cdk import aws_cloudwatch as cloudwatch
 from aws_cdk import aws_cloudwatch_actions as cloudwatch_actions
 from aws_cdk import aws_events as events
 from aws_cdk import aws_events_targets as targets
-from aws_cdk import aws_lambda as lambda_
-from aws_cdk import aws_logs as logs
 from aws_cdk import aws_sns as sns
 from aws_cdk import aws_sns_subscriptions as subscriptions
 from constructs import Construct
 
+from lib.instrumented_function import InstrumentedFunction
+
 
 class SnsPublishPermissionsStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
@@ -23,42 +23,21 @@ class SnsPublishPermissionsStack(Stack):
 
         # the target lambdas' are merely sns targets: one for the pre-existing topic and one for the new topic
         # it's convenient to use a lambda for this (over, say, email) because we can easily check delivery
-        # we set up the log group separately so we can configure the removal policy
-        pre_existing_topic_target_lambda_log_group = logs.LogGroup(
-            self,
-            "PreExistingTopicTargetLambdaLogGroup",
-            log_group_name="/aws/lambda/pre_existing_topic_target",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
-
-        pre_existing_topic_target_lambda = lambda_.Function(
+        pre_existing_topic_target_lambda = InstrumentedFunction(
             self,
-            "PreExistingTopicTargetLambda",
+            "pre_existing_topic_target",
             function_name="pre_existing_topic_target",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            log_group=pre_existing_topic_target_lambda_log_group,
-            code=lambda_.Code.from_inline("def handler(event, context): pass"),
-        )
+            legacy_ids=("PreExistingTopicTargetLambdaLogGroup", "PreExistingTopicTargetLambda"),
+            code="def handler(event, context): pass",
+        ).function
 
-        topic_target_lambda_log_group = logs.LogGroup(
+        topic_target_lambda = InstrumentedFunction(
             self,
-            "TopicTargetLambdaLogGroup",
-            log_group_name="/aws/lambda/topic_target",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
-
-        topic_target_lambda = lambda_.Function(
-            self,
-            "TopicTargetLambda",
+            "topic_target",
             function_name="topic_target",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            log_group=topic_target_lambda_log_group,
-            code=lambda_.Code.from_inline("def handler(event, context): pass"),
-        )
+            legacy_ids=("TopicTargetLambdaLogGroup", "TopicTargetLambda"),
+            code="def handler(event, context): pass",
+        ).function
 
         # this adds the subscription, and updates the target lambda's resource policy to allow the topic to invoke it
         # i'm surprised you can modify resources defined outside the stack
@@ -86,23 +65,13 @@ class SnsPublishPermissionsStack(Stack):
 
         # we want to test if cloudwatch can publish to the sns topics
         # so create an alarm based on a noop lambda, and have the alarm try to publish to the topic
-        noop_lambda_log_group = logs.LogGroup(
-            self,
-            "NoopLogGroup",
-            log_group_name="/aws/lambda/noop",
-            removal_policy=RemovalPolicy.DESTROY,
-            retention=logs.RetentionDays.ONE_DAY,
-        )
-
-        noop_lambda = lambda_.Function(
+        noop_lambda = InstrumentedFunction(
             self,
-            "NoopLambda",
+            "noop",
             function_name="noop",
-            runtime=lambda_.Runtime.PYTHON_3_13,
-            handler="index.handler",
-            log_group=noop_lambda_log_group,
-            code=lambda_.Code.from_inline("def handler(event, context): pass"),
-        )
+            legacy_ids=("NoopLogGroup", "NoopLambda"),
+            code="def handler(event, context): pass",
+        ).function
 
         lambda_invocations_alarm = cloudwatch.Alarm(
             self,
@@ -0,0 +1,43 @@
+from aws_cdk import aws_lambda as lambda_
+from constructs import Construct
+
+from lib.instrumented_function import InstrumentedFunction
+
+DEFAULT_MEMORY_SIZES = (128, 512, 1024, 2048)
+DEFAULT_ARCHITECTURES = (lambda_.Architecture.ARM_64, lambda_.Architecture.X86_64)
+
+
+def get_variant_name(function_name: str, memory_size: int, architecture: lambda_.Architecture) -> str:
+    "E.g. `slow_init__m1024__arm64`. Double underscores so the parts can be split back out (see notebooks/helpers/variants.py)."
+    return f"{function_name}__m{memory_size}__{architecture.name}"
+
+
+def sweep(
+    scope: Construct,
+    function_name: str,
+    code: str,
+    memory_sizes=DEFAULT_MEMORY_SIZES,
+    architectures=DEFAULT_ARCHITECTURES,
+    **function_kwargs,
+) -> dict[str, InstrumentedFunction]:
+    """
+    Define one copy of a function per memory size and architecture.
+
+    `code` and `function_kwargs` are as for `InstrumentedFunction`.
+    Returns the copies by function name.
+    """
+    variants = {}
+    for memory_size in memory_sizes:
+        for architecture in architectures:
+            variant_name = get_variant_name(function_name, memory_size, architecture)
+            variants[variant_name] = InstrumentedFunction(
+                scope,
+                variant_name,
+                function_name=variant_name,
+                code=code,
+                memory_size=memory_size,
+                architecture=architecture,
+                **function_kwargs,
+            )
+
+    return variants
@@ -0,0 +1,169 @@
+"""
+Reuse synthesized stacks whose inputs haven't changed.
+
+A stack's cache key hashes
+- its module's source (which includes the inline handler code) and the `lib` modules it imports,
+- the paths, sizes and mtimes of the files in its asset directories,
+- the cdk context and the aws-cdk-lib version.
+
+After a synth, each built stack's manifest entries, and the files they name (template, metadata, asset manifest, staged assets),
+are copied into the cache.
+On the next synth, a stack with a cached key isn't built at all: its artifacts are copied back into the cloud assembly.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+from importlib import metadata
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = REPO_ROOT / ".cdk-synth-cache"
+
+
+def get_local_imports(module_name: str) -> set[Path]:
+    "Get the source files of a `lib` module and the `lib` modules it imports, transitively."
+    seen: set[Path] = set()
+    to_visit = [module_name]
+    while to_visit:
+        path = REPO_ROOT / (to_visit.pop().replace(".", "/") + ".py")
+        if path in seen or not path.exists():
+            continue
+        seen.add(path)
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.ImportFrom) and node.module == "lib":
+                # e.g. `from lib import sns_policy`
+                to_visit.extend(f"lib.{alias.name}" for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("lib."):
+                to_visit.append(node.module)
+            elif isinstance(node, ast.Import):
+                to_visit.extend(alias.name for alias in node.names if alias.name.startswith("lib."))
+
+    return seen
+
+
+def hash_asset_dir(digest, asset_dir: Path) -> None:
+    "Feed file paths, sizes and mtimes to the digest. Much cheaper than hashing contents."
+    for root, dirs, files in os.walk(asset_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".fingerprint.json"):
+                # rewritten by the synth itself (see lib.fingerprints), and derived from the files next to it anyway
+                continue
+            path = Path(root) / name
+            stat = path.stat()
+            digest.update(f"{path.relative_to(asset_dir)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+
+
+def get_context_fingerprint() -> str:
+    "Everything outside lib/ that can change a template."
+    digest = hashlib.sha256()
+    for name in ("cdk.json", "cdk.context.json"):
+        path = REPO_ROOT / name
+        if path.exists():
+            digest.update(path.read_bytes())
+    # the cdk cli passes context (including -c flags) via these
+    digest.update(os.environ.get("CDK_CONTEXT_JSON", "").encode())
+    overflow = os.environ.get("CONTEXT_OVERFLOW_LOCATION_ENV")
+    if overflow and Path(overflow).exists():
+        digest.update(Path(overflow).read_bytes())
+    for name in ("ACCOUNT_ID", "REGION"):
+        digest.update(os.environ.get(name, "").encode())
+    digest.update(metadata.version("aws-cdk-lib").encode())
+
+    return digest.hexdigest()
+
+
+class SynthCache:
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.context_fingerprint = get_context_fingerprint()
+
+    def key(self, module_name: str, asset_dirs: list[Path]) -> str:
+        digest = hashlib.sha256(self.context_fingerprint.encode())
+        for path in sorted(get_local_imports(module_name)):
+            digest.update(path.read_bytes())
+        for asset_dir in asset_dirs:
+            hash_asset_dir(digest, asset_dir)
+
+        return digest.hexdigest()
+
+    def entry_dir(self, stack_id: str, key: str) -> Path:
+        return self.cache_dir / stack_id / key
+
+    def has(self, stack_id: str, key: str) -> bool:
+        return (self.entry_dir(stack_id, key) / "artifacts.json").exists()
+
+    def store(self, assembly_dir: Path, stack_id: str, key: str) -> None:
+        "Copy a freshly synthesized stack's artifacts out of the cloud assembly."
+        manifest = json.loads((assembly_dir / "manifest.json").read_text())
+        artifacts = get_stack_artifacts(manifest, stack_id)
+
+        # replace any stale entry for this stack: only the latest key is worth keeping
+        shutil.rmtree(self.cache_dir / stack_id, ignore_errors=True)
+        entry_dir = self.entry_dir(stack_id, key)
+        entry_dir.mkdir(parents=True)
+        for relative_path in get_artifact_files(assembly_dir, artifacts):
+            copy(assembly_dir / relative_path, entry_dir / relative_path)
+        (entry_dir / "artifacts.json").write_text(json.dumps(artifacts))
+
+    def restore(self, assembly_dir: Path, stack_id: str, key: str) -> None:
+        "Copy a cached stack's artifacts into the cloud assembly and register them in its manifest."
+        entry_dir = self.entry_dir(stack_id, key)
+        for path in entry_dir.iterdir():
+            if path.name != "artifacts.json":
+                copy(path, assembly_dir / path.name)
+
+        manifest_path = assembly_dir / "manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        manifest.setdefault("artifacts", {}).update(json.loads((entry_dir / "artifacts.json").read_text()))
+        manifest_path.write_text(json.dumps(manifest, indent=2))
+
+
+def get_stack_artifacts(manifest: dict, stack_id: str) -> dict:
+    "Get the manifest entries for a stack and the artifacts it depends on, e.g. its asset manifest."
+    artifacts = manifest["artifacts"]
+    selected = {}
+    to_visit = [stack_id]
+    while to_visit:
+        artifact_id = to_visit.pop()
+        if artifact_id in selected or artifact_id not in artifacts:
+            continue
+        selected[artifact_id] = artifacts[artifact_id]
+        to_visit.extend(artifacts[artifact_id].get("dependencies", []))
+
+    return selected
+
+
+def get_artifact_files(assembly_dir: Path, artifacts: dict) -> set[str]:
+    """
+    Get the assembly-relative paths of the files the artifacts need.
+
+    That's every file they or their properties name, e.g. `additionalMetadataFile`, `templateFile` and an asset manifest's `file`,
+    and the staged assets the asset manifests name.
+    """
+    files = set()
+    for artifact in artifacts.values():
+        properties = artifact.get("properties", {})
+        for value in [*artifact.values(), *properties.values()]:
+            if isinstance(value, str) and not Path(value).is_absolute() and (assembly_dir / value).is_file():
+                files.add(value)
+        if artifact.get("type") == "cdk:asset-manifest":
+            asset_manifest = json.loads((assembly_dir / properties["file"]).read_text())
+            for asset in asset_manifest.get("files", {}).values():
+                if "path" in asset["source"]:
+                    files.add(asset["source"]["path"])
+            for asset in asset_manifest.get("dockerImages", {}).values():
+                if "directory" in asset["source"]:
+                    files.add(asset["source"]["directory"])
+
+    return files
+
+
+def copy(source: Path, destination: Path) -> None:
+    if source.is_dir():
+        shutil.copytree(source, destination, dirs_exist_ok=True)
+    else:
+        shutil.copy2(source, destination)
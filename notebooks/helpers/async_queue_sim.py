@@ -0,0 +1,210 @@
+"""
+Simulate Lambda's internal queue for asynchronous invocations, on a virtual clock.
+
+lambda_retries takes many minutes of real time to show Lambda's retry schedules.
+This replays them in milliseconds (hours of traffic in about a second),
+so we can ask what-ifs (more traffic, less concurrency, a shorter maximum event age) without waiting on AWS.
+
+The model, from the docs [1] and the numbers lambda_retries measured:
+- an event is first tried shortly after it's enqueued (`dispatch_delay`),
+- a try that finds no free concurrency is throttled, and the event is requeued with jittered exponential backoff,
+  from 1 s, doubling, up to 5 min,
+- a try that errors (exception or timeout) is retried after about 1 min, then about 2 min, up to `maximum_retry_attempts`,
+- an event older than `maximum_event_age` (default 6 h) is dropped rather than tried,
+- with reserved concurrency 0, an event is dropped as soon as it's received, with no tries.
+
+Metrics come out per minute, in the shapes lambda_retries reads them:
+(sum, timestamp) pairs for counts, e.g. `Throttles`,
+and `get_metric_statistics`-style datapoints for `AsyncEventAge`, with `SampleCount`, `Minimum`, `Average` and `Maximum` in ms.
+
+[1] https://docs.aws.amazon.com/lambda/latest/dg/invocation-async-error-handling.html
+"""
+
+import datetime
+import heapq
+import random
+from collections.abc import Callable, Iterable
+
+# count metrics the simulation emits, like the AWS/Lambda ones of the same names, besides AsyncEventAge
+COUNT_METRICS = ["AsyncEventsReceived", "AsyncEventsDropped", "Invocations", "Errors", "Throttles"]
+
+TRY = 0
+FINISH = 1
+
+
+class Statistic:
+    "Running statistics for a minute of AsyncEventAge."
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def to_datapoint(self) -> dict:
+        return {
+            "SampleCount": float(self.count),
+            "Minimum": self.minimum,
+            "Average": self.total / self.count,
+            "Maximum": self.maximum,
+        }
+
+
+class AsyncQueueSimulator:
+    def __init__(
+        self,
+        duration: float,
+        reserved_concurrency: int | None = None,
+        account_concurrency: int = 1000,
+        fails: Callable[[int, int], bool] = lambda event_id, attempt: False,
+        maximum_retry_attempts: int = 2,
+        maximum_event_age: float = 6 * 60 * 60,
+        dispatch_delay: float = 0.03,
+        throttle_backoff_base: float = 1,
+        throttle_backoff_cap: float = 5 * 60,
+        error_retry_delays: tuple[float, ...] = (60, 120),
+        jitter: float = 0.1,
+        seed: int = 0,
+        start_time: datetime.datetime | None = None,
+    ) -> None:
+        """
+        `duration` is how long each invocation runs, in seconds.
+        `fails(event_id, attempt)` says whether the function errors on that attempt (counting from 0).
+        Throttle backoffs and error retry delays are stretched by a random factor between 1 and `1 + jitter`.
+        """
+        self.duration = duration
+        self.concurrency = account_concurrency if reserved_concurrency is None else reserved_concurrency
+        self.fails = fails
+        self.maximum_retry_attempts = maximum_retry_attempts
+        self.maximum_event_age = maximum_event_age
+        self.dispatch_delay = dispatch_delay
+        self.throttle_backoff_base = throttle_backoff_base
+        self.throttle_backoff_cap = throttle_backoff_cap
+        self.error_retry_delays = error_retry_delays
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.start_time = start_time or datetime.datetime.now(datetime.UTC).replace(second=0, microsecond=0)
+
+        # (time, sequence number, kind, event id) of tries and finishes: the sequence number breaks ties in scheduling order
+        # arrivals aren't scheduled, but merged in as they come due, so the heap only holds events in progress
+        self.schedule: list[tuple[float, int, int, int]] = []
+        self.sequence = 0
+        self.in_use = 0
+        # event id -> enqueue time, and tries so far of each kind
+        self.enqueued: dict[int, float] = {}
+        self.throttles: dict[int, int] = {}
+        self.errors: dict[int, int] = {}
+        # event id -> times of each try, and how the event ended: "succeeded", "retries_exhausted", "expired" or "dropped"
+        self.tries: dict[int, list[float]] = {}
+        self.outcomes: dict[int, str] = {}
+        # metric -> minute -> count
+        self.counts: dict[str, dict[int, int]] = {metric: {} for metric in COUNT_METRICS}
+        # minute -> ages, in ms
+        self.ages: dict[int, Statistic] = {}
+
+    def push(self, time: float, kind: int, event_id: int) -> None:
+        heapq.heappush(self.schedule, (time, self.sequence, kind, event_id))
+        self.sequence += 1
+
+    def count(self, metric: str, time: float) -> None:
+        counts = self.counts[metric]
+        minute = int(time // 60)
+        counts[minute] = counts.get(minute, 0) + 1
+
+    def stretch(self, delay: float) -> float:
+        return delay * (1 + self.random.random() * self.jitter)
+
+    def run(self, arrivals: Iterable[float]) -> "AsyncQueueSimulator":
+        """
+        Enqueue an event at each arrival time (seconds from the start) and run until every event has ended.
+
+        Arrivals must be in time order. They may be a generator, e.g. for hours of traffic.
+        """
+        arrivals = iter(arrivals)
+        next_arrival = next(arrivals, None)
+        event_id = 0
+        while self.schedule or next_arrival is not None:
+            # an arrival goes before a try or finish at the same time, as if it had been scheduled first
+            if next_arrival is not None and (not self.schedule or next_arrival <= self.schedule[0][0]):
+                self.arrive(next_arrival, event_id)
+                event_id += 1
+                next_arrival = next(arrivals, None)
+                continue
+
+            time, _, kind, scheduled_event_id = heapq.heappop(self.schedule)
+            if kind == TRY:
+                self.try_(time, scheduled_event_id)
+            else:
+                self.finish(time, scheduled_event_id)
+
+        return self
+
+    def arrive(self, time: float, event_id: int) -> None:
+        self.count("AsyncEventsReceived", time)
+        self.enqueued[event_id] = time
+        self.throttles[event_id] = 0
+        self.errors[event_id] = 0
+        self.tries[event_id] = []
+        if self.concurrency == 0:
+            # lambda_retries saw these dropped straight away, with no throttles and no retries
+            self.end(time, event_id, "dropped")
+            return
+        self.push(time + self.dispatch_delay, TRY, event_id)
+
+    def try_(self, time: float, event_id: int) -> None:
+        age = time - self.enqueued[event_id]
+        if age > self.maximum_event_age:
+            self.end(time, event_id, "expired")
+            return
+
+        minute = int(time // 60)
+        if minute not in self.ages:
+            self.ages[minute] = Statistic()
+        self.ages[minute].add(age * 1000)
+        self.tries[event_id].append(time)
+        if self.in_use >= self.concurrency:
+            self.count("Throttles", time)
+            backoff = min(self.throttle_backoff_base * 2 ** self.throttles[event_id], self.throttle_backoff_cap)
+            self.throttles[event_id] += 1
+            self.push(time + self.stretch(backoff), TRY, event_id)
+            return
+
+        self.in_use += 1
+        self.count("Invocations", time)
+        self.push(time + self.duration, FINISH, event_id)
+
+    def finish(self, time: float, event_id: int) -> None:
+        self.in_use -= 1
+        attempt = self.errors[event_id]
+        if not self.fails(event_id, attempt):
+            self.end(time, event_id, "succeeded")
+            return
+
+        self.count("Errors", time)
+        self.errors[event_id] += 1
+        if attempt >= self.maximum_retry_attempts:
+            self.end(time, event_id, "retries_exhausted")
+            return
+        self.push(time + self.stretch(self.error_retry_delays[min(attempt, len(self.error_retry_delays) - 1)]), TRY, event_id)
+
+    def end(self, time: float, event_id: int, outcome: str) -> None:
+        self.outcomes[event_id] = outcome
+        if outcome != "succeeded":
+            self.count("AsyncEventsDropped", time)
+
+    def get_timestamp(self, minute: int) -> datetime.datetime:
+        return self.start_time + datetime.timedelta(minutes=minute)
+
+    def async_event_age(self) -> list[dict]:
+        "Get per-minute AsyncEventAge datapoints, in time order, like lambda_retries' `get_async_event_age_metric`."
+        return [{"Timestamp": self.get_timestamp(minute), **statistic.to_datapoint()} for minute, statistic in sorted(self.ages.items())]
+
+    def sums(self, metric: str) -> list[tuple[float, datetime.datetime]]:
+        "Get a count metric's per-minute (sum, timestamp) pairs, like lambda_retries' `get_metric_sum`."
+        return [(float(count), self.get_timestamp(minute)) for minute, count in sorted(self.counts[metric].items())]
@@ -0,0 +1,189 @@
+"""
+Record boto3 responses to disk, then replay them, so notebooks can be re-run (and re-exported) offline.
+
+Set `AWS_BY_EXAMPLE_CASSETTE` to choose the mode:
+- unset or `off`: clients are plain boto3 clients,
+- `record`: calls go to AWS, and each response (or error) is saved to the notebook's cassette,
+- `replay`: calls are answered from the cassette, with no network, and `sleep` returns immediately.
+
+A cassette is a gzipped file of json lines in notebooks/cassettes, named after the notebook, one line per interaction.
+Each interaction is appended as it's recorded, as a gzip member of its own,
+so recording costs the same per call however long the cassette gets,
+and nothing is lost when marimo's kernel exits, which it does without running `atexit` handlers.
+
+Responses are matched to calls by operation and parameters, ignoring time parameters, which differ on every run.
+Calls with the same operation and parameters (e.g. repeated polls) replay in the order they were recorded.
+A call that matches no unused recorded call is an error: the notebook has changed which calls it makes, so re-record.
+"""
+
+import base64
+import datetime
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import boto3
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+
+MODE_ENV_VAR = "AWS_BY_EXAMPLE_CASSETTE"
+CASSETTES_DIR = Path(__file__).resolve().parent.parent / "cassettes"
+
+# parameters that vary from run to run, so mustn't be used to match calls to responses
+TIME_PARAMETERS = {"StartTime", "EndTime", "StartDate", "EndDate", "startTime", "endTime"}
+
+# boto3-stubs only types clients for literal service names
+make_client: Callable[..., Any] = boto3.client
+
+
+def get_mode() -> str:
+    return os.environ.get(MODE_ENV_VAR, "off")
+
+
+def sleep(seconds: float) -> None:
+    "Like `time.sleep`, but a no-op when replaying: the responses we'd be waiting for are already recorded."
+    if get_mode() != "replay":
+        time.sleep(seconds)
+
+
+def encode(value):
+    "Make a response json-serializable, reading any streaming bodies."
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode()}
+    if isinstance(value, StreamingBody):
+        return {"__stream__": base64.b64encode(value.read()).decode()}
+    return value
+
+
+def decode(value):
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__datetime__" in value:
+        return datetime.datetime.fromisoformat(value["__datetime__"])
+    if "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    if "__stream__" in value:
+        data = base64.b64decode(value["__stream__"])
+        return StreamingBody(io.BytesIO(data), len(data))
+    return {key: decode(item) for key, item in value.items()}
+
+
+def get_params_key(params: dict) -> str:
+    stable = {key: value for key, value in params.items() if key not in TIME_PARAMETERS}
+    return json.dumps(encode(stable), sort_keys=True, default=str)
+
+
+class Cassette:
+    def __init__(self, name: str, mode: str | None = None):
+        self.mode = mode or get_mode()
+        self.path = CASSETTES_DIR / f"{name}.json.gz"
+        self.lock = threading.Lock()
+        # "service.operation" -> recorded interactions, in call order
+        self.interactions: dict[str, list[dict]] = {}
+        # "service.operation" -> indexes of interactions already replayed
+        self.used: dict[str, set[int]] = {}
+        # a recording replaces the cassette, once it records something
+        self.started = False
+
+        if self.mode == "replay":
+            if not self.path.exists():
+                raise FileNotFoundError(f"No cassette at {self.path}. Record one with {MODE_ENV_VAR}=record.")
+            with gzip.open(self.path, "rt") as f:
+                for line in f:
+                    interaction = json.loads(line)
+                    self.interactions.setdefault(interaction.pop("key"), []).append(interaction)
+
+    def client(self, service_name: str, **kwargs):
+        "A boto3 client whose calls, including those made by paginators and waiters, go through the cassette."
+        if self.mode == "off":
+            return make_client(service_name, **kwargs)
+
+        if self.mode == "replay":
+            # a client needs a region, even if it never makes a request
+            kwargs.setdefault("region_name", boto3.session.Session().region_name or "us-east-1")
+        client = make_client(service_name, **kwargs)
+        make_api_call = client._make_api_call
+
+        def recording_make_api_call(operation_name, params):
+            try:
+                response = make_api_call(operation_name, params)
+            except ClientError as err:
+                self.record(service_name, operation_name, params, error=err.response)
+                raise
+            return decode(self.record(service_name, operation_name, params, response=response))
+
+        def replaying_make_api_call(operation_name, params):
+            interaction = self.replay(service_name, operation_name, params)
+            if "error" in interaction:
+                error = decode(interaction["error"])
+                raise client.exceptions.from_code(error["Error"]["Code"])(error, operation_name)
+            return decode(interaction["response"])
+
+        # clients call their own _make_api_call, so patching the instance catches every call
+        client._make_api_call = recording_make_api_call if self.mode == "record" else replaying_make_api_call
+
+        return client
+
+    def memo(self, key: str, compute: Callable[[], object]) -> object:
+        """
+        Record the result of `compute`, rather than each call it makes, e.g. for a load test's thousands of invocations.
+
+        When replaying, return the recorded result without calling `compute`.
+        The result must be json-serializable, give or take the datetimes and bytes `encode` handles.
+        """
+        if self.mode == "off":
+            return compute()
+        if self.mode == "replay":
+            return decode(self.replay("memo", key, {})["response"])
+        return decode(self.record("memo", key, {}, response=compute()))
+
+    def record(self, service_name: str, operation_name: str, params: dict, response=None, error=None):
+        "Save the interaction and return the encoded response (a streaming body can only be read once)."
+        interaction = {"params": get_params_key(params)}
+        if error is not None:
+            interaction["error"] = encode(error)
+        else:
+            interaction["response"] = encode(response)
+
+        key = f"{service_name}.{operation_name}"
+        line = json.dumps({"key": key, **interaction}, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.interactions.setdefault(key, []).append(interaction)
+            if not self.started:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.unlink(missing_ok=True)
+                self.started = True
+            with gzip.open(self.path, "at") as f:
+                f.write(line)
+
+        return interaction.get("response")
+
+    def replay(self, service_name: str, operation_name: str, params: dict) -> dict:
+        key = f"{service_name}.{operation_name}"
+        params_key = get_params_key(params)
+        with self.lock:
+            interactions = self.interactions.get(key, [])
+            used = self.used.setdefault(key, set())
+            index = next(
+                (index for index, interaction in enumerate(interactions) if index not in used and interaction["params"] == params_key),
+                None,
+            )
+            if index is None:
+                raise LookupError(f"No recorded response left for {key} {params_key}. Re-record with {MODE_ENV_VAR}=record.")
+            used.add(index)
+
+        return interactions[index]
@@ -0,0 +1,78 @@
+"""
+Invoke several functions at once, recording when each call was sent and answered.
+
+A sync invocation blocks until the function finishes, init included,
+so invoking one function after another waits for the sum of their durations.
+Here invocations run in a thread pool, sharing one client (boto3 clients are thread-safe),
+so the wait is for the slowest.
+
+Where order matters, e.g. a warm start must follow a cold start, an invocation can wait for an earlier one to finish.
+"""
+
+import datetime
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import NamedTuple
+
+from botocore.exceptions import ClientError
+
+
+class InvocationResult(NamedTuple):
+    sent: datetime.datetime
+    received: datetime.datetime
+    # the invoke response, with the payload read into bytes, or None if the call raised
+    response: dict | None
+    error: ClientError | None
+
+
+class Clock:
+    "Wall-clock times with `perf_counter` precision: one wall-clock reading, then monotonic offsets from it."
+
+    def __init__(self) -> None:
+        self.wall = datetime.datetime.now(datetime.UTC)
+        self.start = time.perf_counter()
+
+    def now(self) -> datetime.datetime:
+        return self.wall + datetime.timedelta(seconds=time.perf_counter() - self.start)
+
+
+def invoke_all(lambda_, invocations: list[dict], max_workers: int = 10) -> list[InvocationResult]:
+    """
+    Invoke concurrently and get results in the same order as `invocations`.
+
+    Each invocation is keyword arguments for `lambda_.invoke`, plus optionally `after`,
+    the index of an earlier invocation which must be answered before this one is sent, e.g.
+
+        invoke_all(lambda_, [{"FunctionName": "slow_init"}, {"FunctionName": "slow_init", "after": 0}])
+
+    Client errors, e.g. `TooManyRequestsException`, are returned rather than raised.
+    Keep `max_workers` within the client's `max_pool_connections` (default 10), or calls queue for a connection.
+    """
+    clock = Clock()
+
+    def invoke(kwargs: dict, wait_for: Future | None) -> InvocationResult:
+        if wait_for is not None:
+            wait_for.result()
+        sent = clock.now()
+        try:
+            response = lambda_.invoke(**kwargs)
+            # the payload is streamed, so the call isn't answered until it's read
+            response["Payload"] = response["Payload"].read()
+        except ClientError as err:
+            return InvocationResult(sent, clock.now(), None, err)
+        return InvocationResult(sent, clock.now(), response, None)
+
+    for index, invocation in enumerate(invocations):
+        after = invocation.get("after")
+        if after is not None and not 0 <= after < index:
+            raise ValueError(f"Invocation {index} must come after an earlier invocation, not {after}.")
+
+    futures: list[Future] = []
+    # the pool starts tasks in submission order, and invocations only wait for earlier ones, so waiting can't deadlock
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for invocation in invocations:
+            kwargs = {key: value for key, value in invocation.items() if key != "after"}
+            after = invocation.get("after")
+            futures.append(executor.submit(invoke, kwargs, futures[after] if after is not None else None))
+
+    return [future.result() for future in futures]
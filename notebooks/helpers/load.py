@@ -0,0 +1,179 @@
+"""
+Put a function under controlled load: a request rate that follows a profile, or a fixed concurrency, for a set time.
+
+Rate-driven load is open-loop: requests are sent on schedule whether or not earlier ones have been answered,
+as real traffic is. (A closed loop, where each sender waits for its answer, sends less just when the function slows,
+and so hides the very latency and throttling we want to see.)
+If `max_in_flight` requests are outstanding when the next is due, it isn't sent, and is recorded as `OVERFLOW`,
+so a client bottleneck shows up in the results rather than silently reshaping the load.
+
+A profile is a function from seconds since the start to requests per second, e.g. `bursts(1, 50, 60, 300)`.
+
+Invocations are sync, so latency is the round trip, including any cold start.
+Use a client without retries, or throttles are retried away:
+
+    config = botocore.config.Config(retries={"total_max_attempts": 1}, max_pool_connections=max_in_flight)
+
+Each request is recorded in parallel arrays (send time, latency, outcome) and `summarize` buckets them into a time series.
+"""
+
+import statistics
+import threading
+import time
+from array import array
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+OK = 0
+THROTTLED = 1
+FUNCTION_ERROR = 2
+OTHER_ERROR = 3
+OVERFLOW = 4
+OUTCOMES = {OK: "ok", THROTTLED: "throttled", FUNCTION_ERROR: "function_error", OTHER_ERROR: "other_error", OVERFLOW: "overflow"}
+
+Profile = Callable[[float], float]
+
+
+def constant(rate: float) -> Profile:
+    return lambda t: rate
+
+
+def ramp(start_rate: float, end_rate: float, duration: float) -> Profile:
+    "Change linearly from `start_rate` to `end_rate` over `duration` seconds, then hold."
+    return lambda t: start_rate + (end_rate - start_rate) * min(t / duration, 1)
+
+
+def bursts(base_rate: float, burst_rate: float, burst_duration: float, period: float) -> Profile:
+    "Run at `burst_rate` for the first `burst_duration` seconds of every `period`, and at `base_rate` otherwise."
+    return lambda t: burst_rate if t % period < burst_duration else base_rate
+
+
+class LoadRecord:
+    "Per-request results, in the order they were answered: seconds from the start to the send, latency in ms, outcome."
+
+    def __init__(self) -> None:
+        self.sent = array("d")
+        self.latency_ms = array("d")
+        self.outcome = array("b")
+        self.lock = threading.Lock()
+
+    def add(self, sent: float, latency_ms: float, outcome: int) -> None:
+        with self.lock:
+            self.sent.append(sent)
+            self.latency_ms.append(latency_ms)
+            self.outcome.append(outcome)
+
+    def __len__(self) -> int:
+        return len(self.sent)
+
+    def summarize(self, bucket_seconds: float = 10) -> list[dict]:
+        "Count outcomes and summarize latencies of answered requests, per bucket of send time."
+
+        def empty_bucket() -> dict:
+            return {**{name: 0 for name in OUTCOMES.values()}, "latencies_ms": []}
+
+        buckets: dict[int, dict] = {}
+        for sent, latency_ms, outcome in zip(self.sent, self.latency_ms, self.outcome, strict=True):
+            bucket = buckets.setdefault(int(sent // bucket_seconds), empty_bucket())
+            bucket[OUTCOMES[outcome]] += 1
+            if outcome in (OK, FUNCTION_ERROR):
+                bucket["latencies_ms"].append(latency_ms)
+
+        rows = []
+        for index in range(max(buckets, default=-1) + 1):
+            bucket = buckets.get(index, empty_bucket())
+            latencies_ms = sorted(bucket.pop("latencies_ms"))
+            rows.append(
+                {
+                    "start_s": index * bucket_seconds,
+                    **bucket,
+                    "p50_ms": round(statistics.median(latencies_ms), 1) if latencies_ms else None,
+                    "p99_ms": round(latencies_ms[min(int(len(latencies_ms) * 0.99), len(latencies_ms) - 1)], 1) if latencies_ms else None,
+                    "max_ms": round(latencies_ms[-1], 1) if latencies_ms else None,
+                }
+            )
+
+        return rows
+
+
+def invoke_once(lambda_, function_name: str, qualifier: str | None, payload: bytes) -> int:
+    kwargs = {"FunctionName": function_name, "Payload": payload}
+    if qualifier:
+        kwargs["Qualifier"] = qualifier
+    try:
+        response = lambda_.invoke(**kwargs)
+        response["Payload"].read()
+    except ClientError as err:
+        return THROTTLED if err.response["Error"]["Code"] == "TooManyRequestsException" else OTHER_ERROR
+    except BotoCoreError:
+        # e.g. a read timeout
+        return OTHER_ERROR
+    return FUNCTION_ERROR if "FunctionError" in response else OK
+
+
+def run_rate(
+    lambda_,
+    function_name: str,
+    profile: Profile,
+    duration: float,
+    qualifier: str | None = None,
+    payload: bytes = b"{}",
+    max_in_flight: int = 100,
+) -> LoadRecord:
+    "Send requests at the profile's rate for `duration` seconds, then wait for the outstanding ones."
+    record = LoadRecord()
+    slots = threading.BoundedSemaphore(max_in_flight)
+    start = time.perf_counter()
+
+    def send(sent: float) -> None:
+        try:
+            outcome = invoke_once(lambda_, function_name, qualifier, payload)
+        finally:
+            slots.release()
+        record.add(sent, (time.perf_counter() - start - sent) * 1000, outcome)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        due = 0.0
+        while due < duration:
+            rate = profile(due)
+            if rate <= 0:
+                # the profile is paused, so check again shortly
+                due += 0.1
+                continue
+            delay = due - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            if slots.acquire(blocking=False):
+                executor.submit(send, due)
+            else:
+                record.add(due, 0.0, OVERFLOW)
+            # the next request is due one interval after this one was due, not sent, so a late send doesn't delay the rest
+            due += 1 / rate
+
+    return record
+
+
+def run_concurrency(
+    lambda_,
+    function_name: str,
+    concurrency: int,
+    duration: float,
+    qualifier: str | None = None,
+    payload: bytes = b"{}",
+) -> LoadRecord:
+    "Keep `concurrency` requests in flight for `duration` seconds: each sender invokes again as soon as it's answered."
+    record = LoadRecord()
+    start = time.perf_counter()
+
+    def sender() -> None:
+        while (sent := time.perf_counter() - start) < duration:
+            outcome = invoke_once(lambda_, function_name, qualifier, payload)
+            record.add(sent, (time.perf_counter() - start - sent) * 1000, outcome)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(sender)
+
+    return record
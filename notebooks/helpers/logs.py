@@ -0,0 +1,89 @@
+"""
+Fetch CloudWatch log events without dropping any.
+
+`filter_log_events` returns a page at a time, and a page may be empty even when more events follow,
+so callers must follow `nextToken` until it's absent.
+`filter_log_events` is throttled at a few calls per second per account, so calls are kept few:
+- streams whose last event is well before the start time are skipped
+  (well before, since a stream's `lastEventTimestamp` can lag its events),
+- the rest are read up to 100 at a time, the most one call takes, rather than one call per stream.
+Each batch returns its events sorted by timestamp, and is paged through with its next page fetched in the background,
+and the batches are merged into one timestamp-ordered iterator.
+At most one page per batch is held in memory, plus one in flight.
+"""
+
+import datetime
+import heapq
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# the most streams `filter_log_events` accepts in `logStreamNames`
+MAX_STREAMS_PER_CALL = 100
+
+
+def to_millis(time: datetime.datetime) -> int:
+    # whole seconds, like the notebooks have always done, so we never miss events in the first partial second
+    return int(time.timestamp()) * 1000
+
+
+def list_log_streams(logs, log_group_name: str, since: int | None = None) -> list[str]:
+    """
+    Get the names of the log group's streams, or of those which may have events from `since` (in millis) on.
+
+    A stream may have, if it was created, or its last event was, at or after `since`, or if it has no last event yet.
+    """
+    stream_names: list[str] = []
+    paginator = logs.get_paginator("describe_log_streams")
+    for page in paginator.paginate(logGroupName=log_group_name):
+        for stream in page["logStreams"]:
+            if since is None or max(stream["creationTime"], stream.get("lastEventTimestamp", since)) >= since:
+                stream_names.append(stream["logStreamName"])
+
+    return stream_names
+
+
+def iter_pages(executor: ThreadPoolExecutor, logs, request: dict) -> Iterator[dict]:
+    "Yield a request's events, page by page, fetching the next page while the current one is consumed."
+
+    def fetch(next_token: str | None) -> dict:
+        return logs.filter_log_events(**request, **({"nextToken": next_token} if next_token else {}))
+
+    future: Future | None = executor.submit(fetch, None)
+    while future is not None:
+        page = future.result()
+        next_token = page.get("nextToken")
+        future = executor.submit(fetch, next_token) if next_token else None
+        yield from page["events"]
+
+
+def iter_log_events(
+    logs,
+    log_group_name: str,
+    start_time: datetime.datetime | None = None,
+    end_time: datetime.datetime | None = None,
+    filter_pattern: str | None = None,
+    stream_lag: datetime.timedelta = datetime.timedelta(hours=2),
+    max_workers: int = 2,
+) -> Iterator[dict]:
+    """
+    Yield every event in the log group, in timestamp order, optionally between times or matching a pattern.
+
+    `logs` is a boto3 logs client. Events are as returned by `filter_log_events`.
+    Streams whose last event is more than `stream_lag` before `start_time` are skipped.
+    `max_workers` bounds the calls in flight, which only matters for groups with more than 100 streams to read.
+    """
+    request: dict = {"logGroupName": log_group_name}
+    if start_time:
+        request["startTime"] = to_millis(start_time)
+    if end_time:
+        request["endTime"] = to_millis(end_time)
+    if filter_pattern:
+        request["filterPattern"] = filter_pattern
+
+    stream_names = list_log_streams(logs, log_group_name, since=to_millis(start_time - stream_lag) if start_time else None)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        batches = [
+            iter_pages(executor, logs, {**request, "logStreamNames": stream_names[i : i + MAX_STREAMS_PER_CALL]})
+            for i in range(0, len(stream_names), MAX_STREAMS_PER_CALL)
+        ]
+        yield from heapq.merge(*batches, key=lambda event: (event["timestamp"], event.get("ingestionTime", 0)))
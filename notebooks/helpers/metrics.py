@@ -0,0 +1,104 @@
+"""
+Fetch CloudWatch metrics in as few calls as possible.
+
+`get_metric_statistics` gets one metric, for one set of dimensions, per call.
+`get_metric_data` gets up to 500 of them per call, but returns a page at a time,
+and a series may be split across pages.
+Here queries are batched 500 to a request, requests run concurrently,
+and each request's pages are followed until `NextToken` is absent.
+
+Each series comes back as aligned lists of timestamps and values, in time order.
+"""
+
+import datetime
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+# the most queries get_metric_data accepts per request
+MAX_QUERIES_PER_REQUEST = 500
+
+
+class Series(NamedTuple):
+    timestamps: list[datetime.datetime]
+    values: list[float]
+
+
+def lambda_metric(
+    function_name: str,
+    metric_name: str,
+    statistic: str = "Sum",
+    resource: str | None = None,
+    period: int = 60,  # lowest possible for non-custom metrics
+) -> dict:
+    "A `MetricStat` for an `AWS/Lambda` metric, optionally for a version or alias via `resource`, e.g. `my_function:live`."
+    dimensions = [{"Name": "FunctionName", "Value": function_name}]
+    if resource:
+        dimensions.append({"Name": "Resource", "Value": resource})
+
+    return {
+        "Metric": {"Namespace": "AWS/Lambda", "MetricName": metric_name, "Dimensions": dimensions},
+        "Period": period,
+        "Stat": statistic,
+    }
+
+
+def batched(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def get_metric_data(
+    cloudwatch,
+    metric_stats: dict[str, dict],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime | None = None,
+    max_workers: int = 8,
+) -> dict[str, Series]:
+    """
+    Get a series for each `MetricStat`, keyed like `metric_stats`, e.g.
+
+        get_metric_data(cloudwatch, {"throttles": lambda_metric("my_function", "Throttles")}, start_time)
+
+    `cloudwatch` is a boto3 cloudwatch client. Series with no datapoints are empty.
+    """
+    end_time = end_time or datetime.datetime.now(datetime.UTC)
+    # query ids must be like [a-z][a-zA-Z0-9_]*, so number them rather than use the caller's keys
+    labels = {f"q{index}": label for index, label in enumerate(metric_stats)}
+    queries = [{"Id": query_id, "MetricStat": metric_stats[label], "ReturnData": True} for query_id, label in labels.items()]
+
+    def fetch(batch: list[dict]) -> list[dict]:
+        results = []
+        request = {"MetricDataQueries": batch, "StartTime": start_time, "EndTime": end_time, "ScanBy": "TimestampAscending"}
+        while True:
+            page = cloudwatch.get_metric_data(**request)
+            results.extend(page["MetricDataResults"])
+            if "NextToken" not in page:
+                return results
+            request["NextToken"] = page["NextToken"]
+
+    series = {label: Series([], []) for label in metric_stats}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for results in executor.map(fetch, batched(queries, MAX_QUERIES_PER_REQUEST)):
+            for result in results:
+                label = labels[result["Id"]]
+                series[label].timestamps.extend(result["Timestamps"])
+                series[label].values.extend(result["Values"])
+
+    for label, (timestamps, values) in series.items():
+        # pages are in time order, but sort anyway: it's cheap and it's what callers rely on
+        if timestamps != sorted(timestamps):
+            pairs = sorted(zip(timestamps, values, strict=True))
+            series[label] = Series([timestamp for timestamp, _ in pairs], [value for _, value in pairs])
+
+    return series
+
+
+def to_datapoints(series_by_statistic: dict[str, Series]) -> list[dict]:
+    "Combine one metric's series, keyed by statistic, into `get_metric_statistics`-style datapoints, in time order."
+    datapoints: dict[datetime.datetime, dict] = {}
+    for statistic, (timestamps, values) in series_by_statistic.items():
+        for timestamp, value in zip(timestamps, values, strict=True):
+            datapoints.setdefault(timestamp, {"Timestamp": timestamp})[statistic] = value
+
+    return [datapoints[timestamp] for timestamp in sorted(datapoints)]
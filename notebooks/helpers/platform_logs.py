@@ -0,0 +1,185 @@
+"""
+Parse Lambda's platform log lines into a table, one row per request id.
+
+The platform lines are `INIT_START`, `START`, `END`, `REPORT` and `INIT_REPORT`, e.g.
+
+    INIT_START Runtime Version: python:3.13.v16	Runtime Version ARN: arn:aws:lambda:...
+    START RequestId: 8f5e... Version: $LATEST
+    END RequestId: 8f5e...
+    REPORT RequestId: 8f5e...	Duration: 2.71 ms	Billed Duration: 4003 ms	...	Init Duration: 4000.01 ms
+
+Only `START`, `END` and `REPORT` carry a request id. The rest are attributed by position in their log stream:
+- `INIT_START`, and an `INIT_REPORT` with `Phase: init`, go to the next request to start,
+- an `INIT_REPORT` with `Phase: invoke` goes to the request in progress.
+
+A failed init logs an `INIT_REPORT` for each phase (see `init_exception` and `init_times_out` in lambda_responses_and_logs),
+so each phase has its own columns. A phase's repeated lines are counted in `init_reports`, and the first is kept.
+
+Numeric columns are `array("d")`, with nan for missing values,
+so they can be aggregated directly (`statistics.fmean`, `max`, ...) or wrapped by numpy or polars without copying.
+Text columns are lists, with None for missing values.
+"""
+
+import math
+import re
+from array import array
+from collections.abc import Iterable
+
+START_PATTERN = re.compile(r"START RequestId: (\S+)(?: Version: (\S+))?")
+END_PATTERN = re.compile(r"END RequestId: (\S+)")
+
+# platform line field -> column, for fields with a numeric value and a unit, e.g. "Duration: 2.71 ms"
+NUMERIC_FIELDS = {
+    "Duration": "duration_ms",
+    "Billed Duration": "billed_duration_ms",
+    "Memory Size": "memory_size_mb",
+    "Max Memory Used": "max_memory_used_mb",
+    "Init Duration": "init_duration_ms",
+}
+TEXT_FIELDS = {
+    "Status": "status",
+    "Error Type": "error_type",
+}
+
+NUMERIC_COLUMNS = [
+    "start_timestamp",
+    "end_timestamp",
+    *NUMERIC_FIELDS.values(),
+    "init_phase_duration_ms",
+    "invoke_phase_init_duration_ms",
+    "init_reports",
+]
+TEXT_COLUMNS = [
+    "request_id",
+    "log_stream_name",
+    "version",
+    "runtime_version",
+    *TEXT_FIELDS.values(),
+    "init_phase_status",
+    "invoke_phase_init_status",
+]
+
+
+def parse_fields(message: str) -> dict[str, str]:
+    "Get the tab-separated `Key: value` fields of a platform line, after its first word, e.g. `REPORT`."
+    fields = {}
+    _, _, rest = message.rstrip().partition(" ")
+    for part in rest.split("\t"):
+        key, separator, value = part.partition(": ")
+        if separator:
+            fields[key] = value
+    return fields
+
+
+class PlatformLogTable:
+    def __init__(self) -> None:
+        self.columns: dict[str, array | list] = {
+            **{name: array("d") for name in NUMERIC_COLUMNS},
+            **{name: [] for name in TEXT_COLUMNS},
+        }
+        self.index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, column: str) -> array | list:
+        return self.columns[column]
+
+    def row(self, request_id: str) -> int:
+        "Get the request's row, adding it if it's new."
+        if request_id not in self.index:
+            self.index[request_id] = len(self.index)
+            for name in NUMERIC_COLUMNS:
+                self.columns[name].append(math.nan)
+            for name in TEXT_COLUMNS:
+                self.columns[name].append(None)
+            self.columns["request_id"][-1] = request_id
+            self.columns["init_reports"][-1] = 0
+        return self.index[request_id]
+
+    def set(self, row: int, column: str, value) -> None:
+        "Set a cell, unless it's already set: the first of any duplicated lines wins."
+        current = self.columns[column][row]
+        if current is None or (isinstance(current, float) and math.isnan(current)):
+            self.columns[column][row] = value
+
+    def rows(self) -> list[dict]:
+        "The table as a list of dicts, with None for missing values, e.g. for marimo to display."
+        return [
+            {
+                name: None if isinstance(column[row], float) and math.isnan(column[row]) else column[row]
+                for name, column in self.columns.items()
+            }
+            for row in range(len(self))
+        ]
+
+
+def parse_platform_logs(events: Iterable[dict]) -> PlatformLogTable:
+    """
+    Parse events, as yielded by `helpers.logs.iter_log_events`, into a table. Non-platform lines are skipped.
+
+    Events must be in time order within each log stream. Streams may be interleaved.
+    """
+    table = PlatformLogTable()
+    # log stream -> fields of INIT_START and Phase: init INIT_REPORT lines, waiting for their request to start
+    pending_inits: dict[str | None, list[tuple[str, dict[str, str]]]] = {}
+    # log stream -> row of the request in progress
+    in_progress: dict[str | None, int] = {}
+
+    for event in events:
+        message = event["message"]
+        if not message.startswith(("START", "END", "REPORT", "INIT_")):
+            continue
+        stream = event.get("logStreamName")
+
+        if message.startswith("INIT_START"):
+            pending_inits.setdefault(stream, []).append(("INIT_START", parse_fields(message)))
+
+        elif message.startswith("INIT_REPORT"):
+            fields = parse_fields(message)
+            if fields.get("Phase") == "invoke" and stream in in_progress:
+                apply_init_report(table, in_progress[stream], fields)
+            else:
+                pending_inits.setdefault(stream, []).append(("INIT_REPORT", fields))
+
+        elif match := START_PATTERN.match(message):
+            row = table.row(match.group(1))
+            in_progress[stream] = row
+            table.set(row, "log_stream_name", stream)
+            table.set(row, "version", match.group(2))
+            table.set(row, "start_timestamp", float(event["timestamp"]))
+            for kind, fields in pending_inits.pop(stream, []):
+                if kind == "INIT_START":
+                    table.set(row, "runtime_version", fields.get("Runtime Version"))
+                else:
+                    apply_init_report(table, row, fields)
+
+        elif match := END_PATTERN.match(message):
+            row = table.row(match.group(1))
+            table.set(row, "end_timestamp", float(event["timestamp"]))
+
+        elif message.startswith("REPORT RequestId: "):
+            fields = parse_fields(message)
+            row = table.row(fields["RequestId"])
+            for field, column in NUMERIC_FIELDS.items():
+                if field in fields:
+                    table.set(row, column, float(fields[field].split(" ", 1)[0]))
+            for field, column in TEXT_FIELDS.items():
+                if field in fields:
+                    table.set(row, column, fields[field])
+            # the report is the request's last line
+            if in_progress.get(stream) == row:
+                del in_progress[stream]
+
+    return table
+
+
+def apply_init_report(table: PlatformLogTable, row: int, fields: dict[str, str]) -> None:
+    table.columns["init_reports"][row] += 1
+    if fields.get("Phase") == "invoke":
+        duration_column, status_column = "invoke_phase_init_duration_ms", "invoke_phase_init_status"
+    else:
+        duration_column, status_column = "init_phase_duration_ms", "init_phase_status"
+    if "Init Duration" in fields:
+        table.set(row, duration_column, float(fields["Init Duration"].split(" ", 1)[0]))
+    table.set(row, status_column, fields.get("Status"))
@@ -0,0 +1,204 @@
+"""
+Simulate target tracking on provisioned concurrency, on a virtual clock, for a trace of invocations.
+
+Application Auto Scaling implements a target-tracking policy with two CloudWatch alarms on `ProvisionedConcurrencyUtilization`,
+the average per 60 s period of provisioned executions in use over provisioned executions allocated:
+- `AlarmHigh` fires when utilization is above the target for `high_datapoints` periods in a row, and scales out,
+- `AlarmLow` fires when utilization is below `low_ratio` times the target for `low_datapoints` periods in a row, and scales in.
+Either way, the new capacity is `ceil(capacity * utilization / target)`, within the policy's min and max capacity.
+
+With no provisioned concurrency allocated, the metric isn't emitted at all,
+so how the alarms treat missing data decides what happens (lambda_scale_from_zero):
+- `missing` (the default): datapoints must be present to count, so with none the alarm has insufficient data,
+- `notBreaching`, `breaching`: missing datapoints count as good or bad respectively,
+- `ignore`: the alarm keeps its state.
+Even an alarm that fires can't scale from zero though: zero times anything is zero.
+
+Invocations that find no free provisioned environment spill over to on-demand environments,
+reusing an idle one if there is one, or cold-starting a new one.
+Provisioned environments are initialized ahead of time, so never cold-start.
+
+Timings that AWS doesn't publish (how long allocation takes, how long an idle environment lives) are parameters.
+"""
+
+import datetime
+import heapq
+import math
+from collections import deque
+from collections.abc import Iterable
+
+TREAT_MISSING_DATA = ("missing", "notBreaching", "breaching", "ignore")
+
+
+class Alarm:
+    def __init__(self, datapoints: int, treat_missing_data: str) -> None:
+        if treat_missing_data not in TREAT_MISSING_DATA:
+            raise ValueError(f"treat_missing_data must be one of {TREAT_MISSING_DATA}, not {treat_missing_data!r}.")
+        self.datapoints = datapoints
+        self.treat_missing_data = treat_missing_data
+        self.state = "INSUFFICIENT_DATA"
+
+    def evaluate(self, breaches: list[bool | None]) -> str:
+        "Update the state from the latest periods, oldest first: True if breaching, False if not, None if missing."
+        window = breaches[-self.datapoints :]
+        if self.treat_missing_data == "notBreaching":
+            window = [bool(breach) for breach in window]
+        elif self.treat_missing_data == "breaching":
+            window = [True if breach is None else breach for breach in window]
+        present = [breach for breach in window if breach is not None]
+
+        if not present:
+            if self.treat_missing_data != "ignore":
+                self.state = "INSUFFICIENT_DATA"
+        elif len(window) == self.datapoints and len(present) == self.datapoints and all(present):
+            self.state = "ALARM"
+        else:
+            self.state = "OK"
+        return self.state
+
+
+class ProvisionedConcurrencySimulator:
+    def __init__(
+        self,
+        min_capacity: int,
+        max_capacity: int,
+        utilization_target: float,
+        high_datapoints: int = 3,
+        low_datapoints: int = 3,
+        low_ratio: float = 0.9,
+        treat_missing_data: str = "missing",
+        provisioning_delay: float = 60,
+        scale_out_cooldown: float = 0,
+        scale_in_cooldown: float = 300,
+        on_demand_idle_timeout: float = 600,
+        start_time: datetime.datetime | None = None,
+    ) -> None:
+        "E.g. `LambdaScaleFromZeroStack`'s `scale_from_zero` is `min_capacity=0, max_capacity=2, utilization_target=0.5`."
+        self.min_capacity = min_capacity
+        self.max_capacity = max_capacity
+        self.utilization_target = utilization_target
+        self.low_ratio = low_ratio
+        self.provisioning_delay = provisioning_delay
+        self.scale_out_cooldown = scale_out_cooldown
+        self.scale_in_cooldown = scale_in_cooldown
+        self.on_demand_idle_timeout = on_demand_idle_timeout
+        self.start_time = start_time or datetime.datetime.now(datetime.UTC).replace(second=0, microsecond=0)
+
+        self.alarm_high = Alarm(high_datapoints, treat_missing_data)
+        self.alarm_low = Alarm(low_datapoints, treat_missing_data)
+        self.high_breaches: list[bool | None] = []
+        self.low_breaches: list[bool | None] = []
+
+        # application auto scaling starts the alias at min capacity
+        self.capacity = min_capacity
+        # (time, capacity) of allocations under way
+        self.pending: list[tuple[float, int]] = []
+        self.last_scale_out = -math.inf
+        self.last_scale_in = -math.inf
+
+        # end times of executions on provisioned environments, and on on-demand environments
+        self.provisioned_busy: list[float] = []
+        self.on_demand_busy: list[float] = []
+        # times on-demand environments became idle, oldest first
+        self.on_demand_idle: deque[float] = deque()
+
+        # minute -> provisioned execution-seconds, invocations, spillovers, cold starts
+        self.execution_seconds: dict[int, float] = {}
+        self.invocations: dict[int, int] = {}
+        self.spillovers: dict[int, int] = {}
+        self.cold_starts: dict[int, int] = {}
+        self.timeline: list[dict] = []
+
+    def run(self, invocations: Iterable[tuple[float, float]], until: float | None = None) -> list[dict]:
+        """
+        Run a trace of (start, duration) invocations, in seconds, in order of start, and get a row per minute.
+
+        The simulation runs until the last invocation ends, or `until` seconds if later, e.g. to watch it scale in.
+        """
+        minute = 0
+        end = 0.0
+        for start, duration in invocations:
+            while start >= (minute + 1) * 60:
+                self.close_minute(minute)
+                minute += 1
+            self.invoke(start, duration)
+            end = max(end, start + duration)
+
+        while minute * 60 < max(end, until or 0):
+            self.close_minute(minute)
+            minute += 1
+
+        return self.timeline
+
+    def invoke(self, start: float, duration: float) -> None:
+        minute = int(start // 60)
+        self.invocations[minute] = self.invocations.get(minute, 0) + 1
+
+        while self.provisioned_busy and self.provisioned_busy[0] <= start:
+            heapq.heappop(self.provisioned_busy)
+        if len(self.provisioned_busy) < self.capacity:
+            heapq.heappush(self.provisioned_busy, start + duration)
+            self.add_execution_seconds(start, start + duration)
+            return
+
+        self.spillovers[minute] = self.spillovers.get(minute, 0) + 1
+        while self.on_demand_busy and self.on_demand_busy[0] <= start:
+            self.on_demand_idle.append(heapq.heappop(self.on_demand_busy))
+        while self.on_demand_idle and self.on_demand_idle[0] < start - self.on_demand_idle_timeout:
+            self.on_demand_idle.popleft()
+        if self.on_demand_idle:
+            # the most recently used environment is the likeliest to still be around
+            self.on_demand_idle.pop()
+        else:
+            self.cold_starts[minute] = self.cold_starts.get(minute, 0) + 1
+        heapq.heappush(self.on_demand_busy, start + duration)
+
+    def add_execution_seconds(self, start: float, end: float) -> None:
+        "Spread an execution over the minutes it overlaps."
+        minute = int(start // 60)
+        while minute * 60 < end:
+            overlap = min(end, (minute + 1) * 60) - max(start, minute * 60)
+            self.execution_seconds[minute] = self.execution_seconds.get(minute, 0.0) + overlap
+            minute += 1
+
+    def close_minute(self, minute: int) -> None:
+        "Emit the minute's datapoint, evaluate the alarms and scale, as of the end of the minute."
+        now = (minute + 1) * 60
+        capacity = self.capacity
+        # no provisioned concurrency, no metric
+        utilization = min(self.execution_seconds.pop(minute, 0.0) / (60 * capacity), 1.0) if capacity else None
+        self.high_breaches.append(None if utilization is None else utilization > self.utilization_target)
+        self.low_breaches.append(None if utilization is None else utilization < self.utilization_target * self.low_ratio)
+        alarm_high = self.alarm_high.evaluate(self.high_breaches)
+        alarm_low = self.alarm_low.evaluate(self.low_breaches)
+
+        if utilization is not None:
+            desired = min(max(math.ceil(capacity * utilization / self.utilization_target), self.min_capacity), self.max_capacity)
+            target = max([capacity, *(pending_capacity for _, pending_capacity in self.pending)])
+            if alarm_high == "ALARM" and desired > target and now - self.last_scale_out >= self.scale_out_cooldown:
+                self.pending.append((now + self.provisioning_delay, desired))
+                self.last_scale_out = now
+            elif alarm_low == "ALARM" and desired < capacity and not self.pending and now - self.last_scale_in >= self.scale_in_cooldown:
+                # deallocation is immediate
+                self.capacity = desired
+                self.last_scale_in = now
+
+        for ready, pending_capacity in [allocation for allocation in self.pending if allocation[0] <= now]:
+            self.capacity = max(self.capacity, pending_capacity)
+            self.pending.remove((ready, pending_capacity))
+
+        self.timeline.append(
+            {
+                "Timestamp": self.start_time + datetime.timedelta(minutes=minute),
+                "capacity": capacity,
+                "utilization": None if utilization is None else round(utilization, 3),
+                "alarm_high": alarm_high,
+                "alarm_low": alarm_low,
+                "invocations": self.invocations.pop(minute, 0),
+                "spillovers": self.spillovers.pop(minute, 0),
+                "cold_starts": self.cold_starts.pop(minute, 0),
+            }
+        )
+
+    def total_cold_starts(self) -> int:
+        return sum(row["cold_starts"] for row in self.timeline)
@@ -0,0 +1,11 @@
+"""
+Split the names of the copies `lib.sweep` makes of a function back into their parts.
+
+Copies are named like `slow_init__m1024__arm64`: double underscores, so the parts can be split back out.
+"""
+
+
+def parse_variant_name(variant_name: str) -> tuple[str, int, str]:
+    "E.g. `slow_init__m1024__arm64` -> `('slow_init', 1024, 'arm64')`."
+    function_name, memory_size, architecture = variant_name.rsplit("__", 2)
+    return function_name, int(memory_size.removeprefix("m")), architecture
@@ -0,0 +1,133 @@
+"""
+Wait for AWS to catch up, without guessing how long it takes.
+
+`wait_until` polls a condition with exponential backoff until it holds or a deadline passes.
+The other functions make conditions for the things the notebooks wait on:
+log lines, metric datapoints, alarm history and provisioned concurrency.
+"""
+
+import datetime
+import time
+from collections.abc import Callable
+
+from helpers import cassette
+from helpers.logs import iter_log_events
+
+
+def wait_until(
+    condition: Callable[[], object],
+    timeout: float,
+    initial_interval: float = 5,
+    max_interval: float = 60,
+    backoff: float = 2,
+    sleep: Callable[[float], None] = cassette.sleep,
+) -> object:
+    """
+    Call `condition` until it returns something truthy, and return that.
+
+    Waits `initial_interval` seconds after the first failed check, multiplying the wait by `backoff` each time, up to `max_interval`.
+    Raises `TimeoutError` if the condition still doesn't hold after `timeout` seconds.
+    Doesn't sleep when replaying a cassette.
+    """
+    deadline = time.monotonic() + timeout
+    interval = initial_interval
+    while True:
+        result = condition()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Condition not met after {timeout}s.")
+        sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
+
+
+def all_of(*conditions: Callable[[], object]) -> Callable[[], bool]:
+    "A condition that holds when all the given conditions do. Stops checking at the first that doesn't."
+    return lambda: all(condition() for condition in conditions)
+
+
+def log_lines_appeared(
+    logs,
+    function_name: str,
+    start_time: datetime.datetime,
+    prefix: str = "START",
+    count: int = 1,
+) -> Callable[[], bool]:
+    "A condition that holds once the function has logged at least `count` lines starting with `prefix`, e.g. `START` or `REPORT`."
+
+    def condition() -> bool:
+        events = iter_log_events(logs, f"/aws/lambda/{function_name}", start_time=start_time, filter_pattern=f'"{prefix}"')
+        return sum(event["message"].startswith(prefix) for event in events) >= count
+
+    return condition
+
+
+def metric_datapoint_exists(
+    cloudwatch,
+    function_name: str,
+    metric_name: str,
+    start_time: datetime.datetime,
+    statistic: str = "Sum",
+    at_or_after: datetime.datetime | None = None,
+) -> Callable[[], bool]:
+    """
+    A condition that holds once the function's `AWS/Lambda` metric has a datapoint since `start_time`.
+
+    With `at_or_after`, the datapoint must be for the minute containing that time or later,
+    e.g. to wait until a metric covers a particular invocation.
+    """
+
+    def condition() -> bool:
+        datapoints = cloudwatch.get_metric_statistics(
+            Namespace="AWS/Lambda",
+            MetricName=metric_name,
+            Dimensions=[{"Name": "FunctionName", "Value": function_name}],
+            StartTime=start_time,
+            EndTime=datetime.datetime.now(datetime.UTC),
+            Period=60,
+            Statistics=[statistic],
+        )["Datapoints"]
+        if at_or_after is None:
+            return bool(datapoints)
+        minute = at_or_after.replace(second=0, microsecond=0)
+        return any(datapoint["Timestamp"] >= minute for datapoint in datapoints)
+
+    return condition
+
+
+def alarm_history_recorded(
+    cloudwatch,
+    alarm_name: str,
+    start_time: datetime.datetime,
+    history_item_type: str = "Action",
+    count: int = 1,
+) -> Callable[[], bool]:
+    "A condition that holds once the alarm's history has at least `count` items of the type since `start_time`."
+
+    def condition() -> bool:
+        items = []
+        paginator = cloudwatch.get_paginator("describe_alarm_history")
+        for page in paginator.paginate(
+            AlarmName=alarm_name,
+            HistoryItemType=history_item_type,
+            StartDate=start_time,
+            EndDate=datetime.datetime.now(datetime.UTC),
+        ):
+            items.extend(page["AlarmHistoryItems"])
+        return len(items) >= count
+
+    return condition
+
+
+def provisioned_concurrency_at_least(lambda_, function_name: str, qualifier: str, count: int) -> Callable[[], bool]:
+    "A condition that holds once the alias's requested provisioned concurrency is at least `count`."
+
+    def condition() -> bool:
+        try:
+            config = lambda_.get_provisioned_concurrency_config(FunctionName=function_name, Qualifier=qualifier)
+        except lambda_.exceptions.ProvisionedConcurrencyConfigNotFoundException:
+            return False
+        return config["RequestedProvisionedConcurrentExecutions"] >= count
+
+    return condition
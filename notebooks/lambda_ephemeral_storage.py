@@ -46,9 +46,10 @@ def _(mo):
 
 @app.cell
 def _():
-    import boto3
+    from helpers.cassette import Cassette
 
-    lambda_ = boto3.client("lambda")
+    cassette = Cassette("lambda_ephemeral_storage")
+    lambda_ = cassette.client("lambda")
     return (lambda_,)
 
 
@@ -53,10 +53,11 @@ def _(mo):
 
 @app.cell
 def _():
-    import boto3
+    from helpers.cassette import Cassette
 
-    lambda_ = boto3.client("lambda")
-    return boto3, lambda_
+    cassette = Cassette("lambda_layer_merging")
+    lambda_ = cassette.client("lambda")
+    return cassette, lambda_
 
 
 @app.cell
@@ -124,8 +125,8 @@ def _(mo):
 
 
 @app.cell
-def _(boto3):
-    cf = boto3.client("cloudformation")
+def _(cassette):
+    cf = cassette.client("cloudformation")
 
     template_response = cf.get_template(StackName="LambdaLayerMergingStack")
     resources = template_response["TemplateBody"]["Resources"]
@@ -159,17 +160,24 @@ def _(mo):
 
     Why does cdk sort layers? The docs [2]:
 
-    >An additional update to the hashing logic fixes two issues surrounding layers. Prior to this change, updating the lambda layer version would have no effect on the function version. Also, the order of lambda layers provided to the function was unnecessarily baked into the hash.
+    >An additional update to the hashing logic fixes two issues surrounding layers.
+    >Prior to this change, updating the lambda layer version would have no effect on the function version.
+    >Also, the order of lambda layers provided to the function was unnecessarily baked into the hash.
     >
-    >This has been fixed in the AWS CDK starting with version 2.27. If you ran cdk init with an earlier version, you will need to opt-in via a feature flag. If you run cdk init with v2.27 or later, this fix will be opted in, by default.
+    >This has been fixed in the AWS CDK starting with version 2.27.
+    >If you ran cdk init with an earlier version, you will need to opt-in via a feature flag.
+    >If you run cdk init with v2.27 or later, this fix will be opted in, by default.
 
     The first issue makes sense: bumping a layer version should bump the function version.
     But I'm puzzled by the second issue.
     This comment seems spot-on to me [3]:
 
-    >But because layers can overwrite each other, the order in which they're extracted is crucial and Lambda functions which register the same layers in a different order should always have a different hash.
+    >But because layers can overwrite each other, the order in which they're extracted is crucial
+    >and Lambda functions which register the same layers in a different order should always have a different hash.
     >
-    >Regardless of the previous point, why is it necessary to mutate the layers array to calculate the Lambda function hash? A sorted copy can be used to calculate the same hash. This would cause the layers to maintain the original ordering and be extracted in the expected order.
+    >Regardless of the previous point, why is it necessary to mutate the layers array to calculate the Lambda function hash?
+    >A sorted copy can be used to calculate the same hash.
+    >This would cause the layers to maintain the original ordering and be extracted in the expected order.
 
     Beware: **layer order matters, but by default cdk sorts your list in place.**
     """)
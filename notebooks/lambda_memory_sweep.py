@@ -0,0 +1,222 @@
+import marimo
+
+__generated_with = "0.18.1"
+app = marimo.App(width="medium")
+
+
+@app.cell(hide_code=True)
+def _():
+    import marimo as mo
+
+    return (mo,)
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    # Lambda Memory Sweep
+
+    Lambda allocates CPU in proportion to memory,
+    and bills by memory times duration.
+    So more memory costs more per millisecond
+    but may need fewer milliseconds.
+    And `arm64` is cheaper per millisecond than `x86_64`,
+    but is it as fast?
+
+    Where's the sweet spot?
+    """)
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ## Stack
+
+    Three of the other examples' functions,
+    - `slow_init`, from [Lambda Responses and Logs](lambda_responses_and_logs.html), whose init sleeps,
+    - `ephemeral_storage`, from [Lambda Ephemeral Storage](lambda_ephemeral_storage.html), which touches a file, and
+    - `layer_source_only`, from `LambdaLayerBytecodeStack`, whose init imports `requests` from a layer,
+
+    each copied across memory sizes 128, 512, 1024 and 2048 MB and architectures `arm64` and `x86_64`,
+    with names like `slow_init__m1024__arm64`.
+
+    The sleep shouldn't care about memory, and the handler that touches a file barely does anything,
+    so they show Lambda's own overhead.
+    The import is CPU bound, so it should speed up with memory.
+    """)
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ## Results
+    """)
+    return
+
+
+@app.cell
+def _():
+    import datetime
+
+    from helpers.cassette import Cassette
+    from helpers.invoke import invoke_all
+    from helpers.logs import iter_log_events
+    from helpers.platform_logs import parse_platform_logs
+    from helpers.variants import parse_variant_name
+    from helpers.waiters import all_of, log_lines_appeared, wait_until
+
+    cassette = Cassette("lambda_memory_sweep")
+    lambda_ = cassette.client("lambda")
+    logs = cassette.client("logs")
+    return (
+        all_of,
+        datetime,
+        invoke_all,
+        iter_log_events,
+        lambda_,
+        log_lines_appeared,
+        logs,
+        parse_platform_logs,
+        parse_variant_name,
+        wait_until,
+    )
+
+
+@app.cell
+def _(lambda_):
+    def get_variants(function_name):
+        "Get the deployed copies of a function, e.g. `slow_init__m1024__arm64`."
+        variants = []
+        for page in lambda_.get_paginator("list_functions").paginate():
+            for function in page["Functions"]:
+                if function["FunctionName"].startswith(f"{function_name}__m"):
+                    variants.append(function["FunctionName"])
+
+        return sorted(variants)
+
+    return (get_variants,)
+
+
+@app.cell
+def _(get_variants, mo):
+    variants = get_variants("slow_init") + get_variants("ephemeral_storage") + get_variants("layer_source_only")
+    mo.ui.table(variants, selection=None)
+    return (variants,)
+
+
+@app.cell
+def _(mo):
+    mo.md(r"""
+    Invoke each copy a few times, the copies all at once but each copy's invocations one after another.
+    The first invocation after a deploy is a cold start, so we get one init duration per copy,
+    and each later one finds that environment free, so it's warm.
+    """)
+    return
+
+
+@app.cell
+def _(datetime, invoke_all, lambda_, variants):
+    invocations_per_variant = 5
+
+    _invocations = []
+    for _round in range(invocations_per_variant):
+        for _variant in variants:
+            _invocation = {"FunctionName": _variant}
+            if _round:
+                # after the same copy's invocation in the previous round
+                _invocation["after"] = len(_invocations) - len(variants)
+            _invocations.append(_invocation)
+
+    start_time = datetime.datetime.now(datetime.UTC)
+    for _result in invoke_all(lambda_, _invocations):
+        if _result.error is not None:
+            raise _result.error
+    return invocations_per_variant, start_time
+
+
+@app.cell
+def _(all_of, invocations_per_variant, log_lines_appeared, logs, start_time, variants, wait_until):
+    # give logs time to appear
+    wait_until(
+        all_of(*(log_lines_appeared(logs, variant, start_time, prefix="REPORT", count=invocations_per_variant) for variant in variants)),
+        timeout=5 * 60,
+    )
+    return
+
+
+@app.cell
+def _(iter_log_events, logs, parse_platform_logs):
+    def get_reports(function_name, start_time):
+        "Get the function's platform log lines as a table, one row per invocation."
+        return parse_platform_logs(
+            iter_log_events(
+                logs,
+                f"/aws/lambda/{function_name}",
+                start_time=start_time,
+                filter_pattern='?"INIT_START" ?"START RequestId" ?"REPORT RequestId"',
+            )
+        )
+
+    return (get_reports,)
+
+
+@app.cell
+def _(mo):
+    mo.md(r"""
+    Prices are per GB-second, for us-east-1 at the time of writing [1].
+    """)
+    return
+
+
+@app.cell
+def _(get_reports, mo, parse_variant_name, start_time, variants):
+    _price_per_gb_second = {"arm64": 0.0000133334, "x86_64": 0.0000166667}
+
+    def _mean(column):
+        # missing values are nan
+        values = [value for value in column if value == value]
+        return round(sum(values) / len(values), 1) if values else None
+
+    def _max(column):
+        return max((value for value in column if value == value), default=None)
+
+    _rows = []
+    for _variant in variants:
+        _function_name, _memory_size, _architecture = parse_variant_name(_variant)
+        _reports = get_reports(_variant, start_time)
+        _billed_duration_ms = _mean(_reports["billed_duration_ms"])
+        _rows.append(
+            {
+                "function": _function_name,
+                "memory_mb": _memory_size,
+                "architecture": _architecture,
+                "invocations": len(_reports),
+                "init_duration_ms": _mean(_reports["init_duration_ms"]),
+                "mean_duration_ms": _mean(_reports["duration_ms"]),
+                "mean_billed_duration_ms": _billed_duration_ms,
+                "max_memory_used_mb": _max(_reports["max_memory_used_mb"]),
+                "usd_per_million_invocations": (
+                    round(_billed_duration_ms / 1000 * _memory_size / 1024 * _price_per_gb_second[_architecture] * 1_000_000, 2)
+                    if _billed_duration_ms is not None
+                    else None
+                ),
+            }
+        )
+    mo.ui.table(_rows, selection=None)
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ## References
+
+    [1] https://aws.amazon.com/lambda/pricing/
+    """)
+    return
+
+
+if __name__ == "__main__":
+    app.run()
@@ -58,57 +58,59 @@ def _(mo):
 def _():
     import datetime
 
-    import boto3
+    from helpers.cassette import Cassette
+    from helpers.invoke import invoke_all
+    from helpers.logs import iter_log_events
 
-    return boto3, datetime
+    return Cassette, datetime, invoke_all, iter_log_events
 
 
 @app.cell
-def _(boto3):
-    lambda_ = boto3.client("lambda")
-    logs = boto3.client("logs")
+def _(Cassette):
+    cassette = Cassette("lambda_responses_and_logs")
+    lambda_ = cassette.client("lambda")
+    logs = cassette.client("logs")
     return lambda_, logs
 
 
 @app.cell
-def _(datetime, lambda_):
+def _(invoke_all, lambda_):
     call_times = {}
     responses = {}
 
-    for function_name in (
-        "slow_init",
-        "slow_init",  # twice, to contrast cold versus warm start
-        "init_exception",
-        "handler_exception",
-        "init_times_out",
-        "handler_times_out",
-        "handler_returns_unserializable",
-    ):
+    # invoke all at once, since each call blocks until its function finishes, init and all
+    invocations = [
+        {"FunctionName": "slow_init"},
+        {"FunctionName": "slow_init", "after": 0},  # twice, to contrast cold versus warm start, so once the cold start's done
+        {"FunctionName": "init_exception"},
+        {"FunctionName": "handler_exception"},
+        {"FunctionName": "init_times_out"},
+        {"FunctionName": "handler_times_out"},
+        {"FunctionName": "handler_returns_unserializable"},
+    ]
+    for invocation, result in zip(invocations, invoke_all(lambda_, invocations), strict=True):
+        function_name = invocation["FunctionName"]
         # the dict values are all lists so i can treat once-called and twice-called functions uniformly
-        call_times.setdefault(function_name, []).append(datetime.datetime.now(datetime.UTC))
-        response = lambda_.invoke(FunctionName=function_name)
+        call_times.setdefault(function_name, []).append(result.sent)
+        # function errors are in the response: a client error means the call itself failed, and there's no response
+        if result.error is not None:
+            raise result.error
+        response = result.response
         del response["ResponseMetadata"]  # just noise for our purposes
         del response["ExecutedVersion"]  # "$LATEST"
-        # the "Payload" value is a botocore.response.StreamingBody object
-        # it's file-like, so has a `read()` method, returning bytes
-        response["Payload"] = response["Payload"].read().decode("utf-8")
+        # the "Payload" value was a botocore.response.StreamingBody object, which invoke_all has read into bytes
+        response["Payload"] = response["Payload"].decode("utf-8")
         responses.setdefault(function_name, []).append(response)
     return call_times, responses
 
 
 @app.cell
-def _(call_times, datetime, logs):
+def _(call_times, datetime, iter_log_events, logs):
     def print_logs(function_name):
         earliest_call_time = min(call_times[function_name])
 
-        earliest_call_timestamp_in_ms = int(earliest_call_time.timestamp()) * 1000
-        response = logs.filter_log_events(
-            logGroupName=f"/aws/lambda/{function_name}",
-            startTime=earliest_call_timestamp_in_ms,
-        )
-
         nice_logs = ""
-        for event in response["events"]:
+        for event in iter_log_events(logs, f"/aws/lambda/{function_name}", start_time=earliest_call_time):
             t = datetime.datetime.fromtimestamp(event["timestamp"] / 1000, datetime.UTC)
             message = event["message"]
             nice_logs += f"{t}: {message}"
@@ -162,7 +164,8 @@ def _(mo):
     The first, cold invocation has an `INIT_START` message and an `Init Duration` in the `REPORT` message.
     The second, warm invocation has neither.
 
-    The first invocation's `Billed Duration` is the _sum_ of its `Init Duration` and (handler) `Duration`, rounded up to the nearest millsecond.
+    The first invocation's `Billed Duration` is the _sum_ of its `Init Duration` and (handler) `Duration`,
+    rounded up to the nearest millsecond.
     So you're billed for the init time.
     That's a recent change.
     Before August 1 2025, the init time for
@@ -180,7 +183,8 @@ def _(mo):
     but `"hi there"` isn't json, is it?
     Sure it is [2]:
 
-    > A JSON text is a serialized value. Note that certain previous specifications of JSON constrained a JSON text to be an object or an array.
+    > A JSON text is a serialized value.
+    > Note that certain previous specifications of JSON constrained a JSON text to be an object or an array.
 
     [3] explains the confusion nicely.
     """)
@@ -221,7 +225,9 @@ def _(mo):
     because it's about your request to the Lambda service,
     not about your function [4].
 
-    > The status code in the API response doesn’t reflect function errors. Error codes are reserved for errors that prevent your function from executing, such as permissions errors, quota errors, or issues with your function’s code and configuration.
+    > The status code in the API response doesn’t reflect function errors.
+    > Error codes are reserved for errors that prevent your function from executing,
+    > such as permissions errors, quota errors, or issues with your function’s code and configuration.
 
     What does flag that something went wrong
     is the presence of `"FunctionError"`.
@@ -426,6 +432,32 @@ def _(mo):
     return
 
 
+@app.cell
+def _(mo):
+    mo.md(r"""
+    ### All together
+
+    The platform lines
+    (`INIT_START`, `START`, `END`, `REPORT`, `INIT_REPORT`)
+    as a table, one row per invocation.
+    Note the two `INIT_REPORT`s for `init_exception` and `init_times_out`,
+    one per phase.
+    """)
+    return
+
+
+@app.cell
+def _(call_times, iter_log_events, logs, mo):
+    from helpers.platform_logs import parse_platform_logs
+
+    platform_rows = []
+    for _function_name, _times in call_times.items():
+        _table = parse_platform_logs(iter_log_events(logs, f"/aws/lambda/{_function_name}", start_time=min(_times)))
+        platform_rows.extend({"function": _function_name, **_row} for _row in _table.rows())
+    mo.ui.table(platform_rows, selection=None)
+    return
+
+
 @app.cell
 def _(mo):
     mo.md(r"""
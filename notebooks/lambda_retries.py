@@ -79,17 +79,18 @@ def _(mo):
 
 @app.cell
 def _():
-    import boto3
     import botocore
-    return boto3, botocore
+    from helpers.cassette import Cassette
+    return Cassette, botocore
 
 
 @app.cell
-def _(boto3, botocore):
+def _(Cassette, botocore):
+    cassette = Cassette("lambda_retries")
     config = botocore.config.Config(retries={"total_max_attempts": 1})
-    logs = boto3.client("logs", config=config)
-    lambda_ = boto3.client("lambda", config=config)
-    cloudwatch = boto3.client("cloudwatch", config=config)
+    logs = cassette.client("logs", config=config)
+    lambda_ = cassette.client("lambda", config=config)
+    cloudwatch = cassette.client("cloudwatch", config=config)
     return cloudwatch, lambda_, logs
 
 
@@ -151,7 +152,10 @@ def _(mo):
 def _():
     import datetime
     from pprint import pprint
-    return datetime, pprint
+
+    from helpers.invoke import invoke_all
+    from helpers.logs import iter_log_events
+    return datetime, invoke_all, iter_log_events, pprint
 
 
 @app.cell
@@ -161,52 +165,28 @@ def _():
 
 
 @app.cell
-def _(call_times, datetime, lambda_):
-    call_times["async_handler_raises_exception"] = datetime.datetime.now(datetime.UTC)
-    lambda_.invoke(FunctionName="async_handler_raises_exception", InvocationType="Event")
-    return
-
-
-@app.cell
-def _(call_times, datetime, lambda_):
-    call_times["async_invocation_times_out"] = datetime.datetime.now(datetime.UTC)
-    lambda_.invoke(FunctionName="async_invocation_times_out", InvocationType="Event")
-    return
-
-
-@app.cell
-def _(call_times, datetime, lambda_):
-    call_times["async_throttled"] = datetime.datetime.now(datetime.UTC)
-    # async invocation so we don't get TooManyRequestsException
-    lambda_.invoke(FunctionName="async_throttled", InvocationType="Event")
-    return
-
-
-@app.cell
-def _(call_times, datetime, lambda_):
-    call_times["sync_handler_raises_exception"] = datetime.datetime.now(datetime.UTC)
-    lambda_.invoke(FunctionName="sync_handler_raises_exception", InvocationType="RequestResponse")
-    return
-
-
-@app.cell
-def _(call_times, datetime, lambda_):
-    call_times["sync_invocation_times_out"] = datetime.datetime.now(datetime.UTC)
-    lambda_.invoke(FunctionName="sync_invocation_times_out", InvocationType="RequestResponse")
-    return
-
-
-@app.cell
-def _(botocore, call_times, datetime, lambda_, pprint):
-    call_times["sync_throttled"] = datetime.datetime.now(datetime.UTC)
-    try:
-        lambda_.invoke(FunctionName="sync_throttled", InvocationType="RequestResponse")
-    except botocore.exceptions.ClientError as err:
-        if err.response["Error"]["Code"] == "TooManyRequestsException":
+def _(call_times, invoke_all, lambda_, pprint):
+    # all at once, rather than waiting for each sync invocation to finish before the next
+    _invocations = [
+        {"FunctionName": "async_handler_raises_exception", "InvocationType": "Event"},
+        {"FunctionName": "async_invocation_times_out", "InvocationType": "Event"},
+        # async invocation so we don't get TooManyRequestsException
+        {"FunctionName": "async_throttled", "InvocationType": "Event"},
+        {"FunctionName": "sync_handler_raises_exception", "InvocationType": "RequestResponse"},
+        {"FunctionName": "sync_invocation_times_out", "InvocationType": "RequestResponse"},
+        {"FunctionName": "sync_throttled", "InvocationType": "RequestResponse"},
+    ]
+    _responses = {}
+    for _invocation, _result in zip(_invocations, invoke_all(lambda_, _invocations), strict=True):
+        call_times[_invocation["FunctionName"]] = _result.sent
+        if _result.error is None:
+            _responses[_invocation["FunctionName"]] = _result.response
+        elif _result.error.response["Error"]["Code"] == "TooManyRequestsException":
             # sync invocation of throttled lambda, so we expect to get TooManyRequestsException
-            pprint(err.response)
+            _responses[_invocation["FunctionName"]] = _result.error.response
         else:
-            raise err
+            raise _result.error
+    pprint(_responses)
     return
 
 
@@ -237,20 +217,29 @@ def _(call_times, pprint):
 @app.cell(hide_code=True)
 def _(mo):
     mo.md(r"""
-    Let's wait a while to give Lambda a chance to retry.
+    Let's wait to give Lambda a chance to retry.
+    Rather than sleep for a fixed time, we poll until the logs and metrics we'll look at have shown up.
     """)
     return
 
 
 @app.cell
 def _():
-    from time import sleep
-    return (sleep,)
+    from helpers.waiters import all_of, log_lines_appeared, metric_datapoint_exists, wait_until
+    return all_of, log_lines_appeared, metric_datapoint_exists, wait_until
 
 
 @app.cell
-def _(sleep):
-    sleep(5 * 60)
+def _(all_of, call_times, cloudwatch, log_lines_appeared, logs, metric_datapoint_exists, wait_until):
+    wait_until(
+        all_of(
+            # the try and two retries
+            log_lines_appeared(logs, "async_handler_raises_exception", call_times["async_handler_raises_exception"], count=3),
+            log_lines_appeared(logs, "async_invocation_times_out", call_times["async_invocation_times_out"], count=3),
+            metric_datapoint_exists(cloudwatch, "async_throttled", "AsyncEventsDropped", call_times["async_throttled"]),
+        ),
+        timeout=10 * 60,
+    )
     return
 
 
@@ -266,18 +255,18 @@ def _(mo):
 
 
 @app.cell
-def _(call_times, datetime, logs):
-    def get_invocations_from_logs(function_name: str) -> list[float]:
-        call_timestamp_in_ms = int(call_times[function_name].timestamp()) * 1000
-
-        response = logs.filter_log_events(
-            logGroupName=f"/aws/lambda/{function_name}",
-            startTime=call_timestamp_in_ms,
+def _(call_times, datetime, iter_log_events, logs):
+    def get_invocations_from_logs(function_name: str) -> list:
+        events = iter_log_events(
+            logs,
+            f"/aws/lambda/{function_name}",
+            start_time=call_times[function_name],
+            filter_pattern='"START RequestId"',
         )
 
         invocations = [
             datetime.datetime.fromtimestamp(event["timestamp"] / 1000.0, tz=datetime.UTC)
-            for event in response["events"]
+            for event in events
             if event["message"].startswith("START")
         ]
         invocations = sorted(invocations)
@@ -387,23 +376,21 @@ def _(mo):
 
 
 @app.cell
-def _(call_times, cloudwatch, datetime):
-    def get_metric_sum(function_name: str, metric_name: str) -> list[tuple]:
-        response = cloudwatch.get_metric_statistics(
-            Namespace="AWS/Lambda",
-            MetricName=metric_name,
-            Dimensions=[{"Name": "FunctionName", "Value": function_name}],
-            StartTime=call_times[function_name],
-            EndTime=datetime.datetime.now(datetime.UTC),
-            Period=60,  # lowest possible for non-custom metrics
-            Statistics=["Sum"],
-        )
+def _(call_times, cloudwatch):
+    from helpers.metrics import get_metric_data, lambda_metric, to_datapoints
 
-        sum_and_timestamps = [(datapoint["Sum"], datapoint["Timestamp"]) for datapoint in response["Datapoints"]]
-        sum_and_timestamps = sorted(sum_and_timestamps, key=lambda x: x[1])
+    def get_metric_sums(function_name: str, metric_names: list[str]) -> dict[str, list[tuple]]:
+        "Get (sum, timestamp) pairs for each metric, in one request."
+        series = get_metric_data(
+            cloudwatch,
+            {metric_name: lambda_metric(function_name, metric_name) for metric_name in metric_names},
+            start_time=call_times[function_name],
+        )
+        return {metric_name: list(zip(values, timestamps, strict=True)) for metric_name, (timestamps, values) in series.items()}
 
-        return sum_and_timestamps
-    return (get_metric_sum,)
+    def get_metric_sum(function_name: str, metric_name: str) -> list[tuple]:
+        return get_metric_sums(function_name, [metric_name])[metric_name]
+    return get_metric_data, get_metric_sum, get_metric_sums, lambda_metric, to_datapoints
 
 
 @app.cell
@@ -433,11 +420,13 @@ def _(mo):
 
 
 @app.cell
-def _(get_metric_sum, pprint):
-    async_events_received = get_metric_sum("async_throttled", "AsyncEventsReceived")
+def _(get_metric_sums, pprint):
+    async_events = get_metric_sums("async_throttled", ["AsyncEventsReceived", "AsyncEventsDropped"])
+
+    async_events_received = async_events["AsyncEventsReceived"]
     pprint(async_events_received)
 
-    async_events_dropped = get_metric_sum("async_throttled", "AsyncEventsDropped")
+    async_events_dropped = async_events["AsyncEventsDropped"]
     pprint(async_events_dropped)
     return
 
@@ -527,14 +516,38 @@ def _(call_times, datetime, lambda_):
 @app.cell
 def _(mo):
     mo.md(r"""
-    We'll wait a bit to give the metrics a chance to update
+    We'll wait for both events to be processed and for the metrics to catch up
     """)
     return
 
 
 @app.cell
-def _(sleep):
-    sleep(5 * 60)
+def _(
+    all_of,
+    call_times,
+    cloudwatch,
+    datetime,
+    log_lines_appeared,
+    logs,
+    metric_datapoint_exists,
+    wait_until,
+):
+    wait_until(
+        all_of(
+            log_lines_appeared(logs, "async_throttled", call_times["async_throttled"], count=2),
+            metric_datapoint_exists(cloudwatch, "async_throttled", "Throttles", call_times["async_throttled"]),
+            # the second event can't succeed until the first has run for 60s
+            metric_datapoint_exists(
+                cloudwatch,
+                "async_throttled",
+                "AsyncEventAge",
+                call_times["async_throttled"],
+                statistic="Maximum",
+                at_or_after=call_times["async_throttled"] + datetime.timedelta(seconds=60),
+            ),
+        ),
+        timeout=10 * 60,
+    )
     return
 
 
@@ -589,19 +602,16 @@ def _(mo):
 
 
 @app.cell
-def _(call_times, cloudwatch, datetime):
+def _(call_times, cloudwatch, get_metric_data, lambda_metric, to_datapoints):
     def get_async_event_age_metric(function_name: str) -> list:
-        response = cloudwatch.get_metric_statistics(
-            Namespace="AWS/Lambda",
-            MetricName="AsyncEventAge",
-            Dimensions=[{"Name": "FunctionName", "Value": function_name}],
-            StartTime=call_times[function_name],
-            EndTime=datetime.datetime.now(datetime.UTC),
-            Period=60,
-            Statistics=["SampleCount", "Minimum", "Average", "Maximum"],
+        statistics = ["SampleCount", "Minimum", "Average", "Maximum"]
+        series = get_metric_data(
+            cloudwatch,
+            {statistic: lambda_metric(function_name, "AsyncEventAge", statistic) for statistic in statistics},
+            start_time=call_times[function_name],
         )
 
-        return sorted(response["Datapoints"], key=lambda datapoint: datapoint["Timestamp"])
+        return to_datapoints(series)
     return (get_async_event_age_metric,)
 
 
@@ -827,8 +837,8 @@ def _(call_times, datetime, invoke_and_suppress_throttling_exception):
 
 
 @app.cell
-def _(sleep):
-    sleep(2 * 60)
+def _(call_times, cloudwatch, metric_datapoint_exists, wait_until):
+    wait_until(metric_datapoint_exists(cloudwatch, "sync_throttled", "Throttles", call_times["sync_throttled"]), timeout=5 * 60)
     return
 
 
@@ -846,6 +856,53 @@ def _(mo):
     return
 
 
+@app.cell
+def _(mo):
+    mo.md(r"""
+    ### simulated
+
+    Those experiments took many minutes of waiting.
+    `helpers.async_queue_sim` models the async queue on a virtual clock instead,
+    with the backoffs we measured.
+
+    The genuine throttle experiment again:
+    reserved concurrency 1, a function that runs for 60s, two events at once.
+    """)
+    return
+
+
+@app.cell
+def _(pprint):
+    from collections import Counter
+
+    from helpers.async_queue_sim import AsyncQueueSimulator
+
+    pprint(AsyncQueueSimulator(duration=60, reserved_concurrency=1).run([0, 0]).async_event_age())
+    return AsyncQueueSimulator, Counter
+
+
+@app.cell
+def _(mo):
+    mo.md(r"""
+    Like the real thing: 6 throttled tries, then a successful one a bit after 60s.
+
+    Now a what-if we wouldn't want to wait for:
+    an event every second for an hour,
+    a function that runs for 2s,
+    reserved concurrency 1,
+    and a maximum event age of 1 hour.
+    How many events make it?
+    """)
+    return
+
+
+@app.cell
+def _(AsyncQueueSimulator, Counter):
+    _simulation = AsyncQueueSimulator(duration=2, reserved_concurrency=1, maximum_event_age=60 * 60).run(range(60 * 60))
+    Counter(_simulation.outcomes.values())
+    return
+
+
 @app.cell
 def _(mo):
     mo.md(r"""
@@ -0,0 +1,234 @@
+import marimo
+
+__generated_with = "0.18.1"
+app = marimo.App(width="medium")
+
+
+@app.cell(hide_code=True)
+def _():
+    import marimo as mo
+
+    return (mo,)
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    # Lambda Scale Bursts
+
+    Target tracking scales provisioned concurrency to keep `ProvisionedConcurrencyUtilization` near a target.
+    But how much load, for how long, does it take?
+    [1] says:
+
+    >Both of the Application Auto Scaling alarms use the average statistic by default.
+    >Functions that experience quick bursts of traffic may not trigger these alarms.
+    >For example, suppose your Lambda function executes quickly (i.e. 20-100 ms) and your traffic comes in quick bursts.
+    >In this case, the number of requests exceeds the allocated provisioned concurrency during the burst.
+    >However, Application Auto Scaling requires the burst load to sustain for at least 3 minutes
+    >in order to provision additional environments.
+
+    `lambda_scale_from_zero` provokes scaling with a single long invocation.
+    Here we put a quick function under controlled load instead:
+    first short bursts, then the same rate sustained.
+    """)
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ## Stack
+
+    One lambda, `scale_bursts`, which sleeps for 50 ms, with a "live" alias.
+
+    The alias has an auto-scaling policy to keep utilization at 50%,
+    with min capacity 1 and max capacity 10.
+    The function has reserved concurrency 20, to cap the cost of a runaway load test.
+    """)
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ## Results
+    """)
+    return
+
+
+@app.cell
+def _():
+    import datetime
+
+    import boto3
+    import botocore
+    from helpers.cassette import Cassette
+    from helpers.load import bursts, constant, run_rate
+    from helpers.metrics import get_metric_data, lambda_metric, to_datapoints
+    from helpers.waiters import provisioned_concurrency_at_least, wait_until
+
+    cassette = Cassette("lambda_scale_bursts")
+    lambda_ = cassette.client("lambda")
+    cloudwatch = cassette.client("cloudwatch")
+    return (
+        boto3,
+        botocore,
+        bursts,
+        cassette,
+        cloudwatch,
+        constant,
+        datetime,
+        get_metric_data,
+        lambda_,
+        lambda_metric,
+        provisioned_concurrency_at_least,
+        run_rate,
+        to_datapoints,
+        wait_until,
+    )
+
+
+@app.cell
+def _(lambda_):
+    def get_provisioned_concurrency():
+        config = lambda_.get_provisioned_concurrency_config(FunctionName="scale_bursts", Qualifier="live")
+        keys = ("RequestedProvisionedConcurrentExecutions", "AllocatedProvisionedConcurrentExecutions", "Status")
+        return {key: config[key] for key in keys}
+
+    return (get_provisioned_concurrency,)
+
+
+@app.cell
+def _(boto3, botocore, cassette, run_rate):
+    max_in_flight = 50
+
+    def run_load(key, profile, duration):
+        "Put `scale_bursts:live` under load, and summarize per 30 s. Only the summary is recorded: the invocations are too many."
+
+        def compute():
+            # no retries, or throttles are retried away
+            config = botocore.config.Config(retries={"total_max_attempts": 1}, max_pool_connections=max_in_flight)
+            load_lambda = boto3.client("lambda", config=config)
+            record = run_rate(load_lambda, "scale_bursts", profile, duration, qualifier="live", max_in_flight=max_in_flight)
+            return record.summarize(bucket_seconds=30)
+
+        return cassette.memo(key, compute)
+
+    return (run_load,)
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    Provisioned concurrency before the load:
+    """)
+    return
+
+
+@app.cell
+def _(get_provisioned_concurrency):
+    get_provisioned_concurrency()
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ### Bursts
+
+    40 requests per second for 1 minute in every 5, and 1 per second otherwise, for 15 minutes.
+
+    At 50 ms per request, 40 per second needs about 2 environments,
+    so utilization of the 1 provisioned environment is well over the 50% target during each burst.
+    But each burst lasts 1 minute, not 3.
+    """)
+    return
+
+
+@app.cell
+def _(bursts, datetime, mo, run_load):
+    start_time = datetime.datetime.now(datetime.UTC)
+    _summary = run_load("bursts", bursts(base_rate=1, burst_rate=40, burst_duration=60, period=300), duration=15 * 60)
+    mo.ui.table(_summary, selection=None)
+    return (start_time,)
+
+
+@app.cell
+def _(get_provisioned_concurrency):
+    get_provisioned_concurrency()
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    If the docs are right, provisioned concurrency hasn't changed.
+
+    ### Sustained
+
+    Now the burst rate, 40 requests per second, for 5 minutes straight.
+    """)
+    return
+
+
+@app.cell
+def _(constant, lambda_, mo, provisioned_concurrency_at_least, run_load, wait_until):
+    _summary = run_load("sustained", constant(40), duration=5 * 60)
+
+    # scaling lags the alarm, which lags the metric
+    wait_until(provisioned_concurrency_at_least(lambda_, "scale_bursts", "live", 2), timeout=15 * 60, initial_interval=30)
+    mo.ui.table(_summary, selection=None)
+    return
+
+
+@app.cell
+def _(get_provisioned_concurrency):
+    get_provisioned_concurrency()
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    Here's utilization across both runs, per minute.
+    The alarms use the average [1], so the bursts' peaks are diluted by the quiet minutes around them.
+    """)
+    return
+
+
+@app.cell
+def _(cloudwatch, get_metric_data, lambda_metric, start_time, to_datapoints):
+    _series = get_metric_data(
+        cloudwatch,
+        {
+            statistic: lambda_metric("scale_bursts", "ProvisionedConcurrencyUtilization", statistic, resource="scale_bursts:live")
+            for statistic in ["Average", "Maximum"]
+        },
+        start_time=start_time,
+    )
+    to_datapoints(_series)
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    To size provisioned concurrency for your own traffic,
+    swap in its shape: `constant`, `ramp`, `bursts`,
+    or any function from seconds to requests per second.
+    """)
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ## References
+
+    [1] https://docs.aws.amazon.com/lambda/latest/dg/provisioned-concurrency.html
+    """)
+    return
+
+
+if __name__ == "__main__":
+    app.run()
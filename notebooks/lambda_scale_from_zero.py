@@ -16,7 +16,8 @@ def _(mo):
     without being wasteful (it scales in too),
     or risking breaking the bank (max 100).
 
-    Lambda achieves this by emitting a `ProvisionedConcurrencyUtilization` metric, and scaling provisioned concurrency to keep the metric near the target.
+    Lambda achieves this by emitting a `ProvisionedConcurrencyUtilization` metric,
+    and scaling provisioned concurrency to keep the metric near the target.
 
     `ProvisionedConcurrencyUtilization` is defined as
 
@@ -58,13 +59,15 @@ def _(mo):
 @app.cell
 def _():
     import datetime
-    import time
-    import boto3
 
-    lambda_ = boto3.client("lambda")
-    cloudwatch = boto3.client("cloudwatch")
-    appscaling = boto3.client("application-autoscaling")
-    return appscaling, cloudwatch, datetime, lambda_, time
+    from helpers.cassette import Cassette
+    from helpers.waiters import provisioned_concurrency_at_least, wait_until
+
+    cassette = Cassette("lambda_scale_from_zero")
+    lambda_ = cassette.client("lambda")
+    cloudwatch = cassette.client("cloudwatch")
+    appscaling = cassette.client("application-autoscaling")
+    return appscaling, cloudwatch, datetime, lambda_, provisioned_concurrency_at_least, wait_until
 
 
 @app.cell
@@ -109,7 +112,8 @@ def _(mo):
     >Functions that experience quick bursts of traffic may not trigger these alarms.
     >For example, suppose your Lambda function executes quickly (i.e. 20-100 ms) and your traffic comes in quick bursts.
     >In this case, the number of requests exceeds the allocated provisioned concurrency during the burst.
-    >However, Application Auto Scaling requires the burst load to sustain for at least 3 minutes in order to provision additional environments.
+    >However, Application Auto Scaling requires the burst load to sustain for at least 3 minutes
+    >in order to provision additional environments.
     >Additionally, both CloudWatch alarms require 3 data points that hit the target average to activate the auto scaling policy.
 
     "_At least_ 3 minutes"?
@@ -123,7 +127,7 @@ def _(mo):
 
 
 @app.cell
-def _(datetime, lambda_, time):
+def _(datetime, lambda_, provisioned_concurrency_at_least, wait_until):
     start_time = datetime.datetime.now(datetime.UTC)
 
     # Provisioned concurrency attaches to aliases, not function versions.
@@ -131,8 +135,9 @@ def _(datetime, lambda_, time):
     lambda_.invoke(FunctionName="scale_from_zero", Qualifier="live", InvocationType="Event")
     lambda_.invoke(FunctionName="scale_from_one", Qualifier="live", InvocationType="Event")
 
-    # Wait for the executions to complete plus a bit extra to allow Lambda time to scale out.
-    time.sleep(360)
+    # Wait until Lambda scales out the sanity check.
+    # scale_from_zero has had the same chance by then.
+    wait_until(provisioned_concurrency_at_least(lambda_, "scale_from_one", "live", 2), timeout=15 * 60, initial_interval=30)
     return (start_time,)
 
 
@@ -169,36 +174,39 @@ def _(mo):
 
 
 @app.cell
-def _(cloudwatch, datetime, start_time):
-    def get_utilization(function_name):
-        response = cloudwatch.get_metric_statistics(
-            Namespace="AWS/Lambda",
-            MetricName="ProvisionedConcurrencyUtilization",
-            Dimensions=[
-                {"Name": "FunctionName", "Value": function_name},
-                {"Name": "Resource", "Value": f"{function_name}:live"},
-            ],
-            StartTime=start_time,
-            EndTime=datetime.datetime.now(datetime.UTC),
-            Period=60,
-            Statistics=["Maximum"],  # The docs say "View this metric using MAX".
-        )
-        return sorted(
-            ((datapoint["Maximum"], datapoint["Timestamp"]) for datapoint in response["Datapoints"]),
-            key=lambda dp: dp[1],
+def _(cloudwatch, start_time):
+    from helpers.metrics import get_metric_data, lambda_metric
+
+    def get_utilization(function_names):
+        "Get (maximum, timestamp) pairs for each function, in one request."
+        series = get_metric_data(
+            cloudwatch,
+            {
+                function_name: lambda_metric(
+                    function_name,
+                    "ProvisionedConcurrencyUtilization",
+                    "Maximum",  # The docs say "View this metric using MAX".
+                    resource=f"{function_name}:live",
+                )
+                for function_name in function_names
+            },
+            start_time=start_time,
         )
-    return (get_utilization,)
+        return {function_name: list(zip(values, timestamps, strict=True)) for function_name, (timestamps, values) in series.items()}
+
+    utilization = get_utilization(["scale_from_zero", "scale_from_one"])
+    return (utilization,)
 
 
 @app.cell
-def _(get_utilization):
-    get_utilization("scale_from_zero")
+def _(utilization):
+    utilization["scale_from_zero"]
     return
 
 
 @app.cell
-def _(get_utilization):
-    get_utilization("scale_from_one")
+def _(utilization):
+    utilization["scale_from_one"]
     return
 
 
@@ -251,7 +259,8 @@ def _(get_scaling_alarms):
 @app.cell(hide_code=True)
 def _(mo):
     mo.md(r"""
-    `"treat_missing_data": None`, so the alarms fall back on the default setting `missing` [3], so **no metric emitted doesn't trigger the alarm.**
+    `"treat_missing_data": None`, so the alarms fall back on the default setting `missing` [3],
+    so **no metric emitted doesn't trigger the alarm.**
     That's the mechanism.
     """)
     return
@@ -272,6 +281,73 @@ def _(mo):
     return
 
 
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ## Simulated
+
+    `helpers.provisioned_concurrency_sim` models the target-tracking alarms on a virtual clock.
+    Here's our experiment again: one 240s invocation against each policy, watched for 10 minutes.
+    """)
+    return
+
+
+@app.cell
+def _():
+    from helpers.provisioned_concurrency_sim import ProvisionedConcurrencySimulator
+
+    def simulate(min_capacity, treat_missing_data="missing"):
+        simulator = ProvisionedConcurrencySimulator(
+            min_capacity=min_capacity,
+            max_capacity=2,
+            utilization_target=0.5,
+            treat_missing_data=treat_missing_data,
+        )
+        timeline = simulator.run([(0, 240)], until=10 * 60)
+        return [{key: row[key] for key in ("capacity", "utilization", "alarm_high")} for row in timeline]
+    return (simulate,)
+
+
+@app.cell
+def _(simulate):
+    simulate(min_capacity=0)
+    return
+
+
+@app.cell
+def _(simulate):
+    simulate(min_capacity=1)
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    What if the alarms treated missing data as breaching?
+    """)
+    return
+
+
+@app.cell
+def _(simulate):
+    simulate(min_capacity=0, treat_missing_data="breaching")
+    return
+
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    `AlarmHigh` goes into `ALARM`, but still no scaling:
+    target tracking sets capacity to `ceil(capacity * utilization / target)`,
+    and with no utilization metric there's nothing to scale by.
+    (Even if there were, zero times anything is zero.)
+
+    Give the simulator a trace of your own traffic, as `(start, duration)` pairs,
+    to tune `utilization_target` and the capacity bounds against cold starts offline.
+    """)
+    return
+
+
 @app.cell(hide_code=True)
 def _(mo):
     mo.md(r"""
@@ -49,31 +49,27 @@ def _(mo):
 @app.cell
 def _():
     import datetime
-    import time
 
-    import boto3
+    from helpers.cassette import Cassette
+    from helpers.logs import iter_log_events
+    from helpers.waiters import log_lines_appeared, wait_until
 
-    return boto3, datetime, time
+    return Cassette, datetime, iter_log_events, log_lines_appeared, wait_until
 
 
 @app.cell
-def _(boto3):
-    lambda_ = boto3.client("lambda")
-    logs = boto3.client("logs")
+def _(Cassette):
+    cassette = Cassette("lambda_who_what_where")
+    lambda_ = cassette.client("lambda")
+    logs = cassette.client("logs")
     return lambda_, logs
 
 
 @app.cell
-def _(datetime, logs):
+def _(datetime, iter_log_events, logs):
     def print_logs(function_name, start_time):
-        start_time_in_ms = int(start_time.timestamp()) * 1000
-        response = logs.filter_log_events(
-            logGroupName=f"/aws/lambda/{function_name}",
-            startTime=start_time_in_ms,
-        )
-
         nice_logs = ""
-        for event in response["events"]:
+        for event in iter_log_events(logs, f"/aws/lambda/{function_name}", start_time=start_time):
             t = datetime.datetime.fromtimestamp(event["timestamp"] / 1000, datetime.UTC)
             message = event["message"]
             nice_logs += f"{t}: {message}"
@@ -84,10 +80,10 @@ def _(datetime, logs):
 
 
 @app.cell
-def _(datetime, lambda_, print_logs, time):
+def _(datetime, lambda_, log_lines_appeared, logs, print_logs, wait_until):
     call_time = datetime.datetime.now(datetime.UTC)
     lambda_.invoke(FunctionName="who_what_where")
-    time.sleep(60)  # give logs time to appear
+    wait_until(log_lines_appeared(logs, "who_what_where", call_time, prefix="REPORT"), timeout=2 * 60)  # give logs time to appear
     print_logs("who_what_where", call_time)
     return
 
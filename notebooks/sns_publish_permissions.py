@@ -93,11 +93,12 @@ def _(mo):
 def _():
     from datetime import datetime, timezone
 
-    import boto3
+    from helpers.cassette import Cassette
 
-    lambda_ = boto3.client("lambda")
-    events = boto3.client("events")
-    return boto3, datetime, events, lambda_, timezone
+    cassette = Cassette("sns_publish_permissions")
+    lambda_ = cassette.client("lambda")
+    events = cassette.client("events")
+    return cassette, datetime, events, lambda_, timezone
 
 
 @app.cell
@@ -138,50 +139,55 @@ def _(put_events_response):
 def _(mo):
     mo.md(r"""
     Which topics did the alarm and rule successfully publish to?
-    We'll wait a bit then check the target lambdas.
+    We'll wait until the alarm has tried both topics and both target lambdas have been invoked, then check them.
     """)
     return
 
 
 @app.cell
-def _():
-    import time
+def _(cassette):
+    cloudwatch = cassette.client("cloudwatch")
+    return (cloudwatch,)
+
 
-    time.sleep(4 * 60)
+@app.cell
+def _(cloudwatch, start_time):
+    from helpers.waiters import alarm_history_recorded, all_of, metric_datapoint_exists, wait_until
+
+    wait_until(
+        all_of(
+            # one publish attempt per topic
+            alarm_history_recorded(cloudwatch, "noop_lambda_invocation_alarm", start_time, count=2),
+            metric_datapoint_exists(cloudwatch, "pre_existing_topic_target", "Invocations", start_time),
+            metric_datapoint_exists(cloudwatch, "topic_target", "Invocations", start_time),
+        ),
+        timeout=10 * 60,
+        initial_interval=15,
+    )
     return
 
 
 @app.cell
-def _(boto3):
-    cloudwatch = boto3.client("cloudwatch")
-    return (cloudwatch,)
+def _(cloudwatch, start_time):
+    from helpers.metrics import get_metric_data, lambda_metric, to_datapoints
+
+    invocations = get_metric_data(
+        cloudwatch,
+        {function_name: lambda_metric(function_name, "Invocations") for function_name in ["pre_existing_topic_target", "topic_target"]},
+        start_time=start_time,
+    )
+    return invocations, to_datapoints
 
 
 @app.cell
-def _(cloudwatch, datetime, start_time, timezone):
-    cloudwatch.get_metric_statistics(
-        MetricName="Invocations",
-        Namespace="AWS/Lambda",
-        Dimensions=[{"Name": "FunctionName", "Value": "pre_existing_topic_target"}],
-        StartTime=start_time,
-        EndTime=datetime.now(timezone.utc),
-        Statistics=["Sum"],
-        Period=60,
-    )["Datapoints"]
+def _(invocations, to_datapoints):
+    to_datapoints({"Sum": invocations["pre_existing_topic_target"]})
     return
 
 
 @app.cell
-def _(cloudwatch, datetime, start_time, timezone):
-    cloudwatch.get_metric_statistics(
-        MetricName="Invocations",
-        Namespace="AWS/Lambda",
-        Dimensions=[{"Name": "FunctionName", "Value": "topic_target"}],
-        StartTime=start_time,
-        EndTime=datetime.now(timezone.utc),
-        Statistics=["Sum"],
-        Period=60,
-    )["Datapoints"]
+def _(invocations, to_datapoints):
+    to_datapoints({"Sum": invocations["topic_target"]})
     return
 
 
@@ -218,11 +224,11 @@ def _(mo):
 
 
 @app.cell
-def _(boto3):
+def _(cassette):
     import json
     from os import environ
 
-    sns = boto3.client("sns")
+    sns = cassette.client("sns")
     return environ, json, sns
 
 
@@ -276,7 +282,8 @@ def _(mo):
     Instead, it replaces the default policy.
     The docs make this clear for `add_to_resource_policy`:
 
-    > If this topic was created in this stack (`new Topic`), a topic policy will be automatically created upon the first call to `addToResourcePolicy`.
+    > If this topic was created in this stack (`new Topic`),
+    > a topic policy will be automatically created upon the first call to `addToResourcePolicy`.
 
     and I suppose it's implicit that the same applies to other permissions-changing methods,
     such as `add_target`.
@@ -299,6 +306,17 @@ def _(mo):
     return
 
 
+@app.cell
+def _(mo):
+    mo.md(r"""
+    All four outcomes follow from the policies and from which condition keys each service sends,
+    so they can be checked without deploying and waiting:
+    `uv run python -m scripts.check_sns_policies` evaluates every alarm action and rule target in the synthesized stacks
+    against its topic's policy, assuming the default policy for imported topics.
+    """)
+    return
+
+
 @app.cell
 def _(mo):
     mo.md(r"""
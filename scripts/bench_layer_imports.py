@@ -0,0 +1,76 @@
+"""
+Compare `import requests` times from a layer with and without precompiled bytecode.
+
+Like Lambda's /opt, the layer copies are read-only and the interpreter runs with -B,
+so the source-only layer is compiled afresh on every run, just like on every cold start.
+Each run is a fresh, isolated interpreter.
+
+Needs `uv run python -m scripts.build_layers bytecode <layer>` first.
+
+On a 1 vCPU linux box, python 3.13, requests-2-31, medians of 20:
+    source only: 255ms
+    with bytecode: 127ms
+
+Usage: uv run python -m scripts.bench_layer_imports [--layer requests-2-31] [--repeats N]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from scripts.build_layers import BYTECODE_DIR, LAYERS_DIR
+
+IMPORT_TIMER = """\
+import sys, time
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import requests
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def make_read_only(path: Path) -> None:
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            os.chmod(Path(root) / name, 0o555 if name in dirs else 0o444)
+    os.chmod(path, 0o555)
+
+
+def time_import(python_dir: Path) -> float:
+    proc = subprocess.run([sys.executable, "-I", "-B", "-c", IMPORT_TIMER, str(python_dir)], check=True, capture_output=True, text=True)
+    return float(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layer", default="requests-2-31")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = {
+            "source only": LAYERS_DIR / args.layer,
+            "with bytecode": BYTECODE_DIR / args.layer,
+        }
+        for label, layer_dir in variants.items():
+            opt = Path(tmp) / label.replace(" ", "_")
+            # leave out any __pycache__ a local import left in the source tree
+            ignore = shutil.ignore_patterns("__pycache__") if label == "source only" else None
+            shutil.copytree(layer_dir, opt, ignore=ignore)
+            make_read_only(opt)
+            timings = [time_import(opt / "python") for _ in range(args.repeats)]
+            print(f"{label}: median {statistics.median(timings):.1f}ms (min {min(timings):.1f}ms, max {max(timings):.1f}ms)")
+            # so the temporary directory can be cleaned up
+            for root, dirs, _ in os.walk(opt):
+                for name in dirs:
+                    os.chmod(Path(root) / name, 0o755)
+            os.chmod(opt, 0o755)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare synth times for LambdaLayerMergingStack, which has both vendored layers, with and without the layer fingerprint manifests.
+
+Each mode synthesizes into its own output directory, like repeated `cdk synth`s into one cdk.out.
+Each synth runs in a fresh interpreter, like `cdk synth` does: cdk caches asset hashes within a process,
+so repeated synths in one process wouldn't hash anything after the first.
+The time is the stack's construction and synth, after a throwaway synth has paid for jsii's startup, which both modes pay alike.
+The first synth of each mode is a warm-up: it stages the assets and, with fingerprints, writes any missing manifests.
+
+On a 1 vCPU linux box, python 3.13, aws-cdk-lib 2.273.0, `--repeats 15`, medians:
+    before (cdk hashes the layers): 0.30s
+    after (fingerprint manifests): 0.27s
+The two layers are only ~2 MB and ~125 files each, so there's little to hash: the saving grows with the layers' size.
+
+Usage: uv run python -m scripts.bench_layer_synth [--repeats N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SYNTH = """\
+import sys, tempfile, time
+import aws_cdk as cdk
+from aws_cdk import aws_lambda as lambda_
+from lib.lambda_layer_merging_stack import LambdaLayerMergingStack
+outdir, use_fingerprint = sys.argv[1:]
+# jsii loads the construct libraries on first use, which takes seconds: pay for that first, with a tiny asset
+with tempfile.TemporaryDirectory() as warm_up_outdir, tempfile.TemporaryDirectory() as asset_dir:
+    warm_up = cdk.App(outdir=warm_up_outdir)
+    stack = cdk.Stack(warm_up, "WarmUp")
+    lambda_.LayerVersion(stack, "layer", code=lambda_.Code.from_asset(asset_dir))
+    lambda_.Function(stack, "function", runtime=lambda_.Runtime.PYTHON_3_13, handler="index.handler", code=lambda_.Code.from_inline("x"))
+    warm_up.synth()
+start = time.perf_counter()
+app = cdk.App(outdir=outdir, context={"layer_fingerprints": use_fingerprint})
+LambdaLayerMergingStack(app, "LambdaLayerMergingStack")
+app.synth()
+print(time.perf_counter() - start)
+"""
+
+
+def synth(outdir: str, use_fingerprint: bool) -> float:
+    proc = subprocess.run([sys.executable, "-c", SYNTH, outdir, str(use_fingerprint).lower()], capture_output=True, text=True, check=True)
+    return float(proc.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, use_fingerprint in (("before (cdk hashes the layers)", False), ("after (fingerprint manifests)", True)):
+        with tempfile.TemporaryDirectory() as outdir:
+            warm_up = synth(outdir, use_fingerprint)
+            timings = [synth(outdir, use_fingerprint) for _ in range(args.repeats)]
+        print(f"{label}:")
+        print(f"\twarm-up: {warm_up:.3f}s")
+        print(f"\tmedian of {args.repeats}: {statistics.median(timings):.3f}s (min {min(timings):.3f}s, max {max(timings):.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Export every notebook to docs/ as html, in parallel, skipping notebooks unchanged since the last build,
+then regenerate the index and its search index (see scripts.build_search_index).
+
+By default notebooks are exported from their cassettes (see helpers.cassette), without AWS,
+and notebooks without a cassette are skipped.
+With --live they run against AWS instead, one at a time, recording their cassettes as they go.
+
+A notebook's build key hashes
+- its source, and the sources of the `helpers` modules it imports, transitively,
+- its cassette, if it has one, since that's what a replayed export shows,
+- the cassette mode, and the marimo version.
+A notebook is exported again only if its key differs from the one recorded for its last successful export, or its html is missing.
+So editing one notebook costs one export.
+
+Exports run marimo in separate processes, several at a time.
+marimo writes a page even when a cell fails, so each is exported to a temporary file,
+which only replaces the notebook's page in docs/ if the export succeeded.
+
+The keys are recorded in .docs-build-state.json.
+
+Usage:
+    uv run python -m scripts.build_docs
+    uv run python -m scripts.build_docs --force lambda_retries
+    uv run python -m scripts.build_docs --live lambda_retries
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib import metadata
+from pathlib import Path
+
+from scripts import build_search_index, make_index
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+NOTEBOOKS_DIR = REPO_ROOT / "notebooks"
+CASSETTES_DIR = NOTEBOOKS_DIR / "cassettes"
+DOCS_DIR = REPO_ROOT / "docs"
+STATE_PATH = REPO_ROOT / ".docs-build-state.json"
+# see notebooks/helpers/cassette.py
+MODE_ENV_VAR = "AWS_BY_EXAMPLE_CASSETTE"
+
+
+def get_helper_imports(notebook: Path) -> set[Path]:
+    "Get the sources of the `helpers` modules a notebook imports, transitively."
+    seen: set[Path] = set()
+    to_visit = [notebook]
+    while to_visit:
+        path = to_visit.pop()
+        if path in seen or not path.exists():
+            continue
+        if path != notebook:
+            seen.add(path)
+        for node in ast.walk(ast.parse(path.read_text())):
+            if isinstance(node, ast.ImportFrom) and node.module == "helpers":
+                # e.g. `from helpers import cassette`
+                to_visit.extend(NOTEBOOKS_DIR / "helpers" / f"{alias.name}.py" for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and node.module.startswith("helpers."):
+                to_visit.append(NOTEBOOKS_DIR / (node.module.replace(".", "/") + ".py"))
+
+    return seen
+
+
+def get_cassette_path(notebook: Path) -> Path:
+    return CASSETTES_DIR / f"{notebook.stem}.json.gz"
+
+
+def get_key(notebook: Path, mode: str) -> str:
+    digest = hashlib.sha256()
+    for path in [notebook, *sorted(get_helper_imports(notebook))]:
+        digest.update(f"{path.relative_to(REPO_ROOT)}\0".encode())
+        digest.update(path.read_bytes())
+    cassette = get_cassette_path(notebook)
+    if cassette.exists():
+        digest.update(cassette.read_bytes())
+    digest.update(mode.encode())
+    digest.update(metadata.version("marimo").encode())
+
+    return digest.hexdigest()
+
+
+def export(notebook: Path, mode: str) -> subprocess.CompletedProcess:
+    "Export the notebook's page, replacing the one in docs/ only if the export succeeded."
+    with tempfile.TemporaryDirectory() as temp_dir:
+        html_path = Path(temp_dir) / f"{notebook.stem}.html"
+        proc = subprocess.run(
+            [sys.executable, "-m", "marimo", "export", "html", str(notebook), "-o", str(html_path), "--force"],
+            capture_output=True,
+            text=True,
+            cwd=REPO_ROOT,
+            env={**os.environ, MODE_ENV_VAR: mode},
+        )
+        if proc.returncode == 0:
+            shutil.move(html_path, DOCS_DIR / html_path.name)
+
+    return proc
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", nargs="*", metavar="NOTEBOOK", help="export these notebooks (all, if none given) even if unchanged")
+    parser.add_argument(
+        "--live",
+        nargs="*",
+        metavar="NOTEBOOK",
+        help="run these notebooks (all, if none given) against AWS, recording their cassettes, instead of replaying them",
+    )
+    parser.add_argument("--jobs", type=int, help="exports at a time (default: one per cpu, or one if any are live)")
+    args = parser.parse_args()
+
+    state = json.loads(STATE_PATH.read_text()) if STATE_PATH.exists() else {}
+    notebooks = sorted(NOTEBOOKS_DIR.glob("*.py"))
+    forced = {notebook.stem for notebook in notebooks} if args.force == [] else set(args.force or [])
+    live = {notebook.stem for notebook in notebooks} if args.live == [] else set(args.live or [])
+    # a live run always exports: AWS isn't covered by the key
+    forced |= live
+    modes = {notebook.stem: "record" if notebook.stem in live else "replay" for notebook in notebooks}
+
+    unrecorded = sorted(notebook.stem for notebook in notebooks if notebook.stem not in live and not get_cassette_path(notebook).exists())
+    if unrecorded:
+        print(f"Skipping {', '.join(unrecorded)}: no cassette to replay, record one with --live")
+    notebooks = [notebook for notebook in notebooks if notebook.stem not in unrecorded]
+
+    keys = {notebook.stem: get_key(notebook, modes[notebook.stem]) for notebook in notebooks}
+    stale = [
+        notebook
+        for notebook in notebooks
+        if notebook.stem in forced or state.get(notebook.stem) != keys[notebook.stem] or not (DOCS_DIR / f"{notebook.stem}.html").exists()
+    ]
+    print(f"{len(notebooks) - len(stale)} notebooks unchanged, exporting {len(stale)}")
+
+    failed = []
+    # live notebooks invoke, load test and wait on the same account, so they'd skew each other's timings
+    jobs = args.jobs or (1 if live else os.cpu_count())
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(export, notebook, modes[notebook.stem]): notebook for notebook in stale}
+        for future in as_completed(futures):
+            notebook = futures[future]
+            proc = future.result()
+            if proc.returncode != 0:
+                failed.append(notebook.stem)
+                print(f"{notebook.stem}: failed\n{proc.stderr.strip()}", file=sys.stderr)
+                continue
+            print(f"{notebook.stem}: exported")
+            # recorded as each finishes, so a failure elsewhere doesn't cost this one a re-export
+            state[notebook.stem] = keys[notebook.stem]
+            STATE_PATH.write_text(json.dumps(state, indent=1, sort_keys=True))
+
+    # failed exports left docs/ as it was, so the index only lists pages that exported
+    make_index.main()
+    build_search_index.build()
+
+    if failed:
+        sys.exit(f"Failed to export {', '.join(sorted(failed))}.")
+
+
+if __name__ == "__main__":
+    main()
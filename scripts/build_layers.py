@@ -0,0 +1,291 @@
+"""
+Build deployable variants of the vendored layers in lib/resources/layers.
+
+dedup mode: split near-identical layers into one shared base layer plus a thin delta layer per source layer.
+
+A file goes in the base layer if every source layer has it, byte for byte.
+Everything else stays in the source layer's delta.
+The base layer is content-addressed: its directory is named after its hash, so an unchanged base is never re-uploaded.
+
+Base and deltas are disjoint, so the base can sit anywhere in the function's layer list,
+and the deltas merge in the same order as the source layers did.
+So the merged /opt/python is the same as before.
+The build checks that by hashing the layers it wrote: the base plus each delta has to be byte for byte its source layer.
+
+Writes to lib/resources/built-layers/dedup/, with a dedup.json recording which directory is which.
+Deploy with the built layers via `cdk deploy -c layer_build=dedup`.
+
+bytecode mode: copy each layer and precompile its modules to .pyc.
+
+Lambda extracts layers into a read-only /opt, so a layer without .pyc files is compiled afresh on every cold start.
+The .pyc files are unchecked-hash based:
+zip extraction doesn't preserve mtimes exactly, and the layer never changes under the runtime anyway.
+They're only valid for the interpreter version they're compiled with, so this must run on the Lambda runtime's version.
+
+Writes to lib/resources/built-layers/bytecode/<layer>/.
+
+slim mode: prune each layer to the files a handler actually loads.
+
+Runs a statement, by default `import requests`, over the merged layers under scripts.profile_layer_imports' tracer,
+and keeps a layer's file if
+- a module was loaded from it, or
+- it isn't python source, and it's in a directory a module was loaded from: data like certifi's cacert.pem, and extension modules,
+  which may be the ones Lambda loads even if the local platform loads the pure python fallback.
+Everything else goes: console scripts in bin/, .dist-info metadata, and modules nothing imported,
+e.g. charset_normalizer.cli, most of urllib3.contrib, and idna's uts46data table, which idna only imports for non-ascii hosts.
+So the statement has to exercise any lazy imports the handler needs: `--statement` can be any code, not just imports.
+The build checks the statement still runs over the slim layers.
+
+Writes to lib/resources/built-layers/slim/<layer>/ and <layer>.zip,
+and reports files, unzipped size, zip size and extract time, before and after.
+What it keeps depends on the extension modules the local platform loads,
+so build on the Lambda runtime's platform to keep exactly what Lambda loads.
+For requests-2-31 on linux x86_64, CPython 3.13.0, which loads charset_normalizer's compiled modules as Lambda does:
+123 files, 1.92 MB unzipped before, and 69 files, 1.44 MB unzipped after.
+
+Usage:
+    uv run python -m scripts.build_layers dedup requests-2-30 requests-2-31
+    uv run python -m scripts.build_layers bytecode requests-2-31
+    uv run python -m scripts.build_layers slim requests-2-31 --statement "import requests"
+"""
+
+import argparse
+import compileall
+import hashlib
+import json
+import os
+import py_compile
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from lib.fingerprints import get_fingerprint, hash_file
+from lib.paths import BUILT_LAYERS_DIR, LAYERS_DIR
+
+DEDUP_DIR = BUILT_LAYERS_DIR / "dedup"
+BYTECODE_DIR = BUILT_LAYERS_DIR / "bytecode"
+SLIM_DIR = BUILT_LAYERS_DIR / "slim"
+
+# the python version of lambda_.Runtime.PYTHON_3_13
+LAMBDA_PYTHON_VERSION = (3, 13)
+
+
+def link_or_copy(source: Path, destination: Path) -> None:
+    "Hard link when we can, since the built layers are read-only copies of the sources."
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def split(file_hashes: dict[str, dict[str, str]]) -> tuple[set[str], dict[str, set[str]]]:
+    "Given layer -> relative path -> sha256, get the base layer's paths and each layer's delta paths."
+    layers = list(file_hashes)
+    common = set.intersection(*(set(file_hashes[layer]) for layer in layers))
+    base = {path for path in common if len({file_hashes[layer][path] for layer in layers}) == 1}
+    deltas = {layer: set(file_hashes[layer]) - base for layer in layers}
+
+    return base, deltas
+
+
+def merge(layers: list[dict[str, str]]) -> dict[str, str]:
+    "Merge relative path -> sha256 maps rsync-style, like Lambda does: later layers win."
+    merged: dict[str, str] = {}
+    for layer in layers:
+        merged.update(layer)
+
+    return merged
+
+
+def build_dedup(names: list[str], out_dir: Path = DEDUP_DIR) -> dict:
+    file_hashes = {name: {path: entry["sha256"] for path, entry in get_fingerprint(LAYERS_DIR / name)["files"].items()} for name in names}
+    base, deltas = split(file_hashes)
+
+    # the base is identical across layers, so take its hashes from any of them
+    base_hashes = {path: file_hashes[names[0]][path] for path in sorted(base)}
+    base_name = "base-" + hash_file_hashes(base_hashes)[:16]
+    delta_names = {name: f"{name}-delta" for name in names}
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    for path in base:
+        link_or_copy(LAYERS_DIR / names[0] / path, out_dir / base_name / path)
+    for name in names:
+        (out_dir / delta_names[name]).mkdir(parents=True)
+        for path in deltas[name]:
+            link_or_copy(LAYERS_DIR / name / path, out_dir / delta_names[name] / path)
+
+    # check what was written, read back from disk, against the source layers
+    built_base = hash_tree(out_dir / base_name)
+    built_deltas = {name: hash_tree(out_dir / delta_names[name]) for name in names}
+    for name in names:
+        if merge([built_base, built_deltas[name]]) != file_hashes[name]:
+            raise RuntimeError(f"The base layer and {delta_names[name]} don't merge to the same files as {name}.")
+    if merge([built_base, *built_deltas.values()]) != merge([file_hashes[name] for name in names]):
+        raise RuntimeError("The base and delta layers don't merge to the same /opt as the source layers.")
+
+    summary = {"sources": names, "base": base_name, "deltas": delta_names}
+    (out_dir / "dedup.json").write_text(json.dumps(summary, indent=2))
+
+    return summary
+
+
+def hash_tree(layer_dir: Path) -> dict[str, str]:
+    "Get relative path -> sha256 for a directory's files, hashing their contents."
+    return {path.relative_to(layer_dir).as_posix(): hash_file(path) for path in sorted(layer_dir.rglob("*")) if path.is_file()}
+
+
+def hash_file_hashes(file_hashes: dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    for path, sha256 in sorted(file_hashes.items()):
+        digest.update(f"{path}\0{sha256}\n".encode())
+
+    return digest.hexdigest()
+
+
+def build_bytecode(name: str, out_dir: Path = BYTECODE_DIR) -> Path:
+    if sys.version_info[:2] != LAMBDA_PYTHON_VERSION:
+        version = ".".join(map(str, LAMBDA_PYTHON_VERSION))
+        raise RuntimeError(f"Run with python {version}: .pyc files are only valid for the version that wrote them.")
+
+    layer_dir = out_dir / name
+    if layer_dir.exists():
+        shutil.rmtree(layer_dir)
+    # copy rather than link: the sources' own __pycache__ directories must stay out of the way
+    shutil.copytree(LAYERS_DIR / name, layer_dir, ignore=shutil.ignore_patterns("__pycache__"))
+    ok = compileall.compile_dir(
+        layer_dir,
+        quiet=1,
+        # sys.path paths, e.g. /opt/python/requests/api.py, not build paths, in tracebacks
+        stripdir=str(layer_dir),
+        prependdir="/opt",
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    if not ok:
+        raise RuntimeError(f"Some modules in {name} failed to compile.")
+
+    return layer_dir
+
+
+def trace(names: list[str], layers_dir: Path, statement: str) -> set[tuple[str, str]]:
+    "Get the (layer, relative path) of each file a module was loaded from, running the statement over the merged layers."
+    # imported here: the tracer isn't needed for the other modes
+    from scripts.layer_overlay import Layer, Overlay
+    from scripts.profile_layer_imports import profile
+
+    overlay = Overlay([Layer(name, layers_dir / name) for name in names])
+    _, files = profile(overlay, statement, code=None, repeats=1)
+    loaded = set()
+    for path in files.values():
+        if path is not None and path.startswith("/opt/"):
+            path = path.removeprefix("/opt/")
+            loaded.add((overlay.get_layer(path).name, path))
+    return loaded
+
+
+def get_slim_paths(layer_dir: Path, loaded: set[str]) -> list[str]:
+    "Get the paths to keep, given the paths modules were loaded from."
+    # the top-level python/ dir counts as loaded whatever the platform loaded:
+    # shared runtimes of extension modules live there, e.g. the mypyc one charset_normalizer's extensions need on lambda
+    loaded_dirs = {Path(path).parent for path in loaded} | {Path("python")}
+    keep = []
+    for path in sorted(layer_dir.rglob("*")):
+        relative_path = path.relative_to(layer_dir)
+        if not path.is_file() or "__pycache__" in relative_path.parts:
+            continue
+        if relative_path.as_posix() in loaded or (relative_path.parent in loaded_dirs and path.suffix not in (".py", ".pyi")):
+            keep.append(relative_path.as_posix())
+    return keep
+
+
+def write_zip(layer_dir: Path, zip_path: Path) -> None:
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for path in sorted(layer_dir.rglob("*")):
+            if path.is_file() and "__pycache__" not in path.parts:
+                zip_file.write(path, path.relative_to(layer_dir).as_posix())
+
+
+def time_extract(zip_path: Path, repeats: int = 5) -> float:
+    "Get the median time to extract a zip, in ms, like Lambda extracting a layer into /opt."
+    timings = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            with zipfile.ZipFile(zip_path) as zip_file:
+                zip_file.extractall(tmp)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def build_slim(names: list[str], statement: str, out_dir: Path = SLIM_DIR) -> dict[str, Path]:
+    loaded = trace(names, LAYERS_DIR, statement)
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    built = {}
+    for name in names:
+        for path in get_slim_paths(LAYERS_DIR / name, {path for layer, path in loaded if layer == name}):
+            link_or_copy(LAYERS_DIR / name / path, out_dir / name / path)
+        (out_dir / name).mkdir(parents=True, exist_ok=True)
+        write_zip(out_dir / name, out_dir / f"{name}.zip")
+        built[name] = out_dir / name
+
+    # raises if the slim layers are missing something the statement needs
+    trace(names, out_dir, statement)
+
+    return built
+
+
+def get_size(layer_dir: Path) -> tuple[int, int]:
+    "Get the number of files and total bytes in a layer directory."
+    sizes = [path.stat().st_size for path in layer_dir.rglob("*") if path.is_file()]
+    return len(sizes), sum(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["dedup", "bytecode", "slim"])
+    parser.add_argument("layers", nargs="+", help="names of directories in lib/resources/layers, in merge order")
+    parser.add_argument("--statement", default="import requests", help="slim mode: the code whose loaded files to keep")
+    args = parser.parse_args()
+
+    if args.mode == "slim":
+        built = build_slim(args.layers, args.statement)
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, layer_dir in built.items():
+                write_zip(LAYERS_DIR / name, Path(tmp) / f"{name}.zip")
+                for label, source, zip_path in [
+                    ("before", LAYERS_DIR / name, Path(tmp) / f"{name}.zip"),
+                    ("after", layer_dir, SLIM_DIR / f"{name}.zip"),
+                ]:
+                    count, size = get_size(source)
+                    print(
+                        f"{name} {label}: {count} files, {size / 1e6:.2f} MB unzipped, "
+                        f"{zip_path.stat().st_size / 1e6:.2f} MB zipped, {time_extract(zip_path):.1f} ms to extract"
+                    )
+        return
+
+    if args.mode == "bytecode":
+        for name in args.layers:
+            count, size = get_size(build_bytecode(name))
+            print(f"{name}: {count} files, {size / 1e6:.2f} MB with bytecode")
+        return
+
+    summary = build_dedup(args.layers)
+
+    before = [get_size(LAYERS_DIR / name) for name in args.layers]
+    after = [get_size(DEDUP_DIR / summary["base"])] + [get_size(DEDUP_DIR / summary["deltas"][name]) for name in args.layers]
+    for name, (count, size) in zip(args.layers, before, strict=True):
+        print(f"{name}: {count} files, {size / 1e6:.2f} MB")
+    for name, (count, size) in zip([summary["base"]] + list(summary["deltas"].values()), after, strict=True):
+        print(f"{name}: {count} files, {size / 1e6:.2f} MB")
+    print(f"total bytes: {sum(size for _, size in before) / 1e6:.2f} MB -> {sum(size for _, size in after) / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
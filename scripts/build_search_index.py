@@ -0,0 +1,212 @@
+"""
+Build docs/search-index.json, an inverted index of the notebooks' markdown, for the search box on the index page.
+
+Each exported page's notebook is split into sections at its markdown headings, which link to the heading's anchor in the page.
+The index maps each term to its postings: the sections it appears in, and how often.
+Terms are lowercased runs of letters, digits and underscores, indexed without their underscores,
+and, if they're camelCase or snake_case, as their parts too.
+So `treat_missing_data` is indexed as `treatmissingdata`, `treat`, `missing` and `data`.
+The search box drops underscores from query words too, and matches them as prefixes,
+so `TreatMissingData`, `treat_missing_data`, `treatmiss` and `missing data` all find it.
+
+The search box fetches the index once, on first use, instead of the pages.
+
+Usage:
+    uv run python -m scripts.build_search_index
+"""
+
+import argparse
+import ast
+import json
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple
+
+from scripts.make_index import get_display_name
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+NOTEBOOKS_DIR = REPO_ROOT / "notebooks"
+DOCS_DIR = REPO_ROOT / "docs"
+INDEX_NAME = "search-index.json"
+
+SNIPPET_LENGTH = 160
+
+TERM = re.compile(r"[A-Za-z0-9_]+")
+# e.g. `HTTPServer` is `HTTP`, `Server`, and `python313` is `python`, `313`
+PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*$")
+
+# too common to narrow a search: the search box ignores them in queries too
+STOPWORDS = [
+    "a",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "but",
+    "by",
+    "can",
+    "do",
+    "does",
+    "for",
+    "from",
+    "has",
+    "have",
+    "if",
+    "in",
+    "is",
+    "it",
+    "its",
+    "not",
+    "of",
+    "on",
+    "or",
+    "so",
+    "that",
+    "the",
+    "then",
+    "there",
+    "this",
+    "to",
+    "was",
+    "were",
+    "what",
+    "when",
+    "which",
+    "while",
+    "with",
+    "you",
+    "your",
+]
+
+
+class Section(NamedTuple):
+    # the heading's id in the exported page, or "" for the top of the page
+    anchor: str
+    heading: str
+    text: str
+
+
+def get_markdown(notebook: Path) -> list[str]:
+    "Get the markdown of a notebook's `mo.md` calls, in source order. Leaves out what f-strings interpolate."
+    cells = []
+    for node in ast.walk(ast.parse(notebook.read_text())):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "md" and node.args):
+            continue
+        arg = node.args[0]
+        if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            cells.append((node.lineno, arg.value))
+        elif isinstance(arg, ast.JoinedStr):
+            text = " ".join(part.value for part in arg.values if isinstance(part, ast.Constant) and isinstance(part.value, str))
+            cells.append((node.lineno, text))
+    return [markdown for _, markdown in sorted(cells)]
+
+
+def strip_markdown(markdown: str) -> str:
+    "Reduce markdown to its words, keeping link text and inline code but not urls or tags."
+    text = re.sub(r"\]\([^)]*\)", "]", markdown)
+    text = re.sub(r"<[^>]*>|https?://\S+", " ", text)
+    text = re.sub(r"[`*>\[\]|]", "", text)
+    return " ".join(text.split())
+
+
+def slugify(heading: str) -> str:
+    "Get the id markdown gives a heading, like python-markdown's toc extension, which marimo uses."
+    slug = unicodedata.normalize("NFKD", heading).encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^\w\s-]", "", slug).strip().lower()
+    return re.sub(r"[-\s]+", "-", slug)
+
+
+def get_sections(notebook: Path, title: str) -> list[Section]:
+    sections = [Section("", title, "")]
+    lines: list[str] = []
+
+    def close() -> None:
+        sections[-1] = sections[-1]._replace(text=strip_markdown("\n".join([sections[-1].text, *lines])))
+        lines.clear()
+
+    for markdown in get_markdown(notebook):
+        in_fence = False
+        for line in markdown.splitlines():
+            in_fence ^= line.strip().startswith("```")
+            match = None if in_fence else HEADING.match(line.strip())
+            if match is None:
+                lines.append(line)
+                continue
+            close()
+            heading = strip_markdown(match[2])
+            sections.append(Section(slugify(heading), heading, ""))
+    close()
+    return [section for section in sections if section.text or section.anchor]
+
+
+def tokenize(text: str) -> list[str]:
+    "Get a text's terms: each word without its underscores, then its camelCase or snake_case parts, if it has more than one."
+    terms = []
+    for word in TERM.findall(text):
+        terms.append(word.replace("_", "").lower())
+        parts = PART.findall(word)
+        if len(parts) > 1:
+            terms.extend(part.lower() for part in parts)
+    return [term for term in terms if len(term) > 1]
+
+
+def build_index(pages: list[tuple[str, str, Path]]) -> dict:
+    """
+    Build the index from (file name, title, notebook) for each page.
+
+    `sections` are [page, anchor, heading, snippet], `pages` are [file name, title],
+    and `terms` maps each term to a flat list of section, count pairs.
+    A section's heading counts as part of its text.
+    """
+    index: dict = {"pages": [], "sections": [], "stopwords": STOPWORDS, "terms": {}}
+    stopwords = set(STOPWORDS)
+    postings: dict[str, list[int]] = {}
+    for file_name, title, notebook in pages:
+        page = len(index["pages"])
+        index["pages"].append([file_name, title])
+        for section in get_sections(notebook, title):
+            section_id = len(index["sections"])
+            snippet = section.text if len(section.text) <= SNIPPET_LENGTH else section.text[:SNIPPET_LENGTH].rsplit(" ", 1)[0] + " …"
+            index["sections"].append([page, section.anchor, section.heading, snippet])
+            counts = Counter(term for term in tokenize(f"{section.heading} {section.text}") if term not in stopwords)
+            for term, count in counts.items():
+                postings.setdefault(term, []).extend([section_id, count])
+    index["terms"] = dict(sorted(postings.items()))
+    return index
+
+
+def build(docs_dir: Path = DOCS_DIR) -> bool:
+    "Index the notebooks of the pages in docs_dir. Return whether the index changed."
+    pages = [
+        (file.name, get_display_name(file), NOTEBOOKS_DIR / f"{file.stem}.py")
+        for file in sorted(docs_dir.glob("*.html"))
+        if file.name != "index.html" and (NOTEBOOKS_DIR / f"{file.stem}.py").exists()
+    ]
+    index = build_index(pages)
+    content = json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode()
+    index_path = docs_dir / INDEX_NAME
+    changed = not index_path.exists() or index_path.read_bytes() != content
+    if changed:
+        index_path.write_bytes(content)
+    print(
+        f"{INDEX_NAME}: {len(index['pages'])} pages, {len(index['sections'])} sections, {len(index['terms'])} terms, "
+        f"{len(content) / 1e3:.0f} KB" + ("" if changed else ", unchanged")
+    )
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs-dir", type=Path, default=DOCS_DIR)
+    args = parser.parse_args()
+
+    build(args.docs_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Check which alarms and rules in the synthesized stacks may publish to the sns topics they target, without deploying.
+
+For each alarm action and rule target that's an sns topic, evaluates the topic's policy
+against the request cloudwatch or eventbridge would make.
+The policy is, in order of preference:
+- a policy fetched from aws, passed via `--fetched`, e.g. for a pre-existing topic whose policy may have been changed,
+- the topic's `AWS::SNS::TopicPolicy` in the template,
+- sns's default policy, for a topic created without one, including topics imported from outside the stack.
+
+Run `cdk synth` first. Uses `ACCOUNT_ID` and `REGION`, like `app.py`, to resolve arns.
+
+Usage:
+    uv run python -m scripts.check_sns_policies
+    aws sns get-topic-attributes --topic-arn $ARN --query Attributes.Policy --output text > policy.json
+    uv run python -m scripts.check_sns_policies --fetched $ARN=policy.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from lib.sns_policy import get_default_policy, get_policy, publish_request
+
+CDK_OUT = Path("cdk.out")
+
+
+class Resolver:
+    "Resolve the intrinsics a template uses for arns, for the account and region the app deploys to."
+
+    def __init__(self, resources: dict, account: str, region: str) -> None:
+        self.resources = resources
+        self.account = account
+        self.region = region
+
+    def arn(self, service: str, resource: str) -> str:
+        return f"arn:aws:{service}:{self.region}:{self.account}:{resource}"
+
+    def get_arn(self, logical_id: str) -> str:
+        resource = self.resources[logical_id]
+        properties = resource.get("Properties", {})
+        match resource["Type"]:
+            case "AWS::SNS::Topic":
+                return self.arn("sns", properties.get("TopicName", logical_id))
+            case "AWS::CloudWatch::Alarm":
+                return self.arn("cloudwatch", f"alarm:{properties.get('AlarmName', logical_id)}")
+            case "AWS::Events::Rule":
+                return self.arn("events", f"rule/{properties.get('Name', logical_id)}")
+        # not a topic or a publisher, e.g. a rule's lambda target, so its arn doesn't matter
+        return f"{resource['Type']}:{logical_id}"
+
+    def resolve(self, value):
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if set(value) == {"Ref"}:
+            pseudo = {
+                "AWS::AccountId": self.account,
+                "AWS::Region": self.region,
+                "AWS::Partition": "aws",
+                "AWS::URLSuffix": "amazonaws.com",
+            }
+            return pseudo.get(value["Ref"]) or self.get_arn(value["Ref"])
+        if set(value) == {"Fn::GetAtt"}:
+            logical_id, attribute = value["Fn::GetAtt"]
+            if attribute not in ("Arn", "TopicArn"):
+                raise ValueError(f"Can't resolve {value}.")
+            return self.get_arn(logical_id)
+        if set(value) == {"Fn::Join"}:
+            separator, parts = value["Fn::Join"]
+            return separator.join(self.resolve(parts))
+        return {key: self.resolve(item) for key, item in value.items()}
+
+
+def get_publishers(resources: dict, resolver: Resolver) -> list[tuple[str, str, str]]:
+    "Get (service, source arn, topic arn) for each alarm action and rule target that's an sns topic."
+    publishers = []
+    for logical_id, resource in resources.items():
+        properties = resource.get("Properties", {})
+        if resource["Type"] == "AWS::CloudWatch::Alarm":
+            service = "cloudwatch.amazonaws.com"
+            targets = [
+                resolver.resolve(action)
+                for key in ("AlarmActions", "OKActions", "InsufficientDataActions")
+                for action in properties.get(key, [])
+            ]
+        elif resource["Type"] == "AWS::Events::Rule":
+            service = "events.amazonaws.com"
+            targets = [resolver.resolve(target["Arn"]) for target in properties.get("Targets", [])]
+        else:
+            continue
+        source_arn = resolver.get_arn(logical_id)
+        for target in dict.fromkeys(targets):
+            if target.startswith("arn:aws:sns:"):
+                publishers.append((service, source_arn, target))
+    return publishers
+
+
+def get_topic_policies(resources: dict, resolver: Resolver) -> dict[str, dict]:
+    "Get each topic's policy document from the template, by topic arn."
+    policies = {}
+    for resource in resources.values():
+        if resource["Type"] == "AWS::SNS::TopicPolicy":
+            properties = resolver.resolve(resource["Properties"])
+            for topic_arn in properties["Topics"]:
+                policies[topic_arn] = properties["PolicyDocument"]
+    return policies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cdk-out", type=Path, default=CDK_OUT)
+    parser.add_argument("--fetched", action="append", default=[], metavar="TOPIC_ARN=PATH", help="a topic's policy, as fetched from aws")
+    args = parser.parse_args()
+
+    account, region = os.environ["ACCOUNT_ID"], os.environ["REGION"]
+    fetched = {}
+    for item in args.fetched:
+        topic_arn, path = item.split("=", 1)
+        fetched[topic_arn] = json.loads(Path(path).read_text())
+
+    denied = 0
+    for template_path in sorted(args.cdk_out.glob("*.template.json")):
+        resources = json.loads(template_path.read_text()).get("Resources", {})
+        resolver = Resolver(resources, account, region)
+        topic_policies = get_topic_policies(resources, resolver)
+        created_topics = {
+            resolver.get_arn(logical_id) for logical_id, resource in resources.items() if resource["Type"] == "AWS::SNS::Topic"
+        }
+
+        for service, source_arn, topic_arn in get_publishers(resources, resolver):
+            if topic_arn in fetched:
+                document, origin = fetched[topic_arn], "fetched policy"
+            elif topic_arn in topic_policies:
+                document, origin = topic_policies[topic_arn], "template policy"
+            else:
+                origin = "default policy" if topic_arn in created_topics else "default policy, assumed for an imported topic"
+                document = get_default_policy(topic_arn)
+
+            decision = get_policy(document).evaluate(publish_request(topic_arn, service, source_arn, account))
+            denied += decision != "allow"
+            print(f"{template_path.name}\t{source_arn} -> {topic_arn}\t{decision}\t({origin})")
+
+    if denied:
+        sys.exit(f"{denied} publishers can't publish to their topics.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Write or refresh the fingerprint manifest of every layer in lib/resources/layers.
+
+Synth does this itself, but running it ahead of time (e.g. in CI, after checkout) takes the hashing off the synth.
+
+Usage: uv run python -m scripts.fingerprint_layers
+"""
+
+import time
+
+from lib.fingerprints import update_fingerprint
+from lib.paths import LAYERS_DIR
+
+
+def main():
+    for layer_dir in sorted(path for path in LAYERS_DIR.iterdir() if path.is_dir()):
+        start = time.perf_counter()
+        layer_hash = update_fingerprint(layer_dir)
+        print(f"{layer_dir.name}: {layer_hash} ({time.perf_counter() - start:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Show what a function's /opt looks like once its layers are merged, without extracting or copying anything.
+
+Lambda extracts a function's layers into /opt one after another, later layers overwriting earlier ones' files, rsync-style.
+The order is the one the synthesized template lists (see lambda_layer_merging), which needn't be the one in the stack's code.
+
+This indexes each layer by path and size (reading zips' central directories, and walking directories),
+then merges the indexes in the template's order into a virtual overlay: each path in /opt maps to the layer it comes from.
+Contents are only compared for paths that more than one layer has, and only when their sizes match:
+by crc32, from a zip's directory, or computed for a directory's files.
+
+It reports
+- shadowed files: paths more than one layer has, and whether the overwritten copies differed,
+- hybrid packages: a project with more than one `.dist-info` (or `.egg-info`) in the merged view,
+  or a package whose files come from layers with different copies of it,
+  e.g. two `requests-*.dist-info` next to one `requests` package with files from both.
+
+Layers can be given by function, read from cdk.out (run `cdk synth` first), or as directories and zips in merge order.
+
+Usage:
+    uv run python -m scripts.layer_overlay layer_merging
+    uv run python -m scripts.layer_overlay --layers lib/resources/layers/requests-2-31 lib/resources/layers/requests-2-30
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import zipfile
+import zlib
+from collections import defaultdict
+from functools import cached_property
+from pathlib import Path
+from typing import NamedTuple
+
+CDK_OUT = Path("cdk.out")
+
+# the sys.path entries lambda's python runtimes add for layers, relative to /opt
+SITE_DIRS = re.compile(r"^python/(lib/python\d+\.\d+/site-packages/)?")
+
+METADATA_DIR = re.compile(r"^(?P<project>[^/]+?)-(?P<version>[^-/]+?)(-py[^/]*)?\.(dist|egg)-info$")
+
+
+class Entry(NamedTuple):
+    size: int
+    # from a zip's directory, else None until computed
+    crc: int | None
+
+
+class Layer:
+    "A layer's files, by path relative to /opt, read from a directory or a zip without extracting it."
+
+    def __init__(self, name: str, source: Path) -> None:
+        self.name = name
+        self.source = source
+        self.crcs: dict[str, int] = {}
+
+    @cached_property
+    def index(self) -> dict[str, Entry]:
+        if self.source.is_file():
+            with zipfile.ZipFile(self.source) as zip_file:
+                return {info.filename: Entry(info.file_size, info.CRC) for info in zip_file.infolist() if not info.is_dir()}
+
+        index = {}
+        for root, dirs, names in os.walk(self.source):
+            dirs.sort()
+            for name in sorted(names):
+                path = Path(root) / name
+                index[path.relative_to(self.source).as_posix()] = Entry(path.stat().st_size, None)
+        return index
+
+    def get_crc(self, path: str) -> int:
+        "Get a file's crc32: free for a zip, which records it; computed on demand for a directory."
+        entry = self.index[path]
+        if entry.crc is not None:
+            return entry.crc
+        if path not in self.crcs:
+            crc = 0
+            with open(self.source / path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    crc = zlib.crc32(chunk, crc)
+            self.crcs[path] = crc
+        return self.crcs[path]
+
+
+class Shadowing(NamedTuple):
+    path: str
+    # the layers that have the path, in merge order: the last one wins
+    layers: list[str]
+    differs: bool
+
+
+class Overlay:
+    def __init__(self, layers: list[Layer]) -> None:
+        self.layers = layers
+        # path -> the layers that have it, in merge order
+        self.providers: dict[str, list[Layer]] = defaultdict(list)
+        for layer in layers:
+            for path in layer.index:
+                self.providers[path].append(layer)
+
+    def get_layer(self, path: str) -> Layer:
+        "The layer a path in the merged view comes from."
+        return self.providers[path][-1]
+
+    def differs(self, path: str) -> bool:
+        layers = self.providers[path]
+        if len({layer.index[path].size for layer in layers}) > 1:
+            return True
+        return len({layer.get_crc(path) for layer in layers}) > 1
+
+    def shadowed(self) -> list[Shadowing]:
+        return [
+            Shadowing(path, [layer.name for layer in layers], self.differs(path))
+            for path, layers in sorted(self.providers.items())
+            if len(layers) > 1
+        ]
+
+    def hybrid_packages(self) -> dict[str, list[str]]:
+        "Get the reasons each hybrid project or package is one, by its path in the merged view."
+        metadata_dirs: dict[str, set[str]] = defaultdict(set)
+        # package path -> the layers its files in the merged view come from, and the packages with files that differ across layers
+        winners: dict[str, set[str]] = defaultdict(set)
+        mixed: set[str] = set()
+
+        for path, layers in self.providers.items():
+            site_dir = SITE_DIRS.match(path)
+            if site_dir is None:
+                continue
+            top_level = path[site_dir.end() :].split("/", 1)[0]
+            metadata = METADATA_DIR.match(top_level)
+            if metadata:
+                project = re.sub(r"[-_.]+", "-", metadata["project"]).lower()
+                metadata_dirs[site_dir[0] + project].add(top_level)
+                continue
+            package = site_dir[0] + top_level.removesuffix(".py")
+            winners[package].add(layers[-1].name)
+            if len(layers) > 1 and self.differs(path):
+                mixed.add(package)
+
+        hybrids: dict[str, list[str]] = defaultdict(list)
+        for project, dirs in metadata_dirs.items():
+            if len(dirs) > 1:
+                hybrids[project].append(f"metadata of {len(dirs)} versions: {', '.join(sorted(dirs))}")
+        for package in mixed:
+            # a package one layer overwrote completely is just that layer's version
+            if len(winners[package]) > 1:
+                hybrids[package].append(f"files from layers {', '.join(sorted(winners[package]))}, which have different copies of it")
+        return dict(sorted(hybrids.items()))
+
+
+def get_function_layers(function_name: str, cdk_out: Path = CDK_OUT) -> list[Layer]:
+    "Get a function's layers, in the order of its template's `Layers`, from their assets in cdk.out."
+    for template_path in sorted(cdk_out.glob("*.template.json")):
+        resources = json.loads(template_path.read_text()).get("Resources", {})
+        for resource in resources.values():
+            properties = resource.get("Properties", {})
+            if resource.get("Type") != "AWS::Lambda::Function" or properties.get("FunctionName") != function_name:
+                continue
+
+            layers = []
+            for layer in properties.get("Layers", []):
+                if not (isinstance(layer, dict) and isinstance(layer.get("Ref"), str)):
+                    # e.g. an arn of a layer from outside the stack, whose files aren't in cdk.out
+                    raise ValueError(f"Layer {layer} of {function_name} isn't a layer defined in its stack. Pass its files with --layers.")
+                logical_id = layer["Ref"]
+                asset_path = resources.get(logical_id, {}).get("Metadata", {}).get("aws:asset:path")
+                if asset_path is None:
+                    raise ValueError(f"Layer {logical_id} of {function_name} isn't an asset in {cdk_out}.")
+                layers.append(Layer(logical_id, cdk_out / asset_path))
+            return layers
+
+    raise ValueError(f"No function {function_name} in {cdk_out}.")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("function_name", nargs="?")
+    parser.add_argument("--layers", nargs="+", type=Path, help="layer directories or zips, in merge order, instead of a function's")
+    parser.add_argument("--cdk-out", type=Path, default=CDK_OUT)
+    parser.add_argument("--all", action="store_true", help="list shadowed files whose copies are identical too")
+    args = parser.parse_args()
+
+    if args.layers:
+        layers = [Layer(path.name, path) for path in args.layers]
+    elif args.function_name:
+        layers = get_function_layers(args.function_name, args.cdk_out)
+    else:
+        parser.error("give a function name or --layers")
+
+    overlay = Overlay(layers)
+    print("merge order (later layers win):")
+    for layer in layers:
+        size = sum(entry.size for entry in layer.index.values())
+        print(f"  {layer.name}: {len(layer.index)} files, {size / 1e6:.2f} MB ({layer.source})")
+    print(f"merged: {len(overlay.providers)} files")
+
+    shadowed = overlay.shadowed()
+    differing = [shadowing for shadowing in shadowed if shadowing.differs]
+    print(f"\nshadowed: {len(shadowed)} files, {len(differing)} of them with differing copies")
+    for shadowing in shadowed if args.all else differing:
+        print(f"  {shadowing.path}: {' < '.join(shadowing.layers)}{'' if shadowing.differs else ' (identical)'}")
+
+    hybrids = overlay.hybrid_packages()
+    print(f"\nhybrid packages: {len(hybrids)}")
+    for name, reasons in hybrids.items():
+        print(f"  {name}: {'; '.join(reasons)}")
+
+    if hybrids:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,81 @@
-import subprocess
+"""
+Regenerate docs/index.html, the list of exported notebooks, if it's out of date.
+
+Cheap enough to run on every save or commit:
+- the paths come from this file's location, not from git,
+- the template is compiled once per process, and its bytecode is cached across processes,
+- each page's title, from its notebook's `app_title`, else the notebook's first heading, is read once per notebook version,
+- the index is only written if what's rendered differs from what's there.
+
+Usage:
+    uv run python -m scripts.make_index
+"""
+
+import ast
+from functools import cache, lru_cache
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+NOTEBOOKS_DIR = REPO_ROOT / "notebooks"
+TEMPLATES_DIR = REPO_ROOT / "templates"
 
-def get_source_folder():
+
+def get_source_folder() -> Path:
     "Get a path to the folder that github pages publishes from."
-    proc = subprocess.run(["git", "rev-parse", "--show-toplevel"], check=True, capture_output=True)
-    repo_root = proc.stdout.decode("utf-8").strip()
-    repo_root = Path(repo_root)
-    source_folder = repo_root / "docs"
+    return REPO_ROOT / "docs"
+
 
-    return source_folder
+@cache
+def get_template() -> Template:
+    # auto_reload, the default, recompiles the template if it's edited
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), bytecode_cache=FileSystemBytecodeCache())
+    return env.get_template("index.jinja")
 
 
-def get_display_name(file):
+def get_display_name(file: Path) -> str:
+    notebook = NOTEBOOKS_DIR / f"{file.stem}.py"
+    if notebook.exists():
+        title = get_title(notebook, notebook.stat().st_mtime_ns)
+        if title:
+            return title
     return file.stem.replace("_", " ")
 
 
-def main():
-    env = Environment(loader=FileSystemLoader("templates/"))
-    index_template = env.get_template("index.jinja")
+@lru_cache(maxsize=256)
+def get_title(notebook: Path, mtime_ns: int) -> str | None:
+    "Get a notebook's `marimo.App(app_title=...)`, else the first heading in its markdown. Cached by modification time."
+    heading = None
+    for node in ast.walk(ast.parse(notebook.read_text())):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        if node.func.attr == "App":
+            for keyword in node.keywords:
+                value = keyword.value
+                if keyword.arg == "app_title" and isinstance(value, ast.Constant) and isinstance(value.value, str) and value.value:
+                    return value.value
+        elif node.func.attr == "md" and heading is None and node.args and isinstance(node.args[0], ast.Constant):
+            lines = str(node.args[0].value).splitlines()
+            heading = next((line.strip().removeprefix("# ") for line in lines if line.strip().startswith("# ")), None)
+    return heading
+
 
+def main() -> bool:
+    "Regenerate the index. Return whether it changed."
     source_folder = get_source_folder()
 
-    files = [file for file in source_folder.iterdir() if file.name != "index.html"]
+    # not search-index.json
+    files = [file for file in source_folder.glob("*.html") if file.name != "index.html"]
     files.sort()
 
-    rendered = index_template.render(files=[(file.name, get_display_name(file)) for file in files])
-    with open(source_folder / "index.html", "w") as f:
-        f.write(rendered)
+    rendered = get_template().render(files=[(file.name, get_display_name(file)) for file in files]).encode()
+    index = source_folder / "index.html"
+    if index.exists() and index.read_bytes() == rendered:
+        return False
+    index.write_bytes(rendered)
+    return True
 
 
 if __name__ == "__main__":
-    main()
+    print("docs/index.html: " + ("updated" if main() else "unchanged"))
@@ -0,0 +1,208 @@
+"""
+Profile what a handler's imports cost, module by module, with its layers merged like Lambda's /opt.
+
+A cold start's Init Duration includes importing the handler module, and everything it imports from the layers.
+This assembles the merged /opt from the layers, in merge order (see scripts.layer_overlay), as symlinks, so nothing is copied,
+then imports the handler module in a fresh, isolated interpreter with -X importtime,
+and prints the imports as a tree of cumulative times, heaviest first, e.g. requests -> urllib3, charset_normalizer -> its mypyc extension.
+Each module is labelled with the layer it came from, or as the runtime's own.
+
+Like on a cold start, nothing is precompiled for the source-only layers: the interpreter runs with -B.
+Times are medians over the runs.
+
+Profile a function's handler, with its layers from cdk.out (run `cdk synth` first),
+or any import statement with layers from lib/resources/layers.
+
+Usage:
+    uv run python -m scripts.profile_layer_imports --function layer_merging
+    uv run python -m scripts.profile_layer_imports --layers requests-2-31 requests-2-30 --statement "import requests" --min-ms 0.5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from lib.paths import LAYERS_DIR
+from scripts.layer_overlay import Layer, Overlay, get_function_layers
+from scripts.run_local import CDK_OUT, load_functions
+
+MARKER = "-- profile_layer_imports --"
+
+IMPORTER = f"""\
+import json, sys
+task_dir, opt_dir, statement = sys.argv[1:]
+# the order lambda's python runtimes use
+version = "%d.%d" % sys.version_info[:2]
+sys.path[:0] = [task_dir, f"{{opt_dir}}/python/lib/python{{version}}/site-packages", f"{{opt_dir}}/python"]
+before = set(sys.modules)
+sys.stderr.write({MARKER!r} + "\\n")
+sys.stderr.flush()
+exec(statement)
+print(json.dumps({{name: getattr(module, "__file__", None) for name, module in list(sys.modules.items()) if name not in before}}))
+"""
+
+
+class Node:
+    def __init__(self, name: str, self_us: int, cumulative_us: int) -> None:
+        self.name = name
+        self.self_us = [self_us]
+        self.cumulative_us = [cumulative_us]
+        self.children: list[Node] = []
+
+    def merge(self, other: "Node") -> None:
+        "Add another run's timings of the same import tree."
+        self.self_us += other.self_us
+        self.cumulative_us += other.cumulative_us
+        by_name = {child.name: child for child in self.children}
+        for child in other.children:
+            if child.name in by_name:
+                by_name[child.name].merge(child)
+
+    @property
+    def cumulative_ms(self) -> float:
+        return statistics.median(self.cumulative_us) / 1000
+
+    @property
+    def self_ms(self) -> float:
+        return statistics.median(self.self_us) / 1000
+
+
+def parse_importtime(stderr: str) -> list[Node]:
+    """
+    Parse `-X importtime` output after the marker into trees.
+
+    A module's line comes after the lines of the modules it imported, which are indented one level deeper.
+    """
+    lines = stderr.split(MARKER + "\n", 1)[-1].splitlines()
+    pending: list[tuple[int, Node]] = []
+    for line in lines:
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        node = Node(name.strip(), int(self_us), int(cumulative_us))
+        while pending and pending[-1][0] > depth:
+            node.children.insert(0, pending.pop()[1])
+        pending.append((depth, node))
+    return [node for _, node in pending]
+
+
+def build_view(overlay: Overlay, view_dir: Path) -> None:
+    "Lay out the merged /opt as symlinks to the layer files that win."
+    for path, layers in overlay.providers.items():
+        if "__pycache__" in path.split("/"):
+            # bytecode a local import left in a source layer isn't in the deployed layer
+            continue
+        layer = layers[-1]
+        link = view_dir / path
+        link.parent.mkdir(parents=True, exist_ok=True)
+        if layer.source.is_file():
+            raise ValueError(f"{layer.name} is a zip: extract it and pass the directory instead.")
+        link.symlink_to((layer.source / path).resolve())
+
+
+def profile(overlay: Overlay, statement: str, code: str | None, repeats: int) -> tuple[list[Node], dict[str, str | None]]:
+    "Get the import trees, with median timings across runs, and each imported module's file."
+    with tempfile.TemporaryDirectory() as tmp:
+        view_dir, task_dir = Path(tmp) / "opt", Path(tmp) / "task"
+        view_dir.mkdir()
+        task_dir.mkdir()
+        build_view(overlay, view_dir)
+        if code is not None:
+            (task_dir / "index.py").write_text(code)
+
+        roots: list[Node] = []
+        files: dict[str, str | None] = {}
+        for _ in range(repeats):
+            proc = subprocess.run(
+                [sys.executable, "-I", "-B", "-X", "importtime", "-c", IMPORTER, str(task_dir), str(view_dir), statement],
+                capture_output=True,
+                text=True,
+                cwd=task_dir,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"The imports failed:\n{proc.stderr.split(MARKER, 1)[-1][-2000:]}")
+            files = {
+                name: (path.replace(str(view_dir), "/opt").replace(str(task_dir), "/var/task") if path else None)
+                for name, path in json.loads(proc.stdout).items()
+            }
+            run_roots = parse_importtime(proc.stderr)
+            if not roots:
+                roots = run_roots
+                continue
+            by_name = {root.name: root for root in roots}
+            for root in run_roots:
+                if root.name in by_name:
+                    by_name[root.name].merge(root)
+
+    return roots, files
+
+
+def get_origin(overlay: Overlay, files: dict[str, str | None], name: str) -> str:
+    if name not in files:
+        # e.g. an optional dependency that isn't installed
+        return "failed"
+    path = files[name]
+    if path is None:
+        return "built-in"
+    if path.startswith("/var/task/"):
+        return "handler"
+    if path.startswith("/opt/"):
+        layer = overlay.get_layer(path.removeprefix("/opt/"))
+        return f"{layer.name}, extension" if path.endswith((".so", ".pyd")) else layer.name
+    return "runtime"
+
+
+def print_tree(nodes: list[Node], overlay: Overlay, files: dict[str, str | None], min_ms: float, max_depth: int, depth: int = 0) -> None:
+    for node in sorted(nodes, key=lambda node: node.cumulative_ms, reverse=True):
+        if node.cumulative_ms < min_ms:
+            continue
+        origin = get_origin(overlay, files, node.name)
+        print(f"{node.cumulative_ms:9.1f} {node.self_ms:7.1f}  {'  ' * depth}{node.name} ({origin})")
+        if depth + 1 < max_depth:
+            print_tree(node.children, overlay, files, min_ms, max_depth, depth + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--function", help="a function with inline code in cdk.out, whose handler module to import")
+    parser.add_argument("--cdk-out", type=Path, default=CDK_OUT)
+    parser.add_argument(
+        "--layers",
+        nargs="+",
+        # the order the template lists layer_merging's layers in (aws-cdk-lib 2.273.0)
+        default=["requests-2-31", "requests-2-30"],
+        help="names of directories in lib/resources/layers, in merge order, instead of a function's layers",
+    )
+    parser.add_argument("--statement", default="import requests", help="what to profile, instead of a function's handler module")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-ms", type=float, default=1.0, help="leave out imports that took less, with their imports")
+    parser.add_argument("--depth", type=int, default=6)
+    args = parser.parse_args()
+
+    if args.function:
+        functions = load_functions(args.cdk_out)
+        if args.function not in functions:
+            sys.exit(f"No function {args.function} with inline code in {args.cdk_out}. Choose from {sorted(functions)}.")
+        config = functions[args.function]
+        layers = get_function_layers(args.function, args.cdk_out)
+        statement, code = f"import {config.handler.rsplit('.', 1)[0]}", config.code
+    else:
+        layers = [Layer(name, LAYERS_DIR / name) for name in args.layers]
+        statement, code = args.statement, None
+
+    overlay = Overlay(layers)
+    roots, files = profile(overlay, statement, code, args.repeats)
+
+    total_ms = sum(root.cumulative_ms for root in roots)
+    print(f"{statement}: {total_ms:.1f} ms, median of {args.repeats} runs\n")
+    print(f"{'cum ms':>9} {'self ms':>7}  module (origin)")
+    print_tree(roots, overlay, files, args.min_ms, args.depth)
+
+
+if __name__ == "__main__":
+    main()
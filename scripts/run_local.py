@@ -0,0 +1,392 @@
+"""
+Run a function's inline code locally, with Lambda's init and invoke phases, timeouts and log lines.
+
+Reads the function from the synthesized templates in cdk.out, so run `cdk synth` first.
+Only inline code (`Code.from_inline`) is supported, plus any layers staged as assets in cdk.out.
+
+Each execution environment is a subprocess:
+- the init phase imports the handler module, and has 10 s, like Lambda's,
+- the invoke phase calls the handler, and has the function's configured timeout,
+- the process is reused while warm, so module state and /tmp persist between invocations,
+- a timeout kills the process, so the next invocation is a cold start,
+- a failed init is retried in the invoke phase, within the function's timeout, as Lambda does for a "suppressed init".
+
+/tmp is a directory per environment: paths under /tmp are redirected to it.
+Handler output and the platform lines (`INIT_START`, `START`, `END`, `REPORT`, `INIT_REPORT`) are printed as they'd be logged.
+The runtime is the local python, so match Lambda's 3.13 for faithful timings.
+
+Usage:
+    uv run python -m scripts.run_local init_plus_handler_exceeds_timeout
+    uv run python -m scripts.run_local ephemeral_storage --invocations 2
+    uv run python -m scripts.run_local slow_init --event '{"key": "value"}' --cold
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import NamedTuple
+
+CDK_OUT = Path("cdk.out")
+
+# Lambda's limit for the init phase of on-demand functions
+INIT_LIMIT = 10
+
+# printed by the environment on stderr once it has flushed a phase's output, so platform lines come after it
+PHASE_DONE = "\0phase-done"
+
+# runs in the environment process: argv is the task dir, the tmp dir, the handler, then layer dirs
+BOOTSTRAP = r"""
+import builtins, importlib, io, json, math, os, sys, time, traceback
+
+task_dir, tmp_dir, handler_spec, *layer_dirs = sys.argv[1:]
+
+# messages to the runner go on the real stdout; the handler's output goes to stderr, with everything else logged
+protocol = os.fdopen(os.dup(1), "w", buffering=1)
+os.dup2(2, 1)
+sys.stdout.reconfigure(line_buffering=True)
+
+def send(**message):
+    sys.stdout.flush()
+    sys.stderr.write(PHASE_DONE + "\n")
+    sys.stderr.flush()
+    protocol.write(json.dumps(message) + "\n")
+
+# the environment's own dir may be under the real /tmp
+environment_dir = os.path.dirname(tmp_dir)
+
+def redirect(path):
+    if isinstance(path, int):
+        return path
+    raw = os.fspath(path)
+    if isinstance(raw, bytes):
+        return os.fsencode(redirect(os.fsdecode(raw)))
+    if raw.startswith(environment_dir + "/"):
+        return path
+    if raw == "/tmp" or raw.startswith("/tmp/"):
+        return tmp_dir + raw[len("/tmp"):]
+    return path
+
+def redirecting(function, paths=1):
+    def wrapper(*args, **kwargs):
+        args = [redirect(arg) if index < paths else arg for index, arg in enumerate(args)]
+        return function(*args, **kwargs)
+    return wrapper
+
+for name in ("open", "stat", "lstat", "listdir", "scandir", "mkdir", "rmdir", "remove", "unlink", "access", "chmod", "utime", "truncate"):
+    setattr(os, name, redirecting(getattr(os, name)))
+for name in ("rename", "replace"):
+    setattr(os, name, redirecting(getattr(os, name), paths=2))
+builtins.open = io.open = redirecting(io.open)
+os.environ["TMPDIR"] = tmp_dir
+
+def get_max_memory_mb():
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return math.ceil(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024))
+
+def get_error(err, error_type=None):
+    error = {
+        "errorMessage": str(err),
+        "errorType": error_type or type(err).__name__,
+        "stackTrace": traceback.format_tb(err.__traceback__),
+    }
+    print(f"[ERROR] {error['errorType']}: {error['errorMessage']}", file=sys.stderr)
+    traceback.print_exception(err, file=sys.stderr)
+    return error
+
+class Context:
+    def __init__(self, request):
+        self.aws_request_id = request["request_id"]
+        self.function_name = os.environ["AWS_LAMBDA_FUNCTION_NAME"]
+        self.function_version = "$LATEST"
+        self.memory_limit_in_mb = os.environ["AWS_LAMBDA_FUNCTION_MEMORY_SIZE"]
+        self.invoked_function_arn = f"arn:aws:lambda:local:000000000000:function:{self.function_name}"
+        self.log_group_name = f"/aws/lambda/{self.function_name}"
+        self.log_stream_name = "local"
+        self.deadline_ms = request["deadline_ms"]
+
+    def get_remaining_time_in_millis(self):
+        return max(int(self.deadline_ms - time.time() * 1000), 0)
+
+sys.path[:0] = [task_dir] + [
+    path for layer_dir in layer_dirs for path in (f"{layer_dir}/python", f"{layer_dir}/python/lib/python3.13/site-packages")
+]
+module_name, function_name = handler_spec.rsplit(".", 1)
+
+start = time.perf_counter()
+try:
+    handler = getattr(importlib.import_module(module_name), function_name)
+except Exception as err:
+    send(type="init_error", error=get_error(err), init_ms=(time.perf_counter() - start) * 1000)
+    sys.exit(1)
+send(type="ready", init_ms=(time.perf_counter() - start) * 1000)
+
+for line in sys.stdin:
+    request = json.loads(line)
+    start = time.perf_counter()
+    error = payload = None
+    try:
+        result = handler(request["event"], Context(request))
+        try:
+            payload = json.dumps(result)
+        except TypeError as err:
+            error = get_error(err, "Runtime.MarshalError")
+            error["errorMessage"] = f"Unable to marshal response: {err}"
+    except Exception as err:
+        error = get_error(err)
+    duration_ms = (time.perf_counter() - start) * 1000
+    send(type="result", payload=payload, error=error, duration_ms=duration_ms, max_memory_mb=get_max_memory_mb())
+""".replace("PHASE_DONE", repr(PHASE_DONE))
+
+
+class FunctionConfig(NamedTuple):
+    function_name: str
+    code: str
+    handler: str
+    timeout: int
+    memory_size: int
+    environment: dict[str, str]
+    layer_dirs: list[Path]
+    # what couldn't be resolved from the template, e.g. environment variables that reference other resources
+    skipped: list[str]
+
+
+def load_functions(cdk_out: Path = CDK_OUT) -> dict[str, FunctionConfig]:
+    "Get the functions with inline code in the synthesized templates, by function name."
+    functions = {}
+    for template_path in sorted(cdk_out.glob("*.template.json")):
+        resources = json.loads(template_path.read_text()).get("Resources", {})
+        for logical_id, resource in resources.items():
+            properties = resource.get("Properties", {})
+            if resource.get("Type") != "AWS::Lambda::Function" or "ZipFile" not in properties.get("Code", {}):
+                continue
+
+            function_name = properties.get("FunctionName", logical_id)
+            environment = {}
+            skipped = []
+            for key, value in properties.get("Environment", {}).get("Variables", {}).items():
+                if isinstance(value, str):
+                    environment[key] = value
+                else:
+                    skipped.append(f"environment variable {key}, which is only resolved at deploy time")
+
+            layer_dirs = []
+            for layer in properties.get("Layers", []):
+                layer_id = layer.get("Ref", "") if isinstance(layer, dict) else ""
+                asset_path = resources.get(layer_id, {}).get("Metadata", {}).get("aws:asset:path")
+                if asset_path:
+                    layer_dirs.append(cdk_out / asset_path)
+                else:
+                    skipped.append(f"layer {layer}, which isn't an asset in {cdk_out}")
+
+            functions[function_name] = FunctionConfig(
+                function_name=function_name,
+                code=properties["Code"]["ZipFile"],
+                handler=properties.get("Handler", "index.handler"),
+                timeout=properties.get("Timeout", 3),
+                memory_size=properties.get("MemorySize", 128),
+                environment=environment,
+                layer_dirs=layer_dirs,
+                skipped=skipped,
+            )
+
+    return functions
+
+
+class Sandbox:
+    "One execution environment at a time for a function, replaced when it dies or times out."
+
+    def __init__(self, config: FunctionConfig, log=print) -> None:
+        self.config = config
+        self.log = log
+        self.process: subprocess.Popen | None = None
+        self.dir: Path | None = None
+        self.messages: queue.Queue = queue.Queue()
+        self.phase_done = threading.Event()
+        self.max_memory_mb = 0
+
+    def spawn(self) -> None:
+        self.dir = Path(tempfile.mkdtemp(prefix=f"{self.config.function_name}-"))
+        (self.dir / "task").mkdir()
+        (self.dir / "tmp").mkdir()
+        module_name = self.config.handler.rsplit(".", 1)[0]
+        (self.dir / "task" / f"{module_name}.py").write_text(self.config.code)
+
+        env = {
+            **os.environ,
+            **self.config.environment,
+            "AWS_LAMBDA_FUNCTION_NAME": self.config.function_name,
+            "AWS_LAMBDA_FUNCTION_MEMORY_SIZE": str(self.config.memory_size),
+            "AWS_LAMBDA_FUNCTION_VERSION": "$LATEST",
+            "LAMBDA_TASK_ROOT": str(self.dir / "task"),
+        }
+        self.messages = queue.Queue()
+        self.process = subprocess.Popen(
+            [sys.executable, "-I", "-c", BOOTSTRAP, str(self.dir / "task"), str(self.dir / "tmp"), self.config.handler]
+            + [str(layer_dir) for layer_dir in self.config.layer_dirs],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=env,
+            cwd=self.dir / "task",
+        )
+        threading.Thread(target=self.read_messages, args=(self.process, self.messages), daemon=True).start()
+        threading.Thread(target=self.read_logs, args=(self.process,), daemon=True).start()
+
+    def read_messages(self, process: subprocess.Popen, messages: queue.Queue) -> None:
+        assert process.stdout is not None  # spawned with stdout=PIPE
+        for line in process.stdout:
+            messages.put(json.loads(line))
+        messages.put(None)
+
+    def read_logs(self, process: subprocess.Popen) -> None:
+        assert process.stderr is not None  # spawned with stderr=PIPE
+        for line in process.stderr:
+            if line.rstrip("\n") == PHASE_DONE:
+                self.phase_done.set()
+            else:
+                self.log(line.rstrip("\n"))
+        self.phase_done.set()
+
+    def receive(self, limit: float) -> dict | None:
+        "Wait up to `limit` seconds for the environment's next message. None if it timed out or died."
+        try:
+            message = self.messages.get(timeout=limit)
+        except queue.Empty:
+            return None
+        if message is not None:
+            # its output is flushed, but may still be on its way through the pipe
+            self.phase_done.wait(timeout=1)
+            self.phase_done.clear()
+        return message
+
+    def kill(self) -> None:
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+        if self.dir is not None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+        self.process = self.dir = None
+
+    def init(self, limit: float) -> tuple[str, float, dict | None]:
+        "Start an environment and wait for its init. Get its status (`ready`, `error` or `timeout`), duration in ms, and any error."
+        self.spawn()
+        start = time.perf_counter()
+        message = self.receive(limit)
+        if message is None:
+            self.kill()
+            return "timeout", (time.perf_counter() - start) * 1000, None
+        if message["type"] == "init_error":
+            self.kill()
+            return "error", message["init_ms"], message["error"]
+        return "ready", message["init_ms"], None
+
+    def invoke(self, event) -> dict:
+        "Invoke the function like `lambda_.invoke`, but get a dict with the payload (or error) and the status."
+        request_id = str(uuid.uuid4())
+        timeout = self.config.timeout
+        init_ms = None
+        # how much of the timeout a suppressed init used up
+        invoke_init_ms = 0.0
+
+        if self.process is None:
+            version = ".".join(map(str, sys.version_info[:2]))
+            self.log(f"INIT_START Runtime Version: python:{version}.local")
+            status, init_ms, error = self.init(INIT_LIMIT)
+            if status != "ready":
+                self.log(f"INIT_REPORT Init Duration: {init_ms:.2f} ms\tPhase: init\tStatus: {status}")
+                init_ms = None
+                # lambda retries a failed init as part of the invocation, within the function's timeout
+                self.log(f"START RequestId: {request_id} Version: $LATEST")
+                status, invoke_init_ms, error = self.init(timeout)
+                if status != "ready":
+                    self.log(f"INIT_REPORT Init Duration: {invoke_init_ms:.2f} ms\tPhase: invoke\tStatus: {status}")
+                    if status == "timeout":
+                        error = {"errorMessage": f"Task timed out after {timeout:.2f} seconds"}
+                    return self.report(request_id, invoke_init_ms, None, {"error": error, "status": status})
+            else:
+                self.log(f"START RequestId: {request_id} Version: $LATEST")
+        else:
+            self.log(f"START RequestId: {request_id} Version: $LATEST")
+
+        # a ready init leaves an environment running, spawned with stdin=PIPE
+        process = self.process
+        assert process is not None and process.stdin is not None
+        remaining = timeout - invoke_init_ms / 1000
+        deadline_ms = time.time() * 1000 + remaining * 1000
+        start = time.perf_counter()
+        process.stdin.write(json.dumps({"event": event, "request_id": request_id, "deadline_ms": deadline_ms}) + "\n")
+        process.stdin.flush()
+        message = self.receive(remaining)
+
+        if message is None:
+            timed_out = process.poll() is None
+            self.kill()
+            if timed_out:
+                error = {"errorMessage": f"Task timed out after {timeout:.2f} seconds"}
+                return self.report(request_id, timeout * 1000, init_ms, {"error": error, "status": "timeout"})
+            error = {"errorType": "Runtime.ExitError", "errorMessage": f"RequestId: {request_id} Error: Runtime exited"}
+            return self.report(request_id, (time.perf_counter() - start) * 1000, init_ms, {"error": error, "status": "error"})
+
+        self.max_memory_mb = message["max_memory_mb"]
+        result = {"payload": message["payload"]} if message["error"] is None else {"error": message["error"]}
+        return self.report(request_id, invoke_init_ms + message["duration_ms"], init_ms, result)
+
+    def report(self, request_id: str, duration_ms: float, init_ms: float | None, result: dict) -> dict:
+        self.log(f"END RequestId: {request_id}")
+        billed_ms = math.ceil(duration_ms + (init_ms or 0))
+        line = (
+            f"REPORT RequestId: {request_id}\tDuration: {duration_ms:.2f} ms\tBilled Duration: {billed_ms} ms\t"
+            f"Memory Size: {self.config.memory_size} MB\tMax Memory Used: {self.max_memory_mb} MB"
+        )
+        if init_ms is not None:
+            line += f"\tInit Duration: {init_ms:.2f} ms"
+        if "status" in result:
+            line += f"\tStatus: {result['status']}"
+        self.log(line)
+        return {"request_id": request_id, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("function_name")
+    parser.add_argument("--event", default="{}", help="the event, as json")
+    parser.add_argument("--invocations", type=int, default=1)
+    parser.add_argument("--cold", action="store_true", help="start a new environment for every invocation")
+    parser.add_argument("--cdk-out", type=Path, default=CDK_OUT)
+    args = parser.parse_args()
+
+    functions = load_functions(args.cdk_out)
+    if args.function_name not in functions:
+        sys.exit(f"No function {args.function_name} with inline code in {args.cdk_out}. Choose from {sorted(functions)}.")
+
+    config = functions[args.function_name]
+    for skipped in config.skipped:
+        print(f"Skipping {skipped}.", file=sys.stderr)
+
+    sandbox = Sandbox(config)
+    try:
+        for _ in range(args.invocations):
+            if args.cold:
+                sandbox.kill()
+            result = sandbox.invoke(json.loads(args.event))
+            print(json.dumps(result))
+    finally:
+        sandbox.kill()
+
+
+if __name__ == "__main__":
+    main()
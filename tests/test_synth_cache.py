@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import aws_cdk as cdk
+from aws_cdk import aws_lambda as lambda_
+from aws_cdk import cx_api
+
+from lib.synth_cache import SynthCache
+
+
+def synth(outdir: Path, with_stack: bool) -> Path:
+    app = cdk.App(outdir=str(outdir))
+    if with_stack:
+        stack = cdk.Stack(app, "CachedStack")
+        handler_dir = outdir.parent / "handler"
+        handler_dir.mkdir(exist_ok=True)
+        (handler_dir / "index.py").write_text("def handler(event, context):\n    return event\n")
+        lambda_.Function(
+            stack,
+            "function",
+            runtime=lambda_.Runtime.PYTHON_3_13,
+            handler="index.handler",
+            code=lambda_.Code.from_asset(str(handler_dir)),
+        )
+    return Path(app.synth().directory)
+
+
+class SynthCacheTest(unittest.TestCase):
+    def test_restored_assembly_loads(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = SynthCache(Path(tmp) / "cache")
+            built_dir = synth(Path(tmp) / "built", with_stack=True)
+            cache.store(built_dir, "CachedStack", "key")
+
+            # the next synth skips the stack, and restores it from the cache
+            restored_dir = synth(Path(tmp) / "restored", with_stack=False)
+            self.assertTrue(cache.has("CachedStack", "key"))
+            cache.restore(restored_dir, "CachedStack", "key")
+
+            assembly = cx_api.CloudAssembly(str(restored_dir))
+            restored = assembly.get_stack_artifact("CachedStack")
+            built = cx_api.CloudAssembly(str(built_dir)).get_stack_artifact("CachedStack")
+            self.assertEqual(restored.template, built.template)
+            self.assertEqual(len(restored.messages), len(built.messages))
+            for asset in restored.assets:
+                self.assertTrue((restored_dir / asset["path"]).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()